@@ -0,0 +1,78 @@
+"""Rows/sec and file size of each export format.
+
+Exports a screen of random companies (tickers, 21 inputs, 44 ratios, scores
+and decisions) in chunks through export.ExportWriter. XLSX is timed on a
+smaller slice, next to a one-shot DataFrame.to_excel as the old baseline.
+
+Run from the repository root:  python benchmarks/bench_export.py [rows] [xlsx_rows]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import export
+import ratio_engine
+import screener
+
+CHUNK_ROWS = 50_000
+
+
+def make_results(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame(rng.uniform(1e6, 1e9, size=(rows, len(ratio_engine.INPUT_FIELDS))),
+                         columns=list(ratio_engine.INPUT_FIELDS))
+    frame.insert(0, "ticker", [f"T{i:06d}" for i in range(rows)])
+    results = screener.screen_chunk(frame)
+    return pd.concat([frame[list(ratio_engine.INPUT_FIELDS)], results], axis=1)
+
+
+def timed_export(results, path):
+    start = time.perf_counter()
+    with export.ExportWriter(path) as writer:
+        for offset in range(0, len(results), CHUNK_ROWS):
+            writer.write(results.iloc[offset:offset + CHUNK_ROWS])
+    return time.perf_counter() - start
+
+
+def report(name, rows, seconds, path):
+    size = os.path.getsize(path)
+    print(f"{name:<26} {rows:>9,} {rows / seconds:>12,.0f} {size / 1e6:>9.1f} {size / rows:>9.0f}")
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    xlsx_rows = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000
+    results = make_results(rows)
+    print(f"{len(results.columns)} columns per row")
+    print(f"{'format':<26} {'rows':>9} {'rows/sec':>12} {'MB':>9} {'bytes/row':>9}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in ("results.parquet", "results.arrow", "results.csv", "results.csv.gz"):
+            path = os.path.join(tmp, name)
+            report(name, rows, timed_export(results, path), path)
+
+        subset = results.iloc[:xlsx_rows]
+        path = os.path.join(tmp, "results.xlsx")
+        report("results.xlsx", len(subset), timed_export(subset, path), path)
+
+        path = os.path.join(tmp, "rendered.xlsx")
+        pq_subset = os.path.join(tmp, "subset.parquet")
+        subset.to_parquet(pq_subset, index=False)
+        start = time.perf_counter()
+        export.render_xlsx(pq_subset, path)
+        report("render_xlsx(parquet)", len(subset), time.perf_counter() - start, path)
+
+        path = os.path.join(tmp, "to_excel.xlsx")
+        start = time.perf_counter()
+        subset.to_excel(path, index=False)
+        report("DataFrame.to_excel", len(subset), time.perf_counter() - start, path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Per-tick cost of incremental updates versus a full recompute.
+
+Simulates a live market-cap feed over a universe of names: every tick
+replaces market_cap for all names (or for a subset that traded) and needs
+fresh ratios, rule flags and decisions.
+
+Run from the repository root:  python benchmarks/bench_incremental.py [names]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import incremental
+import ratio_engine
+
+
+def per_tick(func, ticks=200):
+    start = time.perf_counter()
+    for _ in range(ticks):
+        func()
+    return (time.perf_counter() - start) / ticks
+
+
+def main():
+    names = int(sys.argv[1]) if len(sys.argv) > 1 else 3_000
+    rng = np.random.default_rng(0)
+    table = rng.uniform(1e6, 1e9, size=(names, len(ratio_engine.INPUT_FIELDS)))
+    market_cap = ratio_engine.INPUT_FIELDS.index("market_cap")
+    live = incremental.for_stock_tool(table)
+    traded = rng.choice(names, size=max(names // 20, 1), replace=False)
+
+    def full():
+        table[:, market_cap] *= 1.0001
+        ratios = ratio_engine.compute_ratios(table)
+        ratio_engine.evaluate_rules(table, ratios).decisions()
+
+    def all_names():
+        live.update("market_cap", live.values["market_cap"] * 1.0001)
+
+    def some_names():
+        live.update("market_cap", live.values["market_cap"][traded] * 1.0001, rows=traded)
+
+    baseline = per_tick(full)
+    print(f"{names:,} names, market_cap ticks "
+          f"({len(live.affected_ratios('market_cap'))} of {len(ratio_engine.RATIO_NAMES)} ratios affected)")
+    print(f"{'mode':<28} {'ms/tick':>9} {'speedup':>8}")
+    print(f"{'full recompute':<28} {baseline * 1e3:>9.3f} {1.0:>8.1f}")
+    for label, func in ((f"incremental, all names", all_names),
+                        (f"incremental, {len(traded):,} names", some_names)):
+        elapsed = per_tick(func)
+        print(f"{label:<28} {elapsed * 1e3:>9.3f} {baseline / elapsed:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
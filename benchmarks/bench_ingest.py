@@ -0,0 +1,49 @@
+"""Ingestion throughput and latency against the local stub server.
+
+Starts ingest_stub.py in a subprocess with simulated latency (2 ms + up to
+3 ms jitter) and 1% 503 errors, then fetches 100, 1k and 10k synthetic
+tickers (two documents each) and reports tickers/sec, request latency
+percentiles, retries and connections opened.
+
+Run from the repository root:  python benchmarks/bench_ingest.py [connections] [sizes...]
+"""
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import ingest
+
+DELAY = 0.002
+JITTER = 0.003
+ERROR_RATE = 0.01
+
+
+def main():
+    connections = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    sizes = [int(n) for n in sys.argv[2:]] or [100, 1_000, 10_000]
+    server = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, "ingest_stub.py"), "--port", "0", "--delay", str(DELAY),
+         "--jitter", str(JITTER), "--error-rate", str(ERROR_RATE)],
+        stdout=subprocess.PIPE, text=True)
+    try:
+        url = server.stdout.readline().split()[-1]
+        print(f"stub {url}: {DELAY * 1e3:g} ms + {JITTER * 1e3:g} ms jitter, {ERROR_RATE:.0%} errors, "
+              f"{connections} connections")
+        print(f"{'tickers':>8} {'seconds':>8} {'tickers/sec':>12} {'p50 ms':>8} {'p99 ms':>8} "
+              f"{'retries':>8} {'failed':>7} {'conns':>6}")
+        for size in sizes:
+            tickers = [f"B{i:06d}" for i in range(size)]
+            result = ingest.ingest(tickers, url, max_connections=connections)
+            print(f"{size:>8,} {result.seconds:>8.2f} {len(result.rows) / result.seconds:>12,.0f} "
+                  f"{result.latency(50) * 1e3:>8.1f} {result.latency(99) * 1e3:>8.1f} "
+                  f"{result.retried:>8,} {len(result.errors):>7,} {result.connections:>6}")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
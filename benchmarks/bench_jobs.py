@@ -0,0 +1,99 @@
+"""Event-loop frame times while a screen runs through jobs.JobRunner.
+
+A headless stand-in for the Tk main loop runs after() callbacks on the main
+thread and schedules a 60 Hz "frame" callback. The benchmark reports frame
+intervals (how late each frame fires) while a 100k-row file is screened in
+the background, and the time the loop would block if the same screen ran
+synchronously on the Tk thread as before.
+
+Run from the repository root:  python benchmarks/bench_jobs.py [rows]
+"""
+import heapq
+import itertools
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import jobs
+import ratio_engine
+import screener
+
+FRAME_MS = 16
+
+
+class HeadlessRoot:
+    """The subset of Tk's event loop JobRunner uses: after() and a main loop."""
+
+    def __init__(self):
+        self._timers = []
+        self._seq = itertools.count()
+        self.running = True
+
+    def after(self, ms, func):
+        heapq.heappush(self._timers, (time.perf_counter() + ms / 1000, next(self._seq), func))
+
+    def mainloop(self):
+        while self.running and self._timers:
+            due, _, func = heapq.heappop(self._timers)
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            func()
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame(rng.uniform(1e6, 1e9, size=(rows, len(ratio_engine.INPUT_FIELDS))),
+                         columns=list(ratio_engine.INPUT_FIELDS))
+    frame.insert(0, "ticker", [f"T{i:06d}" for i in range(rows)])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "fundamentals.parquet")
+        frame.to_parquet(path, index=False)
+
+        start = time.perf_counter()
+        for chunk in screener.iter_chunks(path, rows):
+            screener.screen_chunk(chunk)
+        blocked = time.perf_counter() - start
+        print(f"{rows:,} rows screened on the Tk thread: loop blocked for {blocked * 1e3:,.0f} ms")
+
+        for chunk_size in (5_000, jobs.DEFAULT_CHUNK_SIZE, 25_000):
+            root = HeadlessRoot()
+            runner = jobs.JobRunner(root)
+            frames = []
+            last = [time.perf_counter()]
+            partials = []
+
+            def tick():
+                now = time.perf_counter()
+                frames.append(now - last[0])
+                last[0] = now
+                if root.running:
+                    root.after(FRAME_MS, tick)
+
+            def done(result):
+                root.running = False
+
+            start = time.perf_counter()
+            runner.submit(jobs.screen_file, path, chunk_size=chunk_size,
+                          on_partial=partials.append, on_done=done, on_error=print)
+            root.after(FRAME_MS, tick)
+            root.mainloop()
+            elapsed = time.perf_counter() - start
+            runner.close()
+
+            intervals = np.array(frames) * 1e3
+            print(f"background, {chunk_size:>6,}-row chunks: {elapsed * 1e3:>7,.0f} ms total, "
+                  f"{len(partials)} partials, frame interval p50 {np.percentile(intervals, 50):5.1f} ms "
+                  f"p99 {np.percentile(intervals, 99):5.1f} ms max {intervals.max():5.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Cost of the metrics layer, and the stage breakdown it gives for a screen.
+
+Times metrics.observe() and metrics.timer() per call, and snapshot and
+Prometheus rendering. It then screens a synthetic fundamentals file
+(default 500k rows) through screener.run and prints the per-stage
+latencies and rows/sec that the run recorded.
+
+Run from the repository root:  python benchmarks/bench_metrics.py [rows]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import metrics
+import ratio_engine
+import screener
+
+CALLS = 200_000
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    registry = metrics.Metrics()
+
+    start = time.perf_counter()
+    for i in range(CALLS):
+        registry.observe("ratio", 0.001, 1)
+    print(f"{'observe()':<28} {(time.perf_counter() - start) / CALLS * 1e9:>8.0f} ns/call")
+    start = time.perf_counter()
+    for i in range(CALLS):
+        with registry.timer("rule", rows=1):
+            pass
+    print(f"{'timer() block':<28} {(time.perf_counter() - start) / CALLS * 1e9:>8.0f} ns/call")
+    start = time.perf_counter()
+    for i in range(1_000):
+        registry.snapshot()
+        registry.prometheus()
+    print(f"{'snapshot + prometheus':<28} {(time.perf_counter() - start) / 1_000 * 1e9:>8.0f} ns/call")
+
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame(rng.uniform(1e6, 1e9, size=(rows, len(ratio_engine.INPUT_FIELDS))),
+                         columns=list(ratio_engine.INPUT_FIELDS))
+    frame.insert(0, "ticker", [f"T{i:07d}" for i in range(rows)])
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "fundamentals.parquet")
+        frame.to_parquet(source, index=False)
+        metrics.METRICS.reset()
+        stats = screener.run(source, os.path.join(tmp, "results.parquet"))
+    print(f"\nscreen of {stats['rows']:,} rows in {stats['seconds']:.2f}s:")
+    for line in metrics.report():
+        print(f"  {line}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Speedup of parallel_screen.ParallelScreener from 1 to N workers.
+
+Run from the repository root:  python benchmarks/bench_parallel_screen.py [rows] [max_workers]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import parallel_screen
+import ratio_engine
+
+
+def best_of(func, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+    rng = np.random.default_rng(0)
+    table = rng.uniform(1e6, 1e9, size=(rows, len(ratio_engine.INPUT_FIELDS)))
+
+    def serial():
+        ratios = ratio_engine.compute_ratios(table)
+        ratio_engine.evaluate_rules(table, ratios)
+
+    baseline = best_of(serial)
+    print(f"{rows:,} rows, {os.cpu_count()} CPUs")
+    print(f"{'workers':>8} {'seconds':>10} {'rows/sec':>14} {'speedup':>8}")
+    print(f"{'serial':>8} {baseline:>10.3f} {rows / baseline:>14,.0f} {1.0:>8.2f}")
+
+    workers = 1
+    while workers <= max_workers:
+        with parallel_screen.ParallelScreener(workers=workers, capacity=rows) as pool:
+            pool.screen(table)  # warm up the pool and shared buffers
+            elapsed = best_of(lambda: pool.screen(table))
+        print(f"{workers:>8} {elapsed:>10.3f} {rows / elapsed:>14,.0f} {baseline / elapsed:>8.2f}")
+        workers = workers * 2 if workers * 2 <= max_workers or workers == max_workers else max_workers
+
+
+if __name__ == "__main__":
+    main()
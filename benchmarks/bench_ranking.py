@@ -0,0 +1,83 @@
+"""Cross-sectional ranking index latency (default 100k companies in 11 sectors).
+
+Times building the sorted arrays for every ratio (universe and sectors),
+then single queries: percentile rank, top-10, a two-clause percentile range
+query over the universe and per sector, an incremental update (with and
+without sectors) against a full rebuild, and the relative good-rule bitmaps.
+
+Run from the repository root:  python benchmarks/bench_ranking.py [rows]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ranking
+import ratio_engine
+import screener
+
+SECTORS = ("Energy", "Materials", "Industrials", "Consumer", "Staples", "Health", "Financials",
+           "Technology", "Communication", "Utilities", "Real Estate")
+QUERY = "Return on Equity (ROE) > p75, Debt to Equity Ratio < p25"
+REPEAT = 1_000
+
+
+def per_call(func, repeat=REPEAT):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame(rng.uniform(1e6, 1e9, size=(rows, len(ratio_engine.INPUT_FIELDS))),
+                         columns=list(ratio_engine.INPUT_FIELDS))
+    frame.insert(0, "ticker", [f"T{i:06d}" for i in range(rows)])
+    frame.insert(1, "sector", rng.choice(SECTORS, rows))
+    results = screener.screen_chunk(frame)
+    ratios = [name for name in ratio_engine.RATIO_NAMES if name in results]
+
+    start = time.perf_counter()
+    index = ranking.RankIndex(results, columns=ratios, key="ticker", group="sector")
+    for name in ratios:
+        for group in (None,) + index.group_names:
+            index.count(name, group)
+    print(f"{rows:,} rows x {len(ratios)} ratios, {len(index.group_names)} sectors")
+    print(f"{'build (universe + sectors)':<36} {(time.perf_counter() - start) * 1e3:>10.1f} ms")
+
+    column = "Return on Equity (ROE)"
+    tickers = [f"T{i:06d}" for i in rng.integers(0, rows, REPEAT)]
+    values = iter(rng.uniform(0, 50, REPEAT * 3))
+    flat = ranking.RankIndex(results, columns=[column], key="ticker")
+    flat.count(column)
+    timings = (
+        ("percentile rank", lambda: index.percentile_rank(column, 15.0)),
+        ("top-10", lambda: index.top(column, 10)),
+        ("top-10 in one sector", lambda: index.top(column, 10, group="Utilities")),
+        ("query, universe percentiles", lambda: index.query(QUERY)),
+        ("query, sector percentiles", lambda: index.query(QUERY, by_group=True)),
+        ("update one ratio", lambda: index.update(tickers[rng.integers(REPEAT)], {column: next(values)})),
+        ("update one ratio, no sectors", lambda: flat.update(tickers[rng.integers(REPEAT)], {column: next(values)})),
+    )
+    for label, func in timings:
+        print(f"{label:<36} {per_call(func) * 1e3:>10.3f} ms")
+
+    rebuilt = ranking.RankIndex(results, columns=[column], key="ticker", group="sector")
+    start = time.perf_counter()
+    for group in (None,) + rebuilt.group_names:
+        rebuilt.count(column, group)
+    print(f"{'full re-sort of one ratio':<36} {(time.perf_counter() - start) * 1e3:>10.3f} ms")
+
+    start = time.perf_counter()
+    index.is_good(ranking.relative_rules(), by_group=True)
+    print(f"{'relative good rules, by sector':<36} {(time.perf_counter() - start) * 1e3:>10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Throughput of ratio_engine.compute_ratios at 1k, 100k and 1M rows.
+
+Also times a dashboard-style request for 5 of the 44 ratios, which only
+evaluates those ratios' part of the expression graph.
+
+Run from the repository root:  python benchmarks/bench_ratio_engine.py
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ratio_engine
+
+
+def make_table(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    table = rng.uniform(1e6, 1e9, size=(rows, len(ratio_engine.INPUT_FIELDS)))
+    # Sprinkle some zero denominators to exercise the inf/NaN paths
+    table[rng.random(rows) < 0.01, ratio_engine.INPUT_FIELDS.index("inventory")] = 0.0
+    return table
+
+
+DASHBOARD_RATIOS = ('Return on Equity (ROE)', 'P/E Ratio', 'PEG Ratio', 'Debt to Equity Ratio', 'Free Cash Flow Yield')
+
+
+def best_of(func, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def full_run(table):
+    ratios = ratio_engine.compute_ratios(table)
+    ratio_engine.evaluate_rules(table, ratios).decisions()
+
+
+def main():
+    print(f"{'rows':>10} {'all + rules':>12} {'rows/sec':>14} {'5 ratios':>10} {'rows/sec':>14}")
+    for rows in (1_000, 100_000, 1_000_000):
+        table = make_table(rows)
+        columns = ratio_engine.as_columns(table)
+        full = best_of(lambda: full_run(table))
+        subset = best_of(lambda: ratio_engine.compute_ratios(columns, DASHBOARD_RATIOS))
+        print(f"{rows:>10,} {full:>12.4f} {rows / full:>14,.0f} {subset:>10.4f} {rows / subset:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
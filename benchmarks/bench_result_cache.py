@@ -0,0 +1,58 @@
+"""Cost of a cached versus uncached analysis for both tools.
+
+Replays a workload in which a small set of companies is re-analyzed over and
+over (as when re-running a screen or re-submitting the same filing), with
+the memory tier only and with the SQLite disk tier behind it.
+
+Run from the repository root:  python benchmarks/bench_result_cache.py
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ratio_engine
+import result_cache
+import valuation_core
+from bench_valuation_core import make_records
+
+
+def rate(func, items):
+    start = time.perf_counter()
+    for item in items:
+        func(item)
+    return len(items) / (time.perf_counter() - start)
+
+
+def main():
+    rng = np.random.default_rng(0)
+    companies = rng.uniform(1e6, 1e9, size=(500, len(ratio_engine.INPUT_FIELDS))).tolist()
+    tool_workload = [companies[i] for i in rng.integers(0, len(companies), size=20_000)]
+    records = make_records(500)
+    valuation_workload = [records[i] for i in rng.integers(0, len(records), size=20_000)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        caches = {
+            "memory": lambda: result_cache.ResultCache(),
+            "memory + sqlite": lambda: result_cache.ResultCache(path=os.path.join(tmp, "cache.sqlite")),
+        }
+        print(f"{'workload':<22} {'mode':<18} {'calls/sec':>12} {'hit ratio':>10}")
+        for name, workload, uncached, cached in (
+            ("stock-tool ratios", tool_workload, ratio_engine.compute_one, result_cache.analyze_tool),
+            ("valuation scoring", valuation_workload, valuation_core.analyze, result_cache.analyze_valuation),
+        ):
+            print(f"{name:<22} {'uncached':<18} {rate(uncached, workload):>12,.0f} {'-':>10}")
+            for mode, make in caches.items():
+                cache = make()
+                calls = rate(lambda item: cached(item, cache), workload)
+                print(f"{name:<22} {mode:<18} {calls:>12,.0f} {cache.stats()['hit_ratio']:>10.1%}")
+                cache.clear()
+                cache.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Cost of the results grid over a large screen (default 100k companies x 44 ratios).
+
+Times building the model (pass bitmaps included), sorting by every ratio
+(first and cached), filtering, and producing the cells for one visible
+window at random scroll positions, which is the model's share of a frame.
+If a display is available, it also times full ResultsGrid redraws in Tk.
+
+Run from the repository root:  python benchmarks/bench_results_grid.py [rows]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ratio_engine
+import results_grid
+import screener
+
+VISIBLE_ROWS = 30
+VISIBLE_COLUMNS = 8
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame(rng.uniform(1e6, 1e9, size=(rows, len(ratio_engine.INPUT_FIELDS))),
+                         columns=list(ratio_engine.INPUT_FIELDS))
+    frame.insert(0, "ticker", [f"T{i:06d}" for i in range(rows)])
+    results = screener.screen_chunk(frame)
+
+    start = time.perf_counter()
+    model = results_grid.GridModel.from_results(results, key="ticker")
+    print(f"{rows:,} rows x {len(model.names)} columns")
+    print(f"{'build model + bitmaps':<36} {(time.perf_counter() - start) * 1e3:>9.1f} ms")
+
+    ratios = list(ratio_engine.RATIO_NAMES)
+    start = time.perf_counter()
+    for name in ratios:
+        model.sort(name)
+    print(f"{'first sort, per ratio':<36} {(time.perf_counter() - start) / len(ratios) * 1e3:>9.2f} ms")
+    start = time.perf_counter()
+    for name in ratios:
+        model.sort(name, descending=True)
+    print(f"{'cached sort, per ratio':<36} {(time.perf_counter() - start) / len(ratios) * 1e3:>9.2f} ms")
+
+    start = time.perf_counter()
+    model.filter(model.where("Return on Equity (ROE) > 15, Profit Margin > 0.1, Stock Decision == BUY"))
+    print(f"{'filter (3 clauses)':<36} {(time.perf_counter() - start) * 1e3:>9.2f} ms  ({len(model):,} rows left)")
+    model.filter(None)
+
+    columns = model.names[:VISIBLE_COLUMNS + 1]
+    tops = rng.integers(0, rows - VISIBLE_ROWS, size=2_000)
+    start = time.perf_counter()
+    for top in tops:
+        model.window(int(top), int(top) + VISIBLE_ROWS, columns)
+    per_frame = (time.perf_counter() - start) / len(tops)
+    print(f"{'visible window cells, per frame':<36} {per_frame * 1e3:>9.3f} ms  "
+          f"({VISIBLE_ROWS} x {len(columns)} cells)")
+
+    try:
+        import tkinter as tk
+
+        root = tk.Tk()
+    except Exception as e:
+        print(f"Tk redraw: skipped ({e.__class__.__name__}: no display)")
+        return
+    grid = results_grid.ResultsGrid(root, model, visible_rows=VISIBLE_ROWS, visible_columns=VISIBLE_COLUMNS)
+    grid.frame.pack()
+    root.update()
+    start = time.perf_counter()
+    for top in tops[:500]:
+        grid.top = int(top)
+        grid.refresh()
+        root.update_idletasks()
+    print(f"{'Tk redraw, per frame':<36} {(time.perf_counter() - start) / 500 * 1e3:>9.3f} ms")
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
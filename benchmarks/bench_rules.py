@@ -0,0 +1,51 @@
+"""Rows/sec of compiled rule evaluation over a whole batch.
+
+Compares RuleSet.evaluate (one vectorized pass over every rule) with the
+per-ratio scalar check the GUI uses.
+
+Run from the repository root:  python benchmarks/bench_rules.py
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ratio_engine
+import rules
+
+
+def main():
+    ruleset = rules.stock_tool_rules()
+    rng = np.random.default_rng(0)
+    print(f"{len(ruleset.rules)} rules")
+    print(f"{'rows':>10} {'evaluate s':>11} {'rows/sec':>14}")
+    for rows in (1_000, 100_000, 1_000_000):
+        table = rng.uniform(1e6, 1e9, size=(rows, len(ratio_engine.INPUT_FIELDS)))
+        merged = ratio_engine.rule_table(table, ratio_engine.compute_ratios(table))
+        best = float("inf")
+        for _ in range(3):
+            start = time.perf_counter()
+            result = ruleset.evaluate(merged)
+            result.scores()
+            result.decisions()
+            best = min(best, time.perf_counter() - start)
+        print(f"{rows:>10,} {best:>11.4f} {rows / best:>14,.0f}")
+
+    # Scalar baseline: one check() per ratio per company, as show_results does
+    rows = 10_000
+    table = rng.uniform(1e6, 1e9, size=(rows, len(ratio_engine.INPUT_FIELDS)))
+    ratios = ratio_engine.compute_ratios(table)
+    records = [{name: float(values[i]) for name, values in ratios.items()} for i in range(rows)]
+    start = time.perf_counter()
+    for record in records:
+        for name, value in record.items():
+            ruleset.check(name, value, group="good")
+    elapsed = time.perf_counter() - start
+    print(f"scalar check() baseline: {rows / elapsed:,.0f} rows/sec")
+
+
+if __name__ == "__main__":
+    main()
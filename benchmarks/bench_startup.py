@@ -0,0 +1,104 @@
+"""Process start to first result for one company, with an import breakdown.
+
+Launches `python -m stock_cli` for a single stock-analysis (valuation) and
+stock-tool company, with and without --dcf, and times each from spawn to
+the first line of output (best and median of several runs) against the
+100 ms target. It then reruns each once under `-X importtime` and lists the
+slowest top-level imports and which heavy modules were loaded. Importing
+the two GUI scripts (without starting Tk) is timed the same way.
+
+Run from the repository root:  python benchmarks/bench_startup.py [runs]
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import ratio_engine
+import valuation_core
+
+TARGET = 0.100
+HEAVY = ("numpy", "pandas", "pyarrow", "openpyxl", "tkinter", "asyncio", "sqlite3")
+TOP_IMPORTS = 5
+
+VALUATION = {
+    "revenue": 1000, "net_income": 120, "operating_profit": 150, "gross_profit": 400, "stock_price": 25,
+    "book_value": 800, "free_cash_flow": 90, "total_assets": 2000, "total_liabilities": 900,
+    "interest_expense": 20, "growth_rate": 5, "dividends": 30,
+}
+TOOL = dict(zip(ratio_engine.INPUT_FIELDS, (
+    1000, 120, 2000, 1100, 600, 400, 150, 900, 40, 200, 3000, 30, 600, 80, 120, 70, 100, 100, 900, 28, 1900)))
+
+# A GUI script imported as a module, so its __main__ block does not run
+GUI_IMPORT = ("import importlib.util, sys; sys.path.insert(0, {root!r}); "
+              "spec = importlib.util.spec_from_file_location('gui', {path!r}); "
+              "spec.loader.exec_module(importlib.util.module_from_spec(spec)); print('imported')")
+
+
+def first_line_seconds(command):
+    start = time.perf_counter()
+    process = subprocess.Popen(command, cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    process.stdout.readline()
+    seconds = time.perf_counter() - start
+    process.stdout.read()
+    if process.wait():
+        raise RuntimeError(f"{' '.join(command)} exited with {process.returncode}")
+    return seconds
+
+
+def import_profile(command):
+    """(top-level imports by cumulative microseconds, heavy modules loaded) from -X importtime."""
+    stderr = subprocess.run([command[0], "-X", "importtime"] + command[1:], cwd=ROOT, stdout=subprocess.DEVNULL,
+                            stderr=subprocess.PIPE, text=True, check=True).stderr
+    top, loaded = [], set()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        module = name.strip()
+        if module.split(".")[0] in HEAVY:
+            loaded.add(module.split(".")[0])
+        if not name.startswith("  "):
+            top.append((int(cumulative), module))
+    return sorted(top, reverse=True), [name for name in HEAVY if name in loaded]
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    cli = [sys.executable, "-m", "stock_cli"]
+    cases = [
+        ("valuation", cli + ["valuation"] + [f"{k}={v}" for k, v in VALUATION.items()]),
+        ("tool", cli + ["tool"] + [f"{k}={v}" for k, v in TOOL.items()]),
+        ("valuation --dcf", cli + ["valuation", "--dcf"] + [f"{k}={v}" for k, v in VALUATION.items()]),
+        ("tool --dcf", cli + ["tool", "--dcf"] + [f"{k}={v}" for k, v in TOOL.items()]),
+        ("python -c pass", [sys.executable, "-c", "print()"]),
+    ]
+    for script in ("stock-analysis.py", "stock-tool.py"):
+        cases.append((f"import {script}", [sys.executable, "-c", GUI_IMPORT.format(root=ROOT, path=os.path.join(ROOT, script))]))
+    assert len(VALUATION) == len(valuation_core.INPUT_FIELDS)
+
+    print(f"{'case':<26} {'best ms':>8} {'median ms':>10} {'target':>7}  heavy imports")
+    profiles = []
+    for name, command in cases:
+        try:
+            times = [first_line_seconds(command) for _ in range(runs)]
+        except RuntimeError as e:
+            print(f"{name:<26} failed: {e}")
+            continue
+        top, heavy = import_profile(command)
+        profiles.append((name, top))
+        verdict = ("ok" if min(times) < TARGET else "over") if name in ("valuation", "tool") else ""
+        print(f"{name:<26} {min(times) * 1e3:>8.1f} {statistics.median(times) * 1e3:>10.1f} {verdict:>7}  "
+              f"{', '.join(heavy) or '-'}")
+
+    print(f"\nslowest top-level imports (-X importtime, cumulative ms):")
+    for name, top in profiles:
+        print(f"  {name:<24} " + ", ".join(f"{module} {us / 1e3:.1f}" for us, module in top[:TOP_IMPORTS]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Sensitivity sweep latency for one company: grid points per second.
+
+Default: a 500-point line, a 500 x 500 grid and a 63 x 63 x 63 cube, for
+the valuation Final Decision (stock price, growth rate, interest expense)
+and for the tool's Stock / Recovery Decisions (market cap, revenue, total
+liabilities). Breakpoint extraction along the first axis is timed
+separately.
+
+Run from the repository root:  python benchmarks/bench_sweep.py [steps]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ratio_engine
+import sweep
+import valuation_core
+
+VALUATION_BASE = {
+    "revenue": 4e9, "net_income": 5e8, "operating_profit": 8e8, "gross_profit": 1.6e9, "stock_price": 1.5,
+    "book_value": 3e9, "free_cash_flow": 4e8, "total_assets": 5e9, "total_liabilities": 2e9,
+    "interest_expense": 1e8, "growth_rate": 8, "dividends": 0.05,
+}
+VALUATION_AXES = {
+    "stock_price": (0.01, 3), "growth_rate": (-5, 30), "interest_expense": (0, 1e9),
+}
+TOOL_AXES = {
+    "market_cap": (1e8, 1e10), "revenue": (1e8, 5e9), "total_liabilities": (0, 4e9),
+}
+
+
+def grids(ranges, steps, count):
+    return {name: np.linspace(low, high, steps) for name, (low, high) in list(ranges.items())[:count]}
+
+
+def main():
+    steps = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    rng = np.random.default_rng(0)
+    tool_base = dict(zip(ratio_engine.INPUT_FIELDS, rng.uniform(1e8, 1e9, len(ratio_engine.INPUT_FIELDS))))
+    assert set(VALUATION_BASE) == set(valuation_core.INPUT_FIELDS)
+
+    print(f"{'tool':<10} {'grid':<16} {'sweep ms':>9} {'breakpoints ms':>15} {'points/sec':>14}")
+    for label, func, base, ranges, decision in (
+            ("valuation", sweep.sweep_valuation, VALUATION_BASE, VALUATION_AXES, "Final Decision"),
+            ("tool", sweep.sweep_stock_tool, tool_base, TOOL_AXES, "Stock Decision")):
+        for count, size in ((1, steps), (2, steps), (3, max(2, round(steps ** (2 / 3))))):
+            axes = grids(ranges, size, count)
+            func(base, axes)
+            start = time.perf_counter()
+            result = func(base, axes)
+            elapsed = time.perf_counter() - start
+            start = time.perf_counter()
+            result.breakpoints(decision, axis=0)
+            flips = time.perf_counter() - start
+            points = int(np.prod(result.shape))
+            shape = " x ".join(str(n) for n in result.shape)
+            print(f"{label:<10} {shape:<16} {elapsed * 1e3:>9.1f} {flips * 1e3:>15.1f} {points / elapsed:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
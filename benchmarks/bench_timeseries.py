@@ -0,0 +1,93 @@
+"""Time-series store: per-ticker history loads and windowed growth metrics.
+
+Builds a store of quarterly history (default 3,000 tickers x 80 quarters,
+i.e. 20 years) and times opening it, loading one ticker's history (versus
+filtering a Parquet file), and computing CAGR / rolling mean / trend slope
+for every ticker (versus a pandas groupby().rolling()).
+
+Run from the repository root:  python benchmarks/bench_timeseries.py [tickers] [quarters]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ratio_engine
+import timeseries
+
+FIELDS = [name for name in ratio_engine.INPUT_FIELDS if not name.startswith("prev_")]
+
+
+def make_history(tickers, quarters, seed=0):
+    rng = np.random.default_rng(seed)
+    rows = tickers * quarters
+    growth = np.cumprod(rng.normal(1.01, 0.05, size=(tickers, quarters)), axis=1).ravel()
+    frame = pd.DataFrame(rng.uniform(1e6, 1e9, size=(rows, len(FIELDS))) * growth[:, None], columns=FIELDS)
+    frame.insert(0, "period", np.tile(np.arange(2005 * 4, 2005 * 4 + quarters), tickers))
+    frame.insert(0, "ticker", np.repeat([f"T{i:05d}" for i in range(tickers)], quarters))
+    return frame
+
+
+def best_of(func, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    tickers = int(sys.argv[1]) if len(sys.argv) > 1 else 3_000
+    quarters = int(sys.argv[2]) if len(sys.argv) > 2 else 80
+    frame = make_history(tickers, quarters)
+    print(f"{tickers:,} tickers x {quarters} quarters = {len(frame):,} rows, {len(FIELDS)} fields")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "store")
+        start = time.perf_counter()
+        timeseries.TimeSeriesStore.build(path, frame)
+        print(f"{'build store':<40} {time.perf_counter() - start:>10.3f} s")
+        print(f"{'open store':<40} {best_of(lambda: timeseries.TimeSeriesStore(path)) * 1e3:>10.3f} ms")
+
+        store = timeseries.TimeSeriesStore(path)
+        names = list(store.tickers)
+        sample = [names[i] for i in np.random.default_rng(1).integers(0, len(names), size=1_000)]
+
+        def load_histories():
+            for ticker in sample:
+                np.asarray(store.history(ticker)["revenue"])
+
+        per_ticker = best_of(load_histories) / len(sample)
+        print(f"{'history() per ticker':<40} {per_ticker * 1e6:>10.1f} us")
+
+        parquet = os.path.join(tmp, "history.parquet")
+        frame.to_parquet(parquet, index=False)
+        start = time.perf_counter()
+        for ticker in sample[:20]:
+            pd.read_parquet(parquet, filters=[("ticker", "==", ticker)])
+        per_ticker = (time.perf_counter() - start) / 20
+        print(f"{'parquet read + filter per ticker':<40} {per_ticker * 1e6:>10.1f} us")
+
+        window = 5 * timeseries.PERIODS_PER_YEAR
+        seconds = best_of(lambda: (store.cagr("revenue", window), store.rolling_mean("revenue", window),
+                                   store.trend_slope("revenue", window)))
+        print(f"{'cagr + mean + slope, all tickers':<40} {seconds * 1e3:>10.1f} ms")
+
+        grouped = frame.groupby("ticker")["revenue"]
+        start = time.perf_counter()
+        grouped.transform(lambda x: (x / x.shift(window)) ** (4 / window) - 1)
+        grouped.transform(lambda x: x.rolling(window).mean())
+        print(f"{'pandas groupby cagr + mean (no slope)':<40} {(time.perf_counter() - start) * 1e3:>10.1f} ms")
+
+        seconds = best_of(lambda: store.growth_metrics(["revenue", "net_profit", "dividend", "total_assets"]), 3)
+        print(f"{'growth_metrics(4 fields, 5y + 10y)':<40} {seconds * 1e3:>10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Calls/sec of valuation_core for single-record and batched scoring.
+
+Run from the repository root:  python benchmarks/bench_valuation_core.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import valuation_core
+
+
+def make_records(count, seed=0):
+    rng = random.Random(seed)
+    records = []
+    for _ in range(count):
+        total_assets = rng.uniform(1e6, 1e9)
+        records.append(valuation_core.ValuationInputs(
+            revenue=rng.uniform(1e6, 1e9),
+            net_income=rng.uniform(-1e7, 1e8),
+            operating_profit=rng.uniform(-1e7, 2e8),
+            gross_profit=rng.uniform(1e5, 5e8),
+            stock_price=rng.uniform(1, 500),
+            book_value=rng.uniform(1e5, 1e9),
+            free_cash_flow=rng.uniform(-1e7, 1e8),
+            total_assets=total_assets,
+            total_liabilities=total_assets * rng.uniform(0.1, 0.9),
+            interest_expense=rng.uniform(0, 1e7),
+            growth_rate=rng.uniform(-5, 25),
+            dividends=rng.uniform(0, 10),
+        ))
+    return records
+
+
+def main():
+    records = make_records(100_000)
+
+    # Single record, repeated calls
+    record = records[0]
+    calls = 200_000
+    start = time.perf_counter()
+    for _ in range(calls):
+        valuation_core.analyze(record)
+    elapsed = time.perf_counter() - start
+    print(f"single analyze():    {calls / elapsed:>12,.0f} calls/sec")
+
+    result = valuation_core.compute(record)
+    start = time.perf_counter()
+    for _ in range(calls):
+        valuation_core.score(result)
+    elapsed = time.perf_counter() - start
+    print(f"single score():      {calls / elapsed:>12,.0f} calls/sec")
+
+    # Batched
+    start = time.perf_counter()
+    valuation_core.analyze_batch(records)
+    elapsed = time.perf_counter() - start
+    print(f"analyze_batch(100k): {len(records) / elapsed:>12,.0f} records/sec")
+
+
+if __name__ == "__main__":
+    main()
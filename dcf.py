@@ -0,0 +1,250 @@
+"""Monte Carlo discounted-cash-flow valuation.
+
+Each company's free cash flow is grown for `years` years and discounted,
+and a Gordon terminal value is added. Growth, discount rate and terminal
+growth are distributions, so every company gets `paths` simulated values
+per share. These are summarized as percentile bands (value_p10 ...
+value_p90). The bands feed the DCF Decision rules in config/dcf_rules.json,
+which compare the market price with the bands.
+
+The DCF Decision is shown next to the rule-based Stock Decision (stock-tool)
+and Final Decision (stock-analysis); it is not folded into them. Those rule
+sets also drive screening, sweeps, ranking and the result cache, which run
+without simulating, so adding band rules to them would make every one of
+those paths pay for (or fake) a Monte Carlo run.
+
+Paths are simulated as NumPy arrays over (companies x paths) blocks, with
+companies processed in chunks sized so a block's working arrays fit in
+`max_bytes`. When growth is constant along a path, the discounted sum over
+the years is a geometric series and is evaluated in closed form. With
+yearly growth noise, the year axis is walked in a loop. Results are
+reproducible for a given seed and chunking.
+
+    result = dcf.simulate(fcf, shares, growth=dcf.Normal(0.08, 0.05), paths=10_000, seed=1)
+    result.bands["value_p50"], dcf.decide(result.bands, price)
+"""
+import numpy as np
+
+import ratio_engine
+import rules
+
+DEFAULT_YEARS = 10
+DEFAULT_PATHS = 10_000
+DEFAULT_PERCENTILES = (10, 25, 50, 75, 90)
+DEFAULT_MAX_BYTES = 128 * 1024 * 1024
+# Per-company growth estimates are clipped to this range before simulating
+GROWTH_LIMITS = (-0.5, 0.5)
+# Working arrays per (path, company) cell in a chunk
+_WORKING_ARRAYS = 8
+
+
+class Fixed:
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def sample(self, rng, size):
+        return np.broadcast_to(np.asarray(self.value, dtype=np.float64), size)
+
+
+class Normal:
+    __slots__ = ("mean", "std")
+
+    def __init__(self, mean, std):
+        self.mean = mean
+        self.std = std
+
+    def sample(self, rng, size):
+        # Cheaper than rng.normal() when mean/std are per-company arrays
+        return self.mean + self.std * rng.standard_normal(size)
+
+
+class Uniform:
+    __slots__ = ("low", "high")
+
+    def __init__(self, low, high):
+        self.low = low
+        self.high = high
+
+    def sample(self, rng, size):
+        return rng.uniform(self.low, self.high, size)
+
+
+class Triangular:
+    __slots__ = ("low", "mode", "high")
+
+    def __init__(self, low, mode, high):
+        self.low = low
+        self.mode = mode
+        self.high = high
+
+    def sample(self, rng, size):
+        return rng.triangular(self.low, self.mode, self.high, size)
+
+
+DEFAULT_DISCOUNT_RATE = Triangular(0.07, 0.09, 0.12)
+DEFAULT_TERMINAL_GROWTH = Uniform(0.01, 0.03)
+DEFAULT_GROWTH_STD = 0.05
+
+
+def _distribution(spec):
+    return spec if hasattr(spec, "sample") else Fixed(spec)
+
+
+def _chunk(spec, start, stop, companies):
+    """The distribution restricted to companies [start, stop), for per-company parameters."""
+    def part(value):
+        value = np.asarray(value, dtype=np.float64)
+        return value[start:stop, None] if value.ndim and value.shape[-1] == companies else value
+
+    return type(spec)(*(part(getattr(spec, name)) for name in type(spec).__slots__))
+
+
+def percentile_bands(values, qs):
+    """Linear-interpolated percentiles of each row of `values`, ignoring NaN.
+
+    Sorting once and indexing is much faster than np.nanpercentile over
+    thousands of rows.
+    """
+    ordered = np.sort(values, axis=1)
+    valid = np.count_nonzero(~np.isnan(values), axis=1)
+    rows = np.arange(values.shape[0])
+    bands = {}
+    for q in qs:
+        position = q / 100 * np.maximum(valid - 1, 0)
+        lower = np.floor(position).astype(np.intp)
+        upper = np.minimum(lower + 1, np.maximum(valid - 1, 0))
+        fraction = position - lower
+        band = ordered[rows, lower] * (1 - fraction) + ordered[rows, upper] * fraction
+        bands[q] = np.where(valid > 0, band, np.nan)
+    return bands
+
+
+class DcfResult:
+    __slots__ = ("bands", "mean", "valid")
+
+    def __init__(self, bands, mean, valid):
+        self.bands = bands
+        self.mean = mean
+        self.valid = valid
+
+
+def simulate(fcf, shares, growth, discount_rate=DEFAULT_DISCOUNT_RATE, terminal_growth=DEFAULT_TERMINAL_GROWTH,
+             net_debt=0.0, years=DEFAULT_YEARS, paths=DEFAULT_PATHS, growth_volatility=0.0,
+             percentiles=DEFAULT_PERCENTILES, seed=None, max_bytes=DEFAULT_MAX_BYTES):
+    """Simulate intrinsic value per share for a batch of companies.
+
+    `fcf`, `shares` and `net_debt` are per-company arrays (or scalars).
+    `growth`, `discount_rate` and `terminal_growth` are numbers, per-company
+    arrays or distributions (Fixed, Normal, Uniform, Triangular) whose
+    parameters may be per-company arrays; each is drawn once per path.
+    `growth_volatility` adds independent yearly noise to the growth rate.
+    Paths where the discount rate does not exceed terminal growth have no
+    terminal value and are left out of the bands; `valid` is the fraction of
+    paths kept. `seed` is an int or a np.random.SeedSequence.
+    """
+    fcf = np.atleast_1d(np.asarray(fcf, dtype=np.float64))
+    companies = len(fcf)
+    shares = np.broadcast_to(np.asarray(shares, dtype=np.float64), companies)
+    net_debt = np.broadcast_to(np.asarray(net_debt, dtype=np.float64), companies)
+    growth, discount_rate, terminal_growth = (_distribution(spec) for spec in (growth, discount_rate, terminal_growth))
+    if years <= 0 or paths <= 0:
+        raise ValueError("years and paths must be positive")
+
+    chunk = max(1, int(max_bytes // (paths * 8 * _WORKING_ARRAYS)))
+    starts = range(0, companies, chunk)
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    rngs = [np.random.default_rng(child) for child in seed.spawn(len(starts))]
+
+    bands = {f"value_p{q}": np.empty(companies) for q in percentiles}
+    mean = np.empty(companies)
+    valid = np.empty(companies)
+    for rng, start in zip(rngs, starts):
+        stop = min(start + chunk, companies)
+        size = (stop - start, paths)
+        g = _chunk(growth, start, stop, companies).sample(rng, size)
+        r = _chunk(discount_rate, start, stop, companies).sample(rng, size)
+        tg = _chunk(terminal_growth, start, stop, companies).sample(rng, size)
+        cash = fcf[start:stop, None]
+
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            if growth_volatility:
+                cash = np.repeat(cash, paths, axis=1)
+                discount = np.ones(size)
+                present_value = np.zeros(size)
+                step = 1 / (1 + r)
+                base = 1 + g
+                for _ in range(years):
+                    # In place: cash *= 1 + g + noise; present_value += cash * discount
+                    noise = rng.standard_normal(size)
+                    noise *= growth_volatility
+                    noise += base
+                    cash *= noise
+                    discount *= step
+                    np.multiply(cash, discount, out=noise)
+                    present_value += noise
+                terminal_cash = cash * discount
+            else:
+                # sum over t = 1..years of cash * q**t, with q = (1 + g) / (1 + r)
+                q = (1 + g) / (1 + r)
+                q_years = q ** years
+                series = np.where(np.abs(q - 1) < 1e-12, years, q * (1 - q_years) / (1 - q))
+                present_value = cash * series
+                terminal_cash = cash * q_years
+
+            ok = r > tg
+            terminal = np.where(ok, terminal_cash * (1 + tg) / (r - tg), np.nan)
+            values = (present_value + terminal - net_debt[start:stop, None]) / shares[start:stop, None]
+
+        for q, band in percentile_bands(values, percentiles).items():
+            bands[f"value_p{q}"][start:stop] = band
+        kept = np.count_nonzero(ok, axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean[start:stop] = np.nansum(values, axis=1) / kept
+        valid[start:stop] = kept / paths
+    return DcfResult(bands, mean, valid)
+
+
+def decide(bands, price, ruleset=None):
+    """DCF Decision labels from the price per share and the value bands."""
+    ruleset = ruleset or rules.dcf_rules()
+    table = dict(bands)
+    table["price"] = np.broadcast_to(np.asarray(price, dtype=np.float64), len(next(iter(bands.values()))))
+    return ruleset.evaluate(table).decisions()["DCF Decision"]
+
+
+def _growth_center(growth):
+    with np.errstate(invalid="ignore"):
+        return np.clip(np.asarray(growth, dtype=np.float64), *GROWTH_LIMITS)
+
+
+def value_stock_tool(table, **options):
+    """Simulate stock-tool.py companies (ratio_engine.INPUT_FIELDS).
+
+    FCF is cash flow - capex, growth centres on revenue growth, and the
+    price per share is market cap / shares. Returns (DcfResult, price).
+    """
+    columns = ratio_engine.as_columns(table)
+    ratios = ratio_engine.compute_ratios(columns, names=["Free Cash Flow", "Revenue Growth"])
+    shares = np.asarray(columns["num_shares"], dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        price = np.asarray(columns["market_cap"], dtype=np.float64) / shares
+    options.setdefault("growth", Normal(_growth_center(ratios["Revenue Growth"]), DEFAULT_GROWTH_STD))
+    return simulate(ratios["Free Cash Flow"], shares, **options), price
+
+
+def value_valuation(table, **options):
+    """Simulate stock-analysis.py companies (valuation_core.INPUT_FIELDS).
+
+    Like the tool's per-share ratios, equity (total assets - total
+    liabilities) stands in for the share count, and growth centres on the
+    entered growth rate (%). Returns (DcfResult, price).
+    """
+    def column(name):
+        return np.atleast_1d(np.asarray(table[name], dtype=np.float64))
+
+    shares = column("total_assets") - column("total_liabilities")
+    options.setdefault("growth", Normal(_growth_center(column("growth_rate") / 100), DEFAULT_GROWTH_STD))
+    return simulate(column("free_cash_flow"), shares, **options), column("stock_price")
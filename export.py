@@ -0,0 +1,221 @@
+"""Streaming bulk export of analysis results.
+
+ExportWriter appends batches of results (DataFrames, Arrow tables or column
+mappings) to one file, so thousands of companies can be exported without
+holding them all in memory:
+
+    .parquet / .pq           Parquet, zstd compressed
+    .arrow / .feather        Arrow IPC file, zstd compressed
+    .csv / .csv.gz           CSV (gzip when the name ends in .gz)
+    .xlsx                    Excel via openpyxl's write-only mode (optional)
+
+XLSX is much slower and larger than the columnar formats, so it is meant as a
+final render of an export: render_xlsx() streams an existing Parquet, Arrow
+or CSV export into a workbook.
+"""
+import math
+import os
+import time
+
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+import metrics
+
+XLSX_MAX_ROWS = 1_048_576
+DEFAULT_BATCH_SIZE = 65_536
+
+
+def export_format(path):
+    """The export format implied by a file name."""
+    name = path.lower()
+    if name.endswith(".gz"):
+        name = name[:-3]
+    ext = os.path.splitext(name)[1]
+    if ext in (".parquet", ".pq"):
+        return "parquet"
+    if ext in (".arrow", ".feather", ".ipc"):
+        return "arrow"
+    if ext in (".csv", ".txt"):
+        return "csv"
+    if ext == ".xlsx":
+        return "xlsx"
+    raise ValueError(f"Unsupported export type: {path} (expected .parquet, .arrow, .csv or .xlsx)")
+
+
+def to_table(batch):
+    """Convert a DataFrame, Arrow table/batch, record list or column mapping to an Arrow table."""
+    if isinstance(batch, pa.Table):
+        return batch
+    if isinstance(batch, pa.RecordBatch):
+        return pa.Table.from_batches([batch])
+    if isinstance(batch, list):
+        return pa.Table.from_pylist(batch)
+    if hasattr(batch, "to_numpy") and hasattr(batch, "columns"):
+        return pa.Table.from_pandas(batch, preserve_index=False)
+    return pa.table(dict(batch))
+
+
+class _XlsxWriter:
+    """Row-streaming XLSX output, rolling over to a new sheet when one is full."""
+
+    def __init__(self, path, sheet_name):
+        try:
+            from openpyxl import Workbook
+        except ImportError:
+            raise ValueError("XLSX export needs openpyxl; install it or export to .parquet/.csv") from None
+        self.path = path
+        self.sheet_name = sheet_name
+        self.workbook = Workbook(write_only=True)
+        self.header = None
+        self.sheet = None
+        self.sheets = 0
+        self.sheet_rows = 0
+
+    def _new_sheet(self):
+        self.sheets += 1
+        title = self.sheet_name if self.sheets == 1 else f"{self.sheet_name} {self.sheets}"
+        self.sheet = self.workbook.create_sheet(title)
+        self.sheet.append(self.header)
+        self.sheet_rows = 1
+
+    def write_table(self, table):
+        if self.header is None:
+            self.header = list(table.column_names)
+            self._new_sheet()
+        columns = [[_cell(value) for value in column.to_pylist()] for column in table.columns]
+        for row in zip(*columns):
+            if self.sheet_rows == XLSX_MAX_ROWS:
+                self._new_sheet()
+            self.sheet.append(row)
+            self.sheet_rows += 1
+
+    def close(self):
+        if self.header is None:
+            self.workbook.create_sheet(self.sheet_name)
+        self.workbook.save(self.path)
+
+
+def _writer_schema(schema):
+    """`schema` with the types a later batch may still widen to.
+
+    Pandas chunks are typed one at a time: an int column turns float when a
+    later chunk has a missing value, and a column that is empty in the first
+    chunk is typed null. Both are widened up front (int to float64, null to
+    string) so later batches can be cast to the file's schema. The pandas
+    metadata describes the first chunk only, so it is dropped.
+    """
+    fields = []
+    for field in schema:
+        if pa.types.is_null(field.type):
+            field = field.with_type(pa.string())
+        elif pa.types.is_integer(field.type):
+            field = field.with_type(pa.float64())
+        fields.append(field)
+    return pa.schema(fields)
+
+
+def _cell(value):
+    # Same conventions as DataFrame.to_excel: NaN as an empty cell, infinities as text
+    if isinstance(value, float) and not math.isfinite(value):
+        return None if math.isnan(value) else ("inf" if value > 0 else "-inf")
+    return value
+
+
+class ExportWriter:
+    """Appends result batches to a Parquet, Arrow, CSV or XLSX file.
+
+    The schema is fixed by the first batch, with int columns widened to
+    float64 and all-null columns to string, and every later batch is cast to
+    it. Parquet and CSV go through Arrow writers; DataFrame.to_csv formats floats roughly 10x slower and would
+    dominate a bulk export.
+    """
+
+    def __init__(self, path, format=None, compression="zstd", sheet_name="Results"):
+        self.path = path
+        self.format = format or export_format(path)
+        self.compression = compression
+        self.sheet_name = sheet_name
+        self.rows = 0
+        self._writer = None
+        self._sink = None
+        self._schema = None
+
+    def _open(self, schema):
+        if self.format == "parquet":
+            return pq.ParquetWriter(self.path, schema, compression=self.compression)
+        if self.format == "xlsx":
+            return _XlsxWriter(self.path, self.sheet_name)
+        self._sink = pa.output_stream(self.path)
+        if self.format == "arrow":
+            options = ipc.IpcWriteOptions(compression=self.compression)
+            return ipc.new_file(self._sink, schema, options=options)
+        if self.format == "csv":
+            return pa_csv.CSVWriter(self._sink, schema)
+        raise ValueError(f"Unknown export format: {self.format}")
+
+    def write(self, batch):
+        """Append a batch of rows."""
+        start = time.perf_counter()
+        table = to_table(batch)
+        if self._writer is None:
+            self._schema = _writer_schema(table.schema)
+            self._writer = self._open(self._schema)
+        table = table.cast(self._schema)
+        self._writer.write_table(table)
+        self.rows += table.num_rows
+        metrics.count("export_batches")
+        metrics.observe("export", time.perf_counter() - start, table.num_rows)
+
+    def write_records(self, records):
+        """Append rows given as a list of {column: value} dicts."""
+        if records:
+            self.write(list(records))
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self._sink is not None:
+            self._sink.close()
+            self._sink = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def iter_batches(path, batch_size=DEFAULT_BATCH_SIZE):
+    """Yield Arrow record batches from a Parquet, Arrow or CSV export."""
+    fmt = export_format(path)
+    if fmt == "parquet":
+        yield from pq.ParquetFile(path).iter_batches(batch_size=batch_size)
+    elif fmt == "arrow":
+        with pa.memory_map(path) as source:
+            reader = ipc.open_file(source)
+            for i in range(reader.num_record_batches):
+                yield reader.get_batch(i)
+    elif fmt == "csv":
+        with pa.input_stream(path) as source:
+            yield from pa_csv.open_csv(source, read_options=pa_csv.ReadOptions(block_size=1 << 22))
+    else:
+        raise ValueError(f"Cannot read batches back from {path}")
+
+
+def render_xlsx(source_path, xlsx_path, sheet_name="Results", batch_size=DEFAULT_BATCH_SIZE):
+    """Render a Parquet, Arrow or CSV export as XLSX in constant memory. Returns the row count."""
+    with ExportWriter(xlsx_path, format="xlsx", sheet_name=sheet_name) as writer:
+        for batch in iter_batches(source_path, batch_size):
+            writer.write(batch)
+    return writer.rows
+
+
+def write_records(path, records, **options):
+    """Write a list of {column: value} dicts to `path` in one go. Returns the row count."""
+    with ExportWriter(path, **options) as writer:
+        writer.write_records(records)
+    return writer.rows
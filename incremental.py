@@ -0,0 +1,177 @@
+"""Incremental recomputation when single input fields change.
+
+IncrementalAnalysis keeps every input column, intermediate node, ratio, rule
+pass flag and decision of a batch in memory. When one field changes (for all
+rows or a subset of rows), only the ratio-graph nodes downstream of that
+field, the rules that read them and the decisions of the affected rule
+groups are recomputed, and a Changes record with just those values is pushed
+to subscribers.
+
+    live = incremental.for_stock_tool(frame)
+    live.subscribe(print)
+    live.update("market_cap", new_caps)
+"""
+import numpy as np
+
+import ratio_engine
+import rules
+import valuation_core
+
+
+class Changes:
+    """What an update recomputed. `rows` is None when the whole column changed,
+    in which case the arrays are live views that later updates overwrite.
+    """
+
+    __slots__ = ("field", "rows", "ratios", "passed", "decisions")
+
+    def __init__(self, field, rows, ratios, passed, decisions):
+        self.field = field
+        self.rows = rows
+        self.ratios = ratios
+        self.passed = passed
+        self.decisions = decisions
+
+    def __repr__(self):
+        return (f"Changes(field={self.field!r}, ratios={sorted(self.ratios)}, "
+                f"rules={sorted(self.passed)}, decisions={sorted(self.decisions)})")
+
+
+class _Plan:
+    """Precomputed recompute plan for one input field."""
+
+    __slots__ = ("graph", "ratios", "rule_index", "ruleset", "decisions")
+
+    def __init__(self, graph, ratios, rule_index, ruleset, decisions):
+        self.graph = graph
+        self.ratios = ratios
+        self.rule_index = rule_index
+        self.ruleset = ruleset
+        self.decisions = decisions
+
+
+class IncrementalAnalysis:
+    def __init__(self, table, graph, outputs, input_fields, ruleset):
+        self.graph = graph
+        self.outputs = outputs
+        self.input_fields = tuple(input_fields)
+        self.ruleset = ruleset
+
+        # Own copies, since later updates write into these arrays in place
+        self.values = {name: np.array(table[name], dtype=np.float64) for name in self.input_fields}
+        self.values.update(ratio_engine.evaluate_graph(graph, {node: node for node in graph}, self.values.__getitem__))
+        self.ratios = {name: self.values[node] for name, node in outputs.items()}
+
+        result = ruleset.evaluate(self._column_source())
+        self.passed = result.passed
+        # Wide enough for every label a decision can take, so in-place updates never truncate
+        widths = {d.name: max(len(label) for label in (d.default,) + tuple(l for _, l in d.bands))
+                  for d in ruleset.decisions}
+        self.decisions = {name: labels.astype(f"<U{widths[name]}") for name, labels in result.decisions().items()}
+
+        self._plans = {}
+        self._subscribers = []
+
+    def __len__(self):
+        return len(self.values[self.input_fields[0]])
+
+    def _column_source(self):
+        source = {name: self.values[name] for name in self.input_fields}
+        source.update(self.ratios)
+        return source
+
+    def _plan(self, field):
+        plan = self._plans.get(field)
+        if plan is not None:
+            return plan
+
+        # Nodes downstream of `field`, in dependency order
+        affected = set()
+        order = []
+
+        def visit(node):
+            if node in affected or node not in self.graph:
+                return
+            for arg in self.graph[node][1]:
+                if isinstance(arg, str):
+                    visit(arg)
+            if field in ratio_engine.input_dependencies(self.graph, node):
+                affected.add(node)
+                order.append(node)
+
+        for node in self.graph:
+            visit(node)
+        graph = {node: self.graph[node] for node in order}
+
+        ratio_names = tuple(name for name, node in self.outputs.items() if node in affected)
+        changed_columns = set(ratio_names) | {field}
+        rule_index = [i for i, rule in enumerate(self.ruleset.rules)
+                      if rule.column in changed_columns or rule.threshold in changed_columns]
+        ruleset = rules.RuleSet([self.ruleset.rules[i] for i in rule_index], version=self.ruleset.version)
+        groups = {rule.group for rule in ruleset.rules}
+        decisions = tuple(d.name for d in self.ruleset.decisions if d.group in groups)
+
+        plan = _Plan(graph, ratio_names, np.array(rule_index, dtype=np.intp), ruleset, decisions)
+        self._plans[field] = plan
+        return plan
+
+    def affected_ratios(self, field):
+        """Names of the ratios that depend on input `field`."""
+        return self._plan(field).ratios
+
+    def subscribe(self, callback):
+        """Call `callback(changes)` after every update."""
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        self._subscribers.remove(callback)
+
+    def update(self, field, values, rows=None):
+        """Set input `field` to `values` (for `rows`, or every row) and recompute what depends on it."""
+        if field not in self.input_fields:
+            raise ValueError(f"Unknown input field: {field}")
+        plan = self._plan(field)
+        index = slice(None) if rows is None else np.asarray(rows, dtype=np.intp)
+        self.values[field][index] = values
+
+        # Affected graph nodes, reading unaffected nodes and inputs from the cache
+        if plan.graph:
+            fresh = ratio_engine.evaluate_graph(plan.graph, {node: node for node in plan.graph},
+                                                lambda name: self.values[name][index])
+            for node, value in fresh.items():
+                self.values[node][index] = value
+
+        # Affected rules and the decisions of their groups
+        if plan.rule_index.size:
+            source = self._column_source()
+            result = plan.ruleset.evaluate({name: source[name][index] for name in plan.ruleset.columns})
+            if rows is None:
+                self.passed[plan.rule_index] = result.passed
+            else:
+                self.passed[np.ix_(plan.rule_index, index)] = result.passed
+        if plan.decisions:
+            selected = self.passed if rows is None else self.passed[:, index]
+            for name, labels in rules.RuleResult(self.ruleset, selected).decisions(plan.decisions).items():
+                self.decisions[name][index] = labels
+
+        changes = Changes(
+            field, rows,
+            {name: self.ratios[name][index] for name in plan.ratios},
+            {self.ruleset.rules[i].label: self.passed[i, index] for i in plan.rule_index},
+            {name: self.decisions[name][index] for name in plan.decisions},
+        )
+        for callback in list(self._subscribers):
+            callback(changes)
+        return changes
+
+
+def for_stock_tool(table, ruleset=None):
+    """Incremental analysis over stock-tool.py inputs (ratio_engine.INPUT_FIELDS)."""
+    return IncrementalAnalysis(ratio_engine.as_columns(table), ratio_engine.TOOL_GRAPH, ratio_engine.TOOL_RATIOS,
+                               ratio_engine.INPUT_FIELDS, ruleset or rules.stock_tool_rules())
+
+
+def for_valuation(table, ruleset=None):
+    """Incremental analysis over stock-analysis.py inputs (valuation_core.INPUT_FIELDS)."""
+    return IncrementalAnalysis(table, ratio_engine.VALUATION_GRAPH, ratio_engine.VALUATION_RATIOS,
+                               valuation_core.INPUT_FIELDS, ruleset or rules.valuation_rules())
@@ -0,0 +1,385 @@
+"""Asynchronous fundamentals and price ingestion over HTTP/JSON.
+
+Ingestor fetches each ticker's documents from a Source concurrently and
+fills ratio_engine's input table (a "ticker" column plus
+ratio_engine.INPUT_FIELDS), ready for ratio_engine.compute_ratios or
+screener.screen_chunk. Requests go through HttpClient:
+- a pool of keep-alive connections that also bounds concurrency;
+- retries with exponential backoff and jitter on connection errors,
+  timeouts, 429 and 5xx, honouring Retry-After up to `max_backoff`;
+- coalescing, so concurrent requests for the same path share one round trip.
+
+    result = ingest.ingest(["AAPL", "MSFT"], "http://127.0.0.1:8765", max_connections=32)
+    ratios = ratio_engine.compute_ratios(result.table())
+
+JsonSource reads one fundamentals and one quote document per ticker, the
+layout served by ingest_stub.py. Other providers plug in as a Source
+subclass with their own paths() and parse(). The client is built on
+asyncio streams only, so it needs no HTTP library.
+
+    python ingest.py tickers.txt fundamentals.parquet --url http://127.0.0.1:8765
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import ssl
+import sys
+import time
+from urllib.parse import quote, urlsplit
+
+import metrics
+import ratio_engine
+
+DEFAULT_URL = "http://127.0.0.1:8765"
+DEFAULT_MAX_CONNECTIONS = 32
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.05
+# Longest wait before a retry, whatever Retry-After asks for
+DEFAULT_MAX_BACKOFF = 5.0
+DEFAULT_TIMEOUT = 10.0
+# Statuses worth retrying; other 4xx responses are final
+RETRY_STATUSES = frozenset((408, 429, 500, 502, 503, 504))
+
+
+class FetchError(Exception):
+    """A request that failed for good, after any retries."""
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+class _RetryableError(Exception):
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class HttpClient:
+    """Pooled HTTP/1.1 GET client for JSON documents on one host.
+
+    At most `max_connections` requests are in flight; idle connections are
+    kept alive and reused. A retry waits at most `max_backoff` seconds, so
+    one server-supplied Retry-After cannot stall a whole ingest. Use it as
+    an async context manager, or call close().
+    """
+
+    def __init__(self, url, max_connections=DEFAULT_MAX_CONNECTIONS, retries=DEFAULT_RETRIES,
+                 backoff=DEFAULT_BACKOFF, timeout=DEFAULT_TIMEOUT, max_backoff=DEFAULT_MAX_BACKOFF):
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported URL scheme: {url!r} (expected http or https)")
+        if max_connections <= 0:
+            raise ValueError("max_connections must be positive")
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.base_path = parts.path.rstrip("/")
+        self.ssl = ssl.create_default_context() if parts.scheme == "https" else None
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self._slots = asyncio.Semaphore(max_connections)
+        self._idle = []
+        self._inflight = {}
+        self.requests = 0
+        self.retried = 0
+        self.coalesced = 0
+        self.connections = 0
+        self.latencies = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        idle, self._idle = self._idle, []
+        for _, writer in idle:
+            writer.close()
+        for _, writer in idle:
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+    async def get_json(self, path):
+        """GET base URL + `path` and decode the JSON body, sharing concurrent requests for the same path."""
+        task = self._inflight.get(path)
+        if task is None:
+            task = asyncio.ensure_future(self._get_with_retries(path))
+            self._inflight[path] = task
+            task.add_done_callback(lambda t: self._inflight.pop(path, None))
+        else:
+            self.coalesced += 1
+        # shield() so one cancelled waiter does not cancel the request for the others
+        return await asyncio.shield(task)
+
+    async def _get_with_retries(self, path):
+        for attempt in range(self.retries + 1):
+            try:
+                return await self._get(path)
+            except _RetryableError as e:
+                if attempt == self.retries:
+                    raise FetchError(f"GET {path} failed after {attempt + 1} attempts: {e}") from None
+                delay = e.retry_after if e.retry_after is not None else random.uniform(0, self.backoff * 2 ** attempt)
+                delay = min(max(delay, 0.0), self.max_backoff)
+                self.retried += 1
+                metrics.count("fetch_retries")
+                await asyncio.sleep(delay)
+
+    async def _get(self, path):
+        async with self._slots:
+            connection = self._idle.pop() if self._idle else None
+            start = time.perf_counter()
+            try:
+                if connection is None:
+                    connection = await asyncio.wait_for(
+                        asyncio.open_connection(self.host, self.port, ssl=self.ssl), self.timeout)
+                    self.connections += 1
+                status, headers, body = await asyncio.wait_for(self._exchange(connection, path), self.timeout)
+            except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError, ValueError) as e:
+                if connection is not None:
+                    connection[1].close()
+                raise _RetryableError(f"{e.__class__.__name__}: {e}") from None
+            self.requests += 1
+            self.latencies.append(time.perf_counter() - start)
+            if headers.get("connection", "").lower() == "close":
+                connection[1].close()
+            else:
+                self._idle.append(connection)
+
+        if status in RETRY_STATUSES:
+            retry_after = headers.get("retry-after")
+            try:
+                retry_after = float(retry_after) if retry_after is not None else None
+            except ValueError:
+                retry_after = None
+            raise _RetryableError(f"HTTP {status}", retry_after)
+        if status != 200:
+            raise FetchError(f"GET {path}: HTTP {status}", status)
+        try:
+            return json.loads(body)
+        except ValueError:
+            raise FetchError(f"GET {path}: response is not JSON") from None
+
+    async def _exchange(self, connection, path):
+        reader, writer = connection
+        writer.write((f"GET {self.base_path}{path} HTTP/1.1\r\nHost: {self.host}\r\n"
+                      f"Accept: application/json\r\nConnection: keep-alive\r\n\r\n").encode("latin-1"))
+        await writer.drain()
+
+        status_line = await reader.readuntil(b"\r\n")
+        parts = status_line.split(None, 2)
+        if len(parts) < 2 or not parts[0].startswith(b"HTTP/"):
+            raise ValueError(f"bad status line {status_line[:40]!r}")
+        status = int(parts[1])
+        headers = {}
+        while True:
+            line = await reader.readuntil(b"\r\n")
+            if line == b"\r\n":
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            body = bytearray()
+            while True:
+                size = int((await reader.readuntil(b"\r\n")).split(b";")[0], 16)
+                if size == 0:
+                    await reader.readuntil(b"\r\n")
+                    break
+                body += await reader.readexactly(size)
+                await reader.readexactly(2)
+            body = bytes(body)
+        elif "content-length" in headers:
+            body = await reader.readexactly(int(headers["content-length"]))
+        else:
+            body = await reader.read()
+            headers["connection"] = "close"
+        return status, headers, body
+
+
+class Source:
+    """Where a ticker's documents live and how they map onto ratio_engine.INPUT_FIELDS."""
+
+    def paths(self, ticker):
+        """Request paths (relative to the client's base URL) for one ticker."""
+        raise NotImplementedError
+
+    def parse(self, ticker, documents):
+        """{input field: number} from the decoded documents, in paths() order."""
+        raise NotImplementedError
+
+
+class JsonSource(Source):
+    """One fundamentals document and one quote document per ticker.
+
+    Fundamentals carry the statement fields by their INPUT_FIELDS names (or
+    the names given in `fields`). The quote's price and shares outstanding
+    give market_cap and num_shares. Missing fields become NaN.
+    """
+
+    def __init__(self, fundamentals_path="/v1/fundamentals/{ticker}", quote_path="/v1/quote/{ticker}", fields=None):
+        self.fundamentals_path = fundamentals_path
+        self.quote_path = quote_path
+        self.fields = dict(fields or {})
+
+    def paths(self, ticker):
+        ticker = quote(ticker, safe="")
+        return (self.fundamentals_path.format(ticker=ticker), self.quote_path.format(ticker=ticker))
+
+    def parse(self, ticker, documents):
+        fundamentals, quote_document = documents
+        values = {}
+        for field in ratio_engine.INPUT_FIELDS:
+            value = fundamentals.get(self.fields.get(field, field))
+            values[field] = float(value) if value is not None else math.nan
+        price = quote_document.get("price")
+        shares = quote_document.get("shares_outstanding")
+        if shares is not None:
+            values["num_shares"] = float(shares)
+        if price is not None and shares is not None:
+            values["market_cap"] = float(price) * float(shares)
+        return values
+
+
+class IngestResult:
+    """Fetched rows in request order, plus the tickers that failed and request stats."""
+
+    __slots__ = ("tickers", "rows", "errors", "latencies", "requests", "retried", "coalesced", "connections",
+                 "seconds")
+
+    def __init__(self, tickers, rows, errors, latencies, requests, retried, coalesced, connections, seconds):
+        self.tickers = tickers
+        self.rows = rows
+        self.errors = errors
+        self.latencies = latencies
+        self.requests = requests
+        self.retried = retried
+        self.coalesced = coalesced
+        self.connections = connections
+        self.seconds = seconds
+
+    def table(self):
+        """The ratio engine input table: {"ticker": list, field: float64 array}."""
+        import numpy as np
+
+        table = {"ticker": list(self.tickers)}
+        for field in ratio_engine.INPUT_FIELDS:
+            table[field] = np.array([row[field] for row in self.rows], dtype=np.float64)
+        return table
+
+    def frame(self):
+        import pandas as pd
+
+        return pd.DataFrame(self.table())
+
+    def latency(self, q):
+        """Request latency percentile `q` (0-100) in seconds."""
+        if not self.latencies:
+            return math.nan
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(math.ceil(q / 100 * len(ordered))) - 1)]
+
+
+class Ingestor:
+    """Fetch many tickers from `source` through one pooled HttpClient."""
+
+    def __init__(self, url=DEFAULT_URL, source=None, **client_options):
+        self.url = url
+        self.source = source or JsonSource()
+        self.client_options = client_options
+
+    async def fetch(self, client, ticker):
+        documents = await asyncio.gather(*(client.get_json(path) for path in self.source.paths(ticker)))
+        return self.source.parse(ticker, documents)
+
+    async def fetch_many(self, tickers, on_row=None):
+        """Fetch every ticker (duplicates once) and return an IngestResult.
+
+        `on_row(ticker, values)` is called as each ticker completes.
+        """
+        tickers = list(dict.fromkeys(tickers))
+        start = time.perf_counter()
+        async with HttpClient(self.url, **self.client_options) as client:
+            async def one(ticker):
+                values = await self.fetch(client, ticker)
+                if on_row is not None:
+                    on_row(ticker, values)
+                return values
+
+            outcomes = await asyncio.gather(*(one(ticker) for ticker in tickers), return_exceptions=True)
+
+        fetched, rows, errors = [], [], {}
+        for ticker, outcome in zip(tickers, outcomes):
+            if isinstance(outcome, (FetchError, ValueError, KeyError, TypeError, AttributeError)):
+                errors[ticker] = str(outcome)
+            elif isinstance(outcome, BaseException):
+                raise outcome
+            else:
+                fetched.append(ticker)
+                rows.append(outcome)
+        return IngestResult(fetched, rows, errors, client.latencies, client.requests, client.retried,
+                            client.coalesced, client.connections, time.perf_counter() - start)
+
+
+def ingest(tickers, url=DEFAULT_URL, source=None, **client_options):
+    """Blocking wrapper around Ingestor.fetch_many, for scripts and job threads."""
+    return asyncio.run(Ingestor(url, source, **client_options).fetch_many(tickers))
+
+
+def read_tickers(path):
+    """Tickers from a text file, one per line or comma-separated; blank lines and # comments are skipped."""
+    tickers = []
+    with open(path) as f:
+        for line in f:
+            line = line.split("#", 1)[0]
+            tickers.extend(t.strip() for t in line.split(",") if t.strip())
+    return tickers
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fetch fundamentals for many tickers into a screener input file.")
+    parser.add_argument("tickers", help="text file of tickers, one per line")
+    parser.add_argument("output", help="output .parquet or .csv file (screener.py input)")
+    parser.add_argument("--url", default=DEFAULT_URL, help=f"source base URL (default {DEFAULT_URL})")
+    parser.add_argument("--connections", type=int, default=DEFAULT_MAX_CONNECTIONS,
+                        help=f"concurrent connections (default {DEFAULT_MAX_CONNECTIONS})")
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES,
+                        help=f"retries per request (default {DEFAULT_RETRIES})")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT,
+                        help=f"seconds per request attempt (default {DEFAULT_TIMEOUT:g})")
+    parser.add_argument("--max-backoff", type=float, default=DEFAULT_MAX_BACKOFF,
+                        help=f"longest wait before a retry, even if Retry-After asks for more "
+                             f"(default {DEFAULT_MAX_BACKOFF:g}s)")
+    args = parser.parse_args(argv)
+
+    if args.connections <= 0:
+        parser.error("--connections must be positive")
+    if args.retries < 0:
+        parser.error("--retries must not be negative")
+    if args.max_backoff < 0:
+        parser.error("--max-backoff must not be negative")
+
+    import export
+
+    result = ingest(read_tickers(args.tickers), args.url, max_connections=args.connections,
+                    retries=args.retries, timeout=args.timeout, max_backoff=args.max_backoff)
+    # Written even when nothing was fetched, so the output always has the screener's input columns
+    with export.ExportWriter(args.output) as writer:
+        writer.write(result.table())
+    print(f"Fetched {len(result.rows):,} tickers in {result.seconds:.2f}s "
+          f"({len(result.rows) / result.seconds if result.seconds else 0:,.0f} tickers/sec), "
+          f"{len(result.errors):,} failed, {result.retried:,} retries, "
+          f"p99 request latency {result.latency(99) * 1e3:.1f} ms")
+    for ticker, error in list(result.errors.items())[:10]:
+        print(f"  {ticker}: {error}", file=sys.stderr)
+    return 0 if not result.errors else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
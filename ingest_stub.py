@@ -0,0 +1,206 @@
+"""Local stand-in for a fundamentals/price HTTP source, for offline runs and benchmarks.
+
+Serves the JsonSource layout ingest.py reads:
+    GET /v1/fundamentals/<ticker>   statement fields named as ratio_engine.INPUT_FIELDS
+    GET /v1/quote/<ticker>          {"price": ..., "shares_outstanding": ...}
+
+Tickers in fixtures/fundamentals.json are served as recorded. With
+`synthetic` on, other tickers get plausible values generated from the
+ticker name, so any number of symbols can be fetched repeatably; otherwise
+they are 404s. `delay`/`jitter` simulate network and backend latency, and
+`error_rate` answers that share of requests with 503 to exercise retries,
+asking the client to retry after `retry_after` seconds.
+
+    python ingest_stub.py --port 8765 --delay 0.005 --error-rate 0.01
+
+    server = ingest_stub.StubServer(delay=0.002).start_in_thread()
+    result = ingest.ingest(tickers, server.url)
+    server.stop()
+"""
+import argparse
+import asyncio
+import collections
+import json
+import os
+import random
+import sys
+import threading
+from urllib.parse import unquote
+
+import ratio_engine
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "fundamentals.json")
+
+_ROUTES = ("/v1/fundamentals/", "/v1/quote/")
+
+
+def load_fixtures(path=FIXTURES):
+    """{ticker: {"fundamentals": {...}, "quote": {...}}} from a fixture file."""
+    with open(path) as f:
+        return json.load(f)["tickers"]
+
+
+def synthetic_company(ticker):
+    """Repeatable made-up documents for `ticker`, seeded by its name."""
+    rng = random.Random(ticker)
+    revenue = rng.uniform(1e2, 1e5)
+    net_profit = revenue * rng.uniform(-0.05, 0.25)
+    total_assets = revenue * rng.uniform(0.8, 2.5)
+    equity = total_assets * rng.uniform(0.2, 0.7)
+    current_assets = total_assets * rng.uniform(0.15, 0.5)
+    dividend = max(net_profit, 0) * rng.uniform(0, 0.5)
+    fundamentals = {
+        "revenue": revenue, "net_profit": net_profit, "total_assets": total_assets, "equity": equity,
+        "current_assets": current_assets, "current_liabilities": current_assets * rng.uniform(0.4, 1.3),
+        "cash_flow": net_profit * rng.uniform(1.0, 1.6) + revenue * 0.02, "total_liabilities": total_assets - equity,
+        "capex": revenue * rng.uniform(0.01, 0.1), "ebitda": net_profit * 1.4 + revenue * 0.05, "dividend": dividend,
+        "cogs": revenue * rng.uniform(0.3, 0.8), "inventory": revenue * rng.uniform(0.0, 0.15),
+        "receivables": revenue * rng.uniform(0.05, 0.2), "payables": revenue * rng.uniform(0.03, 0.12),
+        "prev_net_profit": net_profit * rng.uniform(0.7, 1.1), "prev_revenue": revenue * rng.uniform(0.8, 1.05),
+        "prev_dividend": dividend * rng.uniform(0.8, 1.0), "prev_total_assets": total_assets * rng.uniform(0.85, 1.0),
+    }
+    fundamentals = {field: round(value, 2) for field, value in fundamentals.items() if field in ratio_engine.INPUT_FIELDS}
+    shares = rng.uniform(50, 5000)
+    price = max(net_profit, revenue * 0.01) * rng.uniform(8, 35) / shares
+    return {"fundamentals": fundamentals, "quote": {"price": round(price, 2), "shares_outstanding": round(shares, 1)}}
+
+
+class StubServer:
+    """asyncio HTTP/1.1 server with keep-alive, serving fixtures and synthetic companies."""
+
+    def __init__(self, host="127.0.0.1", port=0, fixtures=None, synthetic=True, delay=0.0, jitter=0.0,
+                 error_rate=0.0, seed=0, retry_after=0):
+        self.host = host
+        self.port = port
+        self.fixtures = load_fixtures() if fixtures is None else fixtures
+        self.synthetic = synthetic
+        self.delay = delay
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.rng = random.Random(seed)
+        # path -> number of requests served, to check coalescing
+        self.requests = collections.Counter()
+        self.errors = 0
+        self._server = None
+        self._loop = None
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def document(self, path):
+        for route, name in zip(_ROUTES, ("fundamentals", "quote")):
+            if path.startswith(route):
+                ticker = path[len(route):]
+                company = self.fixtures.get(ticker)
+                if company is None and self.synthetic and ticker:
+                    company = synthetic_company(ticker)
+                return company[name] if company is not None else None
+        return None
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                keep_alive = True
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    if line.lower().startswith(b"connection:") and b"close" in line.lower():
+                        keep_alive = False
+                method, path = (request_line.decode("latin-1").split() + ["", ""])[:2]
+                path = unquote(path)
+                self.requests[path] += 1
+
+                if self.delay or self.jitter:
+                    await asyncio.sleep(self.delay + self.rng.uniform(0, self.jitter))
+                if self.error_rate and self.rng.random() < self.error_rate:
+                    self.errors += 1
+                    status, body, extra = 503, b'{"error": "unavailable"}', f"Retry-After: {self.retry_after}\r\n"
+                else:
+                    document = self.document(path) if method == "GET" else None
+                    if document is None:
+                        status, body, extra = 404, b'{"error": "not found"}', ""
+                    else:
+                        status, body, extra = 200, json.dumps(document).encode(), ""
+                reason = {200: "OK", 404: "Not Found", 503: "Service Unavailable"}[status]
+                writer.write((f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\n"
+                              f"Content-Length: {len(body)}\r\n{extra}"
+                              f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n").encode("latin-1") + body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self):
+        self._server = await asyncio.start_server(self.handle, self.host, self.port, backlog=1024)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    def start_in_thread(self):
+        """Run the server on its own event loop in a daemon thread; returns once it is listening."""
+        ready = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self.start())
+            ready.set()
+            self._loop.run_forever()
+            self._loop.run_until_complete(self.close())
+            self._loop.close()
+
+        self._thread = threading.Thread(target=run, name="ingest-stub", daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._thread = None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve fixture fundamentals over HTTP for ingest.py.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fixtures", default=FIXTURES, help="fixture JSON file (default fixtures/fundamentals.json)")
+    parser.add_argument("--no-synthetic", action="store_true", help="404 for tickers not in the fixtures")
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random delay, up to this many seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 503")
+    parser.add_argument("--retry-after", type=float, default=0, help="Retry-After seconds sent with each 503")
+    args = parser.parse_args(argv)
+
+    server = StubServer(args.host, args.port, load_fixtures(args.fixtures), not args.no_synthetic,
+                        args.delay, args.jitter, args.error_rate, retry_after=args.retry_after)
+
+    async def serve():
+        await server.start()
+        print(f"Serving fundamentals on {server.url}", flush=True)
+        await server._server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+"""Background jobs for the Tk GUIs.
+
+JobRunner runs work on an executor so the Tk event loop never waits on it.
+A job reports progress and partial results, and finishes with a result or
+an error, by posting messages to a thread-safe queue. The Tk thread drains
+that queue with after() for at most POLL_BUDGET seconds per tick, so every
+callback runs on the Tk thread and a busy job cannot stall redraws.
+
+    runner = jobs.JobRunner(root)
+    job = runner.submit(jobs.screen_file, "fundamentals.parquet",
+                        on_progress=show_progress, on_done=show_results)
+    job.cancel()
+
+Job functions take the Job as their first argument and call job.progress(),
+job.partial() and job.check() as they go; those raise JobCancelled once the
+job is cancelled, which ends it quietly. Work that should use several cores
+runs inside the job through parallel_screen's process pool (see
+screen_file(workers=...)), since the Job itself stays in this process.
+"""
+import itertools
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import metrics
+
+POLL_MS = 15
+POLL_BUDGET = 0.008
+DEFAULT_CHUNK_SIZE = 10_000
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class Job:
+    __slots__ = ("id", "future", "on_progress", "on_partial", "on_done", "on_error", "_post", "_cancelled")
+
+    def __init__(self, job_id, post, on_progress=None, on_partial=None, on_done=None, on_error=None):
+        self.id = job_id
+        self.future = None
+        self.on_progress = on_progress
+        self.on_partial = on_partial
+        self.on_done = on_done
+        self.on_error = on_error
+        self._post = post
+        self._cancelled = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        """Stop the job. No further callbacks run for it."""
+        self._cancelled.set()
+        if self.future is not None and self.future.cancel():
+            # Never started, so the worker will not report back
+            self._post((self, "cancelled", None))
+
+    def check(self):
+        """Raise JobCancelled if the job has been cancelled (call between units of work)."""
+        if self._cancelled.is_set():
+            raise JobCancelled()
+
+    def progress(self, done, total=None):
+        self.check()
+        self._post((self, "progress", (done, total)))
+
+    def partial(self, result):
+        self.check()
+        self._post((self, "partial", result))
+
+
+class JobRunner:
+    def __init__(self, root, workers=2, executor=None, poll_ms=POLL_MS, budget=POLL_BUDGET):
+        self.root = root
+        self.poll_ms = poll_ms
+        self.budget = budget
+        self._executor = executor or ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self._queue = queue.SimpleQueue()
+        self._ids = itertools.count(1)
+        self._active = {}
+        self._polling = False
+
+    def submit(self, func, *args, on_progress=None, on_partial=None, on_done=None, on_error=None, **kwargs):
+        """Run `func(job, *args, **kwargs)` in the background. Callbacks run on the Tk thread."""
+        job = Job(next(self._ids), self._queue.put, on_progress, on_partial, on_done, on_error)
+        self._active[job.id] = job
+        job.future = self._executor.submit(self._run, job, func, args, kwargs)
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.poll_ms, self._poll)
+        return job
+
+    def _run(self, job, func, args, kwargs):
+        try:
+            # Worker threads are outside a cProfile run's view unless routed through it
+            result = metrics.profiled(func, job, *args, **kwargs)
+        except JobCancelled:
+            self._queue.put((job, "cancelled", None))
+        except Exception as e:
+            self._queue.put((job, "error", e))
+        else:
+            self._queue.put((job, "done", result))
+
+    def _poll(self):
+        deadline = time.perf_counter() + self.budget
+        while time.perf_counter() < deadline:
+            try:
+                job, kind, payload = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            self._dispatch(job, kind, payload)
+
+        if self._active:
+            self.root.after(self.poll_ms, self._poll)
+        else:
+            self._polling = False
+
+    def _dispatch(self, job, kind, payload):
+        if kind in ("done", "error", "cancelled"):
+            self._active.pop(job.id, None)
+        if job.cancelled:
+            return
+        if kind == "progress" and job.on_progress is not None:
+            job.on_progress(*payload)
+        elif kind == "partial" and job.on_partial is not None:
+            job.on_partial(payload)
+        elif kind == "done" and job.on_done is not None:
+            job.on_done(payload)
+        elif kind == "error" and job.on_error is not None:
+            job.on_error(payload)
+
+    @property
+    def busy(self):
+        return bool(self._active)
+
+    def close(self):
+        """Cancel outstanding jobs and stop the workers."""
+        for job in list(self._active.values()):
+            job.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def count_rows(path):
+    """Row count of a Parquet file from its footer, or None when unknown without reading (CSV)."""
+    import screener
+
+    if screener._format(path) == "parquet":
+        import pyarrow.parquet as pq
+
+        return pq.ParquetFile(path).metadata.num_rows
+    return None
+
+
+def screen_file(job, path, chunk_size=DEFAULT_CHUNK_SIZE, ruleset=None, workers=1):
+    """Job: screen a CSV/Parquet file chunk by chunk.
+
+    Posts each screened chunk (a DataFrame) as a partial result and the rows
+    done so far as progress. Returns the total row count.
+    """
+    import screener
+
+    total = count_rows(path)
+    pool = None
+    if workers > 1:
+        import parallel_screen
+
+        pool = parallel_screen.ParallelScreener(workers=workers, capacity=chunk_size, ruleset=ruleset)
+    rows = 0
+    try:
+        for frame in screener.iter_chunks(path, chunk_size):
+            job.check()
+            job.partial(screener.screen_chunk(frame, pool=pool, ruleset=ruleset))
+            rows += len(frame)
+            job.progress(rows, total)
+    finally:
+        if pool is not None:
+            pool.close()
+    return rows
@@ -0,0 +1,405 @@
+"""Stage timers, counters and opt-in profiling for both tools.
+
+The pipeline stages (parse, ratio, rule, render, export) are timed where
+they run: ratio_engine, rules, screener, export and results_grid. Each stage
+keeps a latency histogram, its call count and total seconds, and the rows it
+processed, so a snapshot shows per-stage percentiles and rows/sec.
+Counters are plain named totals, counted where the events happen:
+
+    rows_screened               screener.screen_chunk
+    rule_checks, rule_failures  rules (each rule applied to a row, and failed)
+    decisions                   rules (decision labels assigned)
+    cache_hits, cache_misses    result_cache.ResultCache lookups
+    export_batches              export.ExportWriter
+    fetch_retries               ingest.HttpClient
+
+    with metrics.timer("ratio", rows=len(frame)):
+        ratios = ratio_engine.compute_ratios(frame)
+    metrics.snapshot()["stages"]["ratio"]["p99"]
+    metrics.write_snapshot("metrics.prom")       # or .json
+
+Snapshots are JSON or Prometheus text. Setting STOCK_METRICS to a file path
+writes one when the process exits. STOCK_PROFILE=cprofile or sample, with
+STOCK_PROFILE_DIR, dumps a cProfile file or sampled stacks per run; sampled
+stacks are in collapsed "thread;frame;frame count" form for flame graphs.
+Only the standard library is used, so importing this module is cheap.
+
+The sampler walks every thread. cProfile only sees the thread that enables
+it, so work handed to other threads is profiled by running it through
+profiled(), as jobs.JobRunner does for every job; the per-job profiles are
+merged into the run's file. parallel_screen worker processes drain() their
+stages and counters into each shard's result and the parent merge()s them;
+profiles of those processes are not collected.
+"""
+import atexit
+import bisect
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+# Histogram bucket upper bounds in seconds, as Prometheus "le" labels
+BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+           0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, float("inf"))
+SAMPLE_INTERVAL = 0.005
+
+
+class Histogram:
+    """Fixed-bucket latency histogram with the count, sum, min, max and row total."""
+
+    __slots__ = ("counts", "count", "sum", "min", "max", "rows")
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+        self.rows = 0
+
+    def observe(self, seconds, rows=0):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.rows += rows
+        if seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def merge(self, other):
+        """Add another histogram's observations to this one."""
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.sum += other.sum
+        self.rows += other.rows
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q):
+        """Estimate of the q-quantile (0-1), interpolated within its bucket."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                # The observed min and max narrow the end buckets
+                lower = max(BUCKETS[i - 1] if i else 0.0, self.min)
+                upper = min(BUCKETS[i], self.max)
+                return lower + (upper - lower) * max(0.0, rank - seen) / n
+            seen += n
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "seconds": self.sum,
+            "rows": self.rows,
+            "rows_per_sec": self.rows / self.sum if self.sum else 0.0,
+            "mean": self.sum / self.count if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+            "min": self.min if self.count else 0.0,
+            "max": self.max,
+        }
+
+
+class Metrics:
+    """Thread-safe registry of stage histograms and counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stages = {}
+        self.counters = Counter()
+        self.started = time.time()
+
+    def observe(self, stage, seconds, rows=0):
+        with self._lock:
+            histogram = self.stages.get(stage)
+            if histogram is None:
+                histogram = self.stages[stage] = Histogram()
+            histogram.observe(seconds, rows)
+
+    def timer(self, stage, rows=0):
+        """Context manager timing the block as one call of `stage` that processed `rows` rows."""
+        return _Timer(self, stage, rows)
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] += n
+
+    def count_many(self, counts):
+        """count() for several (name, n) pairs under one lock, for per-record call sites."""
+        with self._lock:
+            counters = self.counters
+            for name, n in counts:
+                counters[name] += n
+
+    def drain(self):
+        """Take the stages and counters recorded so far, leaving them empty.
+
+        Returns picklable (stages, counters) for another process's merge().
+        """
+        with self._lock:
+            drained = self.stages, self.counters
+            self.stages = {}
+            self.counters = Counter()
+        return drained
+
+    def merge(self, drained):
+        """Add (stages, counters) from drain() in another registry or process."""
+        stages, counters = drained
+        with self._lock:
+            for stage, other in stages.items():
+                histogram = self.stages.get(stage)
+                if histogram is None:
+                    histogram = self.stages[stage] = Histogram()
+                histogram.merge(other)
+            self.counters.update(counters)
+
+    def reset(self):
+        with self._lock:
+            self.stages.clear()
+            self.counters.clear()
+            self.started = time.time()
+
+    def snapshot(self):
+        """{"stages": {stage: summary}, "counters": {...}, "uptime": seconds} as plain JSON types."""
+        with self._lock:
+            return {
+                "stages": {stage: histogram.summary() for stage, histogram in self.stages.items()},
+                "counters": dict(self.counters),
+                "uptime": time.time() - self.started,
+            }
+
+    def prometheus(self, prefix="stock"):
+        """Prometheus text exposition: stage histograms, row totals and counters."""
+        lines = [f"# TYPE {prefix}_stage_seconds histogram"]
+        with self._lock:
+            stages = sorted(self.stages.items())
+            counters = sorted(self.counters.items())
+            for stage, histogram in stages:
+                cumulative = 0
+                for bound, n in zip(BUCKETS, histogram.counts):
+                    cumulative += n
+                    le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                    lines.append(f'{prefix}_stage_seconds_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+                lines.append(f'{prefix}_stage_seconds_sum{{stage="{stage}"}} {histogram.sum:.9g}')
+                lines.append(f'{prefix}_stage_seconds_count{{stage="{stage}"}} {histogram.count}')
+            lines.append(f"# TYPE {prefix}_stage_rows_total counter")
+            for stage, histogram in stages:
+                lines.append(f'{prefix}_stage_rows_total{{stage="{stage}"}} {histogram.rows}')
+            for name, value in counters:
+                lines.append(f"# TYPE {prefix}_{name}_total counter")
+                lines.append(f"{prefix}_{name}_total {value}")
+        return "\n".join(lines) + "\n"
+
+    def write_snapshot(self, path, extra=""):
+        """Write Prometheus text (.prom/.txt) or JSON (anything else) to `path`.
+
+        `extra` is more Prometheus text to append, e.g. ResultCache.prometheus().
+        """
+        if os.path.splitext(path)[1].lower() in (".prom", ".txt"):
+            text = self.prometheus() + extra
+        else:
+            text = json.dumps(self.snapshot(), indent=2) + "\n"
+        with open(path, "w") as f:
+            f.write(text)
+
+    def report(self):
+        """One line per stage, for logs and command-line summaries."""
+        lines = []
+        for stage, s in self.snapshot()["stages"].items():
+            rate = f", {s['rows_per_sec']:,.0f} rows/sec" if s["rows"] else ""
+            lines.append(f"{stage}: {s['count']:,} calls, {s['seconds']:.3f}s, "
+                         f"p50 {s['p50'] * 1e3:.2f} ms, p99 {s['p99'] * 1e3:.2f} ms{rate}")
+        return lines
+
+
+class _Timer:
+    # A plain class: @contextmanager costs several microseconds per block
+    __slots__ = ("metrics", "stage", "rows", "start")
+
+    def __init__(self, metrics, stage, rows):
+        self.metrics = metrics
+        self.stage = stage
+        self.rows = rows
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.stage, time.perf_counter() - self.start, self.rows)
+        return False
+
+
+class Sampler:
+    """Samples thread stacks every `interval` seconds into collapsed-stack counts.
+
+    Every thread but the sampler's own is sampled (or only `thread_id`), and
+    each stack is rooted at its thread's name.
+    """
+
+    def __init__(self, thread_id=None, interval=SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own or (self.thread_id is not None and ident != self.thread_id):
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                stack.append(names.get(ident, f"thread-{ident}"))
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="metrics-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def dump(self, path):
+        with open(path, "w") as f:
+            for stack, n in self.stacks.most_common():
+                f.write(f"{stack} {n}\n")
+
+
+class Profiler:
+    """Opt-in whole-run profile: "cprofile" (deterministic) or "sample" (stack sampling).
+
+    In cprofile mode, calls made through profile_call() (or the module's
+    profiled()) on other threads get their own profile, merged in on stop().
+    """
+
+    def __init__(self, mode, path):
+        if mode not in ("cprofile", "sample"):
+            raise ValueError(f"Unknown profile mode {mode!r}; expected 'cprofile' or 'sample'")
+        self.mode = mode
+        self.path = path
+        self._profile = None
+        self._calls = []
+        self._lock = threading.Lock()
+
+    def start(self):
+        global _profiler
+        if self.mode == "cprofile":
+            import cProfile
+
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+            _profiler = self
+        else:
+            self._profile = Sampler().start()
+        return self
+
+    def profile_call(self, func, *args, **kwargs):
+        """func(*args, **kwargs), profiled on the calling thread in cprofile mode."""
+        if self.mode != "cprofile" or self._profile is None:
+            return func(*args, **kwargs)
+        import cProfile
+
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profile.disable()
+            with self._lock:
+                self._calls.append(profile)
+
+    def stop(self):
+        """Stop and write the profile. Returns its path."""
+        global _profiler
+        if self._profile is None:
+            return None
+        if self.mode == "cprofile":
+            import pstats
+
+            self._profile.disable()
+            if _profiler is self:
+                _profiler = None
+            stats = pstats.Stats(self._profile)
+            with self._lock:
+                for profile in self._calls:
+                    stats.add(profile)
+                self._calls = []
+            stats.dump_stats(self.path)
+        else:
+            self._profile.stop()
+            self._profile.dump(self.path)
+        self._profile = None
+        return self.path
+
+
+def profiled(func, *args, **kwargs):
+    """func(*args, **kwargs), included in the running cProfile profile if there is one."""
+    profiler = _profiler
+    if profiler is None:
+        return func(*args, **kwargs)
+    return profiler.profile_call(func, *args, **kwargs)
+
+
+METRICS = Metrics()
+timer = METRICS.timer
+observe = METRICS.observe
+count = METRICS.count
+count_many = METRICS.count_many
+drain = METRICS.drain
+merge = METRICS.merge
+reset = METRICS.reset
+snapshot = METRICS.snapshot
+prometheus = METRICS.prometheus
+write_snapshot = METRICS.write_snapshot
+report = METRICS.report
+
+_started = False
+# The Profiler in cprofile mode that profiled() adds to
+_profiler = None
+
+
+def start_run(name):
+    """Start the per-run profile and exit-time snapshot that the environment asks for.
+
+    STOCK_PROFILE=cprofile|sample writes <STOCK_PROFILE_DIR>/<name>-<pid>.prof
+    (or .folded for samples); STOCK_METRICS=path writes a snapshot at exit.
+    Returns the Profiler, if any. Only the first call in a process counts.
+    """
+    global _started
+    if _started:
+        return None
+    _started = True
+    profiler = None
+    mode = os.environ.get("STOCK_PROFILE")
+    if mode:
+        directory = os.environ.get("STOCK_PROFILE_DIR", ".")
+        ext = ".prof" if mode == "cprofile" else ".folded"
+        profiler = Profiler(mode, os.path.join(directory, f"{name}-{os.getpid()}{ext}")).start()
+
+    def finish():
+        if profiler is not None:
+            profiler.stop()
+        path = os.environ.get("STOCK_METRICS")
+        if path:
+            write_snapshot(path)
+
+    atexit.register(finish)
+    return profiler
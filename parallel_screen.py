@@ -0,0 +1,156 @@
+"""Multi-core execution of the stock-tool.py ratio and rule pipeline.
+
+Rows are sharded across a process pool. The input and output columns live in
+multiprocessing.shared_memory blocks, so each task pickles only a block name
+and a row range rather than per-row data. Every shard writes its results at
+its own row offsets, so the merged output is in input order no matter which
+worker finishes first. Stage timings and counters recorded in a worker come
+back with its shard and are merged into the parent's metrics.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import metrics
+import ratio_engine
+import rules
+
+N_INPUTS = len(ratio_engine.INPUT_FIELDS)
+N_RATIOS = len(ratio_engine.RATIO_NAMES)
+# Default cap on rows per task; a worker holds every ratio for its shard at once
+MAX_SHARD_ROWS = 250_000
+
+# Shared memory blocks attached by this (worker) process, keyed by name
+_attached = {}
+
+
+class _SharedColumns:
+    """A (columns, capacity) array backed by a named shared memory block."""
+
+    def __init__(self, columns, capacity, dtype, name=None):
+        dtype = np.dtype(dtype)
+        size = max(columns * capacity * dtype.itemsize, 1)
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.array = np.ndarray((columns, capacity), dtype=dtype, buffer=self.shm.buf)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def close(self, unlink=False):
+        self.array = None
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+def _detach_all():
+    for block in _attached.values():
+        block.close()
+    _attached.clear()
+
+
+def _attach(name, columns, capacity, dtype):
+    block = _attached.get(name)
+    if block is None:
+        block = _SharedColumns(columns, capacity, dtype, name=name)
+        _attached[name] = block
+    return block.array
+
+
+def _screen_shard(layout, ruleset, start, stop):
+    """Worker entry point: screen rows [start, stop) of the shared input."""
+    capacity, inputs_name, ratios_name, passed_name = layout
+    if inputs_name not in _attached:
+        # The parent reallocated its buffers; drop mappings of the old ones
+        _detach_all()
+    inputs = _attach(inputs_name, N_INPUTS, capacity, np.float64)
+    ratios_out = _attach(ratios_name, N_RATIOS, capacity, np.float64)
+    passed_out = _attach(passed_name, len(ruleset.rules), capacity, np.bool_)
+
+    table = inputs[:, start:stop].T
+    ratios = ratio_engine.compute_ratios(table)
+    for i, name in enumerate(ratio_engine.RATIO_NAMES):
+        ratios_out[i, start:stop] = ratios[name]
+    passed_out[:, start:stop] = ratio_engine.evaluate_rules(table, ratios, ruleset).passed
+    return start, stop, metrics.drain()
+
+
+class ParallelScreener:
+    """Runs ratio_engine and a rule set over a process pool with shared-memory columns.
+
+    Buffers are allocated once for `capacity` rows and grown on demand, so a
+    streaming caller (see screener.py --workers) reuses them across chunks.
+    Rows are split evenly over the workers, in shards of at most
+    MAX_SHARD_ROWS unless `shard_rows` says otherwise.
+    """
+
+    def __init__(self, workers=None, shard_rows=None, capacity=0, ruleset=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.shard_rows = shard_rows
+        self.ruleset = ruleset or rules.stock_tool_rules()
+        # Forked workers start with a copy of the parent's metrics; clear it so shards report only their own
+        self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=metrics.reset)
+        self._blocks = None
+        self._capacity = 0
+        if capacity:
+            self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        self._release()
+        self._blocks = (
+            _SharedColumns(N_INPUTS, capacity, np.float64),
+            _SharedColumns(N_RATIOS, capacity, np.float64),
+            _SharedColumns(len(self.ruleset.rules), capacity, np.bool_),
+        )
+        self._capacity = capacity
+
+    def _release(self):
+        if self._blocks is not None:
+            for block in self._blocks:
+                block.close(unlink=True)
+            self._blocks = None
+            self._capacity = 0
+
+    def _shards(self, rows):
+        shard_rows = self.shard_rows or min(-(-rows // self.workers), MAX_SHARD_ROWS)
+        return [(start, min(start + shard_rows, rows)) for start in range(0, rows, max(shard_rows, 1))]
+
+    def screen(self, table):
+        """Screen every row of `table`.
+
+        Returns (ratios, rule_result) like ratio_engine.compute_ratios and
+        ratio_engine.evaluate_rules, in input row order.
+        """
+        columns = ratio_engine.as_columns(table)
+        rows = len(columns[ratio_engine.INPUT_FIELDS[0]])
+        if self._blocks is None or rows > self._capacity:
+            self._allocate(max(rows, 1))
+
+        inputs, ratios_out, passed_out = (block.array for block in self._blocks)
+        for i, name in enumerate(ratio_engine.INPUT_FIELDS):
+            inputs[i, :rows] = columns[name]
+
+        layout = (self._capacity,) + tuple(block.name for block in self._blocks)
+        futures = [self._pool.submit(_screen_shard, layout, self.ruleset, start, stop) for start, stop in self._shards(rows)]
+        for future in futures:
+            metrics.merge(future.result()[2])
+
+        # Copy out of the shared buffers so results outlive the next call
+        ratios = {name: ratios_out[i, :rows].copy() for i, name in enumerate(ratio_engine.RATIO_NAMES)}
+        return ratios, rules.RuleResult(self.ruleset, passed_out[:, :rows].copy())
+
+    def close(self):
+        self._pool.shutdown()
+        self._release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,279 @@
+"""Cross-sectional ranking index over a batch of computed ratios.
+
+RankIndex keeps, per ratio, the non-NaN values in sorted order with their
+row numbers. There is one index for the whole universe and, when a group
+column such as sector is given, one per group, each built on first use.
+Percentile ranks, percentile values, top-k/bottom-k and range queries are
+binary searches and slices of those arrays. update() moves a changed value
+to its new position instead of re-sorting.
+
+    index = ranking.RankIndex(frame, key="ticker", group="sector")
+    index.top("Return on Equity (ROE)", 10, group="Utilities")
+    index.query("Return on Equity (ROE) > p75, Debt to Equity Ratio < p25", by_group=True)
+    index.is_good(ranking.relative_rules())     # the good rules against sector percentiles
+
+Percentile thresholds are written "p75". relative_rules() turns the fixed
+"good" rules into relative ones, and resolve() / is_good() turn those back
+into numbers for a universe or for each group.
+"""
+import re
+
+import numpy as np
+
+import rules
+
+DEFAULT_UPPER = 75
+DEFAULT_LOWER = 25
+
+_PERCENTILE = re.compile(r"^p(\d+(?:\.\d+)?)$")
+_CLAUSE = re.compile(r"^\s*(.+?)\s*(>=|<=|>|<)\s*(.+?)\s*$")
+
+
+def percentile_of(q):
+    """The q of a "pNN" threshold, or None for anything else."""
+    match = _PERCENTILE.match(q) if isinstance(q, str) else None
+    return float(match.group(1)) if match else None
+
+
+def sorted_percentile(values, q):
+    """Linear-interpolated q-th percentile of sorted, NaN-free `values` (as np.percentile)."""
+    if not len(values):
+        return np.nan
+    position = q / 100 * (len(values) - 1)
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return float(values[lower] + (values[upper] - values[lower]) * (position - lower))
+
+
+def relative_rules(ruleset=None, upper=DEFAULT_UPPER, lower=DEFAULT_LOWER, group="good"):
+    """`ruleset` with the thresholds of `group` replaced by percentiles.
+
+    Rules that pass above their threshold (> and >=) must be in the top
+    (100 - upper)% and the others in the bottom `lower`%. Other groups and
+    the decisions are kept as they are.
+    """
+    ruleset = ruleset or rules.stock_tool_rules()
+    relative = []
+    for rule in ruleset.rules:
+        if rule.group == group:
+            threshold = f"p{upper:g}" if rule.op in (">", ">=") else f"p{lower:g}"
+            rule = rules.Rule(rule.column, rule.op, threshold, rule.weight, rule.label, rule.group)
+        relative.append(rule)
+    return rules.RuleSet(relative, ruleset.decisions, f"{ruleset.version}+p{upper:g}/p{lower:g}")
+
+
+class RankIndex:
+    """Sorted per-ratio arrays over a table of ratios.
+
+    `columns` defaults to every numeric column of `table`. `key` names the
+    column that identifies rows (e.g. ticker); without it rows are
+    addressed by position. `group` names a column such as sector, and the
+    `group=` argument of the queries restricts them to one of its values.
+    """
+
+    def __init__(self, table, columns=None, key=None, group=None):
+        names = [name for name in table.keys() if name not in (key, group)]
+        if columns is None:
+            columns = [name for name in names if np.asarray(table[name]).dtype.kind in "fiub"]
+        self.columns = {name: np.array(table[name], dtype=np.float64) for name in columns}
+        self.row_count = len(next(iter(self.columns.values()))) if self.columns else 0
+        self.keys = np.asarray(table[key]) if key else None
+        self._rows = {k: i for i, k in enumerate(self.keys.tolist())} if key else None
+        self.groups = np.asarray(table[group]).astype(str) if group else None
+        self._group_rows = {None: np.arange(self.row_count)}
+        if group:
+            names, codes = np.unique(self.groups, return_inverse=True)
+            order = np.argsort(codes, kind="stable")
+            bounds = np.searchsorted(codes[order], np.arange(len(names) + 1))
+            for i, name in enumerate(names.tolist()):
+                self._group_rows[name] = order[bounds[i]:bounds[i + 1]]
+        # (group, column) -> [sorted non-NaN values, their rows]
+        self._index = {}
+
+    @property
+    def group_names(self):
+        return tuple(name for name in self._group_rows if name is not None)
+
+    def _sorted(self, column, group=None):
+        entry = self._index.get((group, column))
+        if entry is None:
+            if column not in self.columns:
+                raise ValueError(f"Unknown column: {column}")
+            if group not in self._group_rows:
+                raise ValueError(f"Unknown group: {group}")
+            rows = self._group_rows[group]
+            values = self.columns[column][rows]
+            keep = ~np.isnan(values)
+            rows, values = rows[keep], values[keep]
+            order = np.argsort(values, kind="stable")
+            entry = [values[order], rows[order]]
+            self._index[(group, column)] = entry
+        return entry
+
+    def _row(self, key):
+        if self._rows is None:
+            return int(key)
+        try:
+            return self._rows[key]
+        except KeyError:
+            raise ValueError(f"Unknown key: {key}") from None
+
+    def _keys(self, rows):
+        return self.keys[rows] if self.keys is not None else rows
+
+    def __len__(self):
+        return self.row_count
+
+    def count(self, column, group=None):
+        """Number of non-NaN values of `column`."""
+        return len(self._sorted(column, group)[0])
+
+    def percentile(self, column, q, group=None):
+        """Value of `column` at percentile `q` (0-100), ignoring NaN."""
+        return sorted_percentile(self._sorted(column, group)[0], q)
+
+    def percentile_rank(self, column, value, group=None):
+        """Percentile rank (0-100) of `value`: the share below it, counting ties as half."""
+        values = self._sorted(column, group)[0]
+        if not len(values) or np.isnan(value):
+            return np.nan
+        below = np.searchsorted(values, value, side="left")
+        at_or_below = np.searchsorted(values, value, side="right")
+        return 100.0 * (below + at_or_below) / (2 * len(values))
+
+    def rank(self, key, column, by_group=False):
+        """Percentile rank of one company's `column` in the universe (or its own group)."""
+        row = self._row(key)
+        group = self.groups[row] if by_group and self.groups is not None else None
+        return self.percentile_rank(column, self.columns[column][row], group)
+
+    def top(self, column, k, group=None):
+        """Keys of the `k` largest values of `column`, largest first."""
+        rows = self._sorted(column, group)[1]
+        return self._keys(rows[::-1][:k])
+
+    def bottom(self, column, k, group=None):
+        """Keys of the `k` smallest values of `column`, smallest first."""
+        return self._keys(self._sorted(column, group)[1][:k])
+
+    def _clause_rows(self, column, op, operand, group):
+        values, rows = self._sorted(column, group)
+        q = percentile_of(operand)
+        if q is not None:
+            threshold = sorted_percentile(values, q)
+        else:
+            try:
+                threshold = float(operand)
+            except ValueError:
+                raise ValueError(f"Expected a number or pNN after {op!r}, got {operand!r}") from None
+        if op in (">", ">="):
+            return rows[np.searchsorted(values, threshold, side="right" if op == ">" else "left"):]
+        return rows[:np.searchsorted(values, threshold, side="left" if op == "<" else "right")]
+
+    def query(self, expression, group=None, by_group=False):
+        """Keys of the rows matching clauses like "Return on Equity (ROE) > p75, Debt to Equity Ratio < 0.5".
+
+        Clauses are joined by "," or ";" and must all hold; the right-hand
+        side is a number or a percentile "pNN". Percentiles are taken over
+        `group` (or the universe), or, with `by_group`, over each row's own
+        group. Matching rows come back in table order.
+        """
+        clauses = []
+        for clause in re.split(r"[;,]", expression):
+            if not clause.strip():
+                continue
+            match = _CLAUSE.match(clause)
+            if match is None:
+                raise ValueError(f"Cannot parse query clause: {clause.strip()!r}")
+            clauses.append(match.groups())
+        groups = self.group_names if by_group and self.groups is not None else (group,)
+
+        # Count the clauses each row passes; a row matches if it passes them all
+        hits = np.zeros(self.row_count, dtype=np.uint8)
+        for column, op, operand in clauses:
+            for g in groups:
+                hits[self._clause_rows(column, op, operand, g)] += 1
+        return self._keys(np.flatnonzero(hits == len(clauses)))
+
+    def update(self, key, values):
+        """Change one company's ratios ({column: value}) and move them within the sorted arrays."""
+        row = self._row(key)
+        group = self.groups[row] if self.groups is not None else None
+        for column, new in values.items():
+            if column not in self.columns:
+                raise ValueError(f"Unknown column: {column}")
+            new = float(new)
+            old = self.columns[column][row]
+            self.columns[column][row] = new
+            for g in (None,) if group is None else (None, group):
+                entry = self._index.get((g, column))
+                if entry is not None:
+                    self._move(entry, row, old, new)
+
+    @staticmethod
+    def _move(entry, row, old, new):
+        sorted_values, rows = entry
+        if not np.isnan(old):
+            lo = np.searchsorted(sorted_values, old, side="left")
+            hi = np.searchsorted(sorted_values, old, side="right")
+            i = lo + int(np.flatnonzero(rows[lo:hi] == row)[0])
+        if np.isnan(old) or np.isnan(new):
+            # The value enters or leaves the index, so the arrays change length
+            if not np.isnan(old):
+                sorted_values, rows = np.delete(sorted_values, i), np.delete(rows, i)
+            if not np.isnan(new):
+                j = np.searchsorted(sorted_values, new, side="right")
+                sorted_values, rows = np.insert(sorted_values, j, new), np.insert(rows, j, row)
+            entry[:] = [sorted_values, rows]
+            return
+        # Shift only the entries between the old and new positions
+        j = np.searchsorted(sorted_values, new, side="right")
+        if j > i:
+            j -= 1
+            sorted_values[i:j] = sorted_values[i + 1:j + 1]
+            rows[i:j] = rows[i + 1:j + 1]
+        else:
+            sorted_values[j + 1:i + 1] = sorted_values[j:i]
+            rows[j + 1:i + 1] = rows[j:i]
+        sorted_values[j] = new
+        rows[j] = row
+
+    def resolve(self, ruleset, group=None):
+        """`ruleset` with its "pNN" thresholds replaced by values over `group` (or the universe)."""
+        resolved = []
+        for rule in ruleset.rules:
+            q = percentile_of(rule.threshold)
+            if q is not None:
+                rule = rules.Rule(rule.column, rule.op, self.percentile(rule.column, q, group),
+                                  rule.weight, rule.label, rule.group)
+            resolved.append(rule)
+        return rules.RuleSet(resolved, ruleset.decisions, ruleset.version)
+
+    def is_good(self, ruleset=None, group="good", by_group=False):
+        """{rule label: boolean array} for `group`'s rules over every row.
+
+        "pNN" thresholds are percentiles over the universe, or with
+        `by_group` over each row's own group.
+        """
+        ruleset = (ruleset or relative_rules()).subset(group)
+        applicable = [rule for rule in ruleset.rules if rule.column in self.columns]
+        table = dict(self.columns)
+        evaluated = []
+        for rule in applicable:
+            q = percentile_of(rule.threshold)
+            if q is not None:
+                # Per-row threshold column, which RuleSet compares element-wise
+                name = f"{rule.threshold}:{rule.column}"
+                if name not in table:
+                    if by_group and self.groups is not None:
+                        thresholds = np.full(self.row_count, np.nan)
+                        for g in self.group_names:
+                            thresholds[self._group_rows[g]] = self.percentile(rule.column, q, g)
+                    else:
+                        thresholds = np.full(self.row_count, self.percentile(rule.column, q))
+                    table[name] = thresholds
+                rule = rules.Rule(rule.column, rule.op, name, rule.weight, rule.label, rule.group)
+            evaluated.append(rule)
+        if not evaluated:
+            return {}
+        return rules.RuleSet(evaluated).evaluate(table).group_passed(group)
@@ -0,0 +1,369 @@
+"""Vectorized ratio engine behind stock-tool.py.
+
+Takes a columnar table (pandas DataFrame, mapping of arrays or a 2-D array
+with one row per company-period) and computes every ratio shown by
+FinancialAnalysisApp as whole-column NumPy operations. Division by zero is
+resolved per element (x/0 -> +/-inf, 0/0 -> NaN) instead of failing the batch.
+
+The ratios are defined as an expression DAG (TOOL_GRAPH / VALUATION_GRAPH).
+Shared subexpressions such as net_profit / revenue, market_cap / net_profit
+or total_assets - total_liabilities are single nodes evaluated once per call,
+and callers can ask for a subset of ratios so that only those ratios and the
+inputs they depend on are computed. Ratios that share a node (e.g. Profit
+Margin and Net Profit Ratio) are returned as the same array object, so treat
+results as read-only.
+
+compute_one runs the same graph over plain floats for a single company, so
+that path never imports NumPy and starts in a few milliseconds.
+"""
+import math
+import operator
+import time
+
+import metrics
+import rules
+import valuation_core
+
+# Input columns, in the same order as the Entry widgets in stock-tool.py
+INPUT_FIELDS = (
+    "revenue", "net_profit", "total_assets", "equity", "current_assets",
+    "current_liabilities", "cash_flow", "total_liabilities", "capex", "ebitda",
+    "market_cap", "dividend", "cogs", "inventory", "receivables", "payables",
+    "num_shares", "prev_net_profit", "prev_revenue", "prev_dividend", "prev_total_assets",
+)
+
+
+def _div(a, b):
+    return a / b
+
+
+def _pct(a, b):
+    return a / b * 100
+
+
+def _div_or_inf(a, b):
+    import numpy as np
+
+    return np.where(b != 0, np.true_divide(a, b), np.inf)
+
+
+def _pct_or_inf(a, b):
+    import numpy as np
+
+    return np.where(b != 0, np.true_divide(a, b) * 100, np.inf)
+
+
+def _scalar_div(a, b):
+    # NumPy's x/0 -> +/-inf, 0/0 -> NaN for plain floats
+    if b:
+        return a / b
+    if a == 0 or math.isnan(a):
+        return math.nan
+    return math.copysign(math.inf, a) * math.copysign(1.0, b)
+
+
+def _scalar_div_or_inf(a, b):
+    return a / b if b else math.inf
+
+
+# Graph functions that need a float-only stand-in for compute_one
+_SCALAR = {
+    _div: _scalar_div,
+    _pct: lambda a, b: _scalar_div(a, b) * 100,
+    _div_or_inf: _scalar_div_or_inf,
+    _pct_or_inf: lambda a, b: _scalar_div_or_inf(a, b) * 100,
+}
+
+
+# node -> (function, arguments). Arguments name another node or an input
+# column; anything that is not a string is passed through as a constant.
+TOOL_GRAPH = {
+    'net_margin': (_div, ('net_profit', 'revenue')),
+    'roa': (_div, ('net_profit', 'total_assets')),
+    'roe': (_div, ('net_profit', 'equity')),
+    'gross_profit': (operator.sub, ('revenue', 'cogs')),
+    'gross_margin': (_div, ('gross_profit', 'revenue')),
+    'operating_margin': (_div, ('ebitda', 'revenue')),
+    'current_ratio': (_div, ('current_assets', 'current_liabilities')),
+    'quick_assets': (operator.sub, ('current_assets', 'inventory')),
+    'quick_ratio': (_div, ('quick_assets', 'current_liabilities')),
+    'cash_ratio': (_div, ('cash_flow', 'current_liabilities')),
+    'gearing': (_div, ('total_liabilities', 'equity')),
+    'debt_to_assets': (_div, ('total_liabilities', 'total_assets')),
+    'interest_estimate': (operator.mul, ('cogs', 0.05)),  # Estimate interest expense
+    'interest_coverage': (_div, ('ebitda', 'interest_estimate')),
+    'equity_ratio': (_div, ('equity', 'total_assets')),
+    'asset_turnover': (_div, ('revenue', 'total_assets')),
+    'inventory_turnover': (_div, ('revenue', 'inventory')),
+    'receivables_turnover': (_div, ('revenue', 'receivables')),
+    'payables_turnover': (_div, ('revenue', 'payables')),
+    'eps': (_div, ('net_profit', 'num_shares')),
+    'pe': (_div, ('market_cap', 'net_profit')),
+    'dividend_yield': (_div, ('dividend', 'market_cap')),
+    'ev_to_ebitda': (_div, ('market_cap', 'ebitda')),
+    'earnings_yield': (_div, ('net_profit', 'market_cap')),
+    'earnings_change': (operator.sub, ('net_profit', 'prev_net_profit')),
+    'earnings_growth': (_div, ('earnings_change', 'prev_net_profit')),
+    'peg': (_div, ('pe', 'earnings_growth')),
+    'ev_to_sales': (_div, ('market_cap', 'revenue')),
+    'revenue_change': (operator.sub, ('revenue', 'prev_revenue')),
+    'revenue_growth': (_div, ('revenue_change', 'prev_revenue')),
+    'dividend_change': (operator.sub, ('dividend', 'prev_dividend')),
+    'dividend_growth': (_div, ('dividend_change', 'prev_dividend')),
+    'asset_change': (operator.sub, ('total_assets', 'prev_total_assets')),
+    'asset_growth': (_div, ('asset_change', 'prev_total_assets')),
+    'ocf_to_net_income': (_div, ('cash_flow', 'net_profit')),
+    'fcf': (operator.sub, ('cash_flow', 'capex')),
+    'cash_flow_margin': (_div, ('cash_flow', 'revenue')),
+    'cash_flow_coverage': (_div, ('cash_flow', 'total_liabilities')),
+    'retained_profit': (operator.sub, ('net_profit', 'dividend')),
+    'retention': (_div, ('retained_profit', 'net_profit')),
+    'leverage': (_div, ('total_assets', 'equity')),
+    'capital': (operator.add, ('total_liabilities', 'equity')),
+    'debt_to_capital': (_div, ('total_liabilities', 'capital')),
+    'book_value_per_share': (_div, ('equity', 'num_shares')),
+    'market_to_book': (_div, ('market_cap', 'equity')),
+    'fcf_yield': (_div, ('fcf', 'market_cap')),
+    'company_worth': (_div, ('market_cap', 'eps')),
+    'liquidation_value': (operator.sub, ('total_assets', 'total_liabilities')),
+    'recovery': (_div, ('liquidation_value', 'total_liabilities')),
+}
+
+# Ratio name (as shown by FinancialAnalysisApp) -> TOOL_GRAPH node
+TOOL_RATIOS = {
+    'Profit Margin': 'net_margin',
+    'Return on Assets (ROA)': 'roa',
+    'Return on Equity (ROE)': 'roe',
+    'Gross Margin': 'gross_margin',
+    'Operating Margin': 'operating_margin',
+    'Net Profit Margin': 'net_margin',
+    'Current Ratio': 'current_ratio',
+    'Quick Ratio': 'quick_ratio',
+    'Cash Ratio': 'cash_ratio',
+    'Debt to Equity Ratio': 'gearing',
+    'Debt to Assets Ratio': 'debt_to_assets',
+    'Interest Coverage Ratio': 'interest_coverage',
+    'Equity Ratio': 'equity_ratio',
+    'Asset Turnover': 'asset_turnover',
+    'Inventory Turnover': 'inventory_turnover',
+    'Receivables Turnover': 'receivables_turnover',
+    'Payables Turnover': 'payables_turnover',
+    'Earnings Per Share (EPS)': 'eps',
+    'P/E Ratio': 'pe',
+    'Dividend Yield': 'dividend_yield',
+    'EV to EBITDA Ratio': 'ev_to_ebitda',
+    'Earnings Yield': 'earnings_yield',
+    'PEG Ratio': 'peg',
+    'EV to Sales Ratio': 'ev_to_sales',
+    'Earnings Growth': 'earnings_growth',
+    'Revenue Growth': 'revenue_growth',
+    'Dividend Growth Rate': 'dividend_growth',
+    'Asset Growth': 'asset_growth',
+    'Operating Cash Flow to Net Income': 'ocf_to_net_income',
+    'Free Cash Flow': 'fcf',
+    'Operating Cash Flow to Sales': 'cash_flow_margin',
+    'Cash Flow Coverage Ratio': 'cash_flow_coverage',
+    'Cash Flow Margin': 'cash_flow_margin',
+    'Retention Ratio': 'retention',
+    'Capital Gearing Ratio': 'gearing',
+    'Financial Leverage Ratio': 'leverage',
+    'Debt to Capital Ratio': 'debt_to_capital',
+    'Book Value per Share': 'book_value_per_share',
+    'Market to Book Ratio': 'market_to_book',
+    'Free Cash Flow Yield': 'fcf_yield',
+    'Net Profit Ratio': 'net_margin',
+    'Company Worth': 'company_worth',
+    'Liquidation Value': 'liquidation_value',
+    'Recovery Percentage': 'recovery',
+}
+
+RATIO_NAMES = tuple(TOOL_RATIOS)
+
+# stock-analysis.py's ratio set; nodes named after valuation_core.RESULT_FIELDS
+# are the outputs, the rest are shared intermediates.
+VALUATION_GRAPH = {
+    'equity': (operator.sub, ('total_assets', 'total_liabilities')),
+    'market_value': (operator.mul, ('stock_price', 'equity')),
+    'gross_profit_margin': (_pct, ('gross_profit', 'revenue')),
+    'operating_profit_margin': (_pct, ('operating_profit', 'revenue')),
+    'net_profit_margin': (_pct, ('net_income', 'revenue')),
+    'roa': (_pct_or_inf, ('net_income', 'total_assets')),
+    'eps': (_div, ('net_income', 'equity')),
+    'roe': (operator.mul, ('eps', 100)),
+    'pe_ratio': (_div, ('stock_price', 'eps')),
+    'book_per_equity': (_div, ('book_value', 'equity')),
+    'pb_ratio': (_div, ('stock_price', 'book_per_equity')),
+    'sales_per_equity': (_div, ('revenue', 'equity')),
+    'ps_ratio': (_div, ('stock_price', 'sales_per_equity')),
+    'debt_to_equity_ratio': (_div, ('total_liabilities', 'equity')),
+    'interest_coverage_ratio': (_div_or_inf, ('operating_profit', 'interest_expense')),
+    'free_cash_flow_yield': (_div_or_inf, ('free_cash_flow', 'market_value')),
+    'dividend_yield': (_pct_or_inf, ('dividends', 'stock_price')),
+}
+
+VALUATION_RATIOS = {name: name for name in valuation_core.RESULT_FIELDS}
+
+
+def _select(outputs, names):
+    if names is None:
+        return outputs
+    unknown = [name for name in names if name not in outputs]
+    if unknown:
+        raise ValueError(f"Unknown ratios: {', '.join(unknown)}")
+    return {name: outputs[name] for name in names}
+
+
+def input_dependencies(graph, node):
+    """The set of input columns that `node` (transitively) depends on."""
+    if node not in graph:
+        return {node}
+    deps = set()
+    for arg in graph[node][1]:
+        if isinstance(arg, str):
+            deps |= input_dependencies(graph, arg)
+    return deps
+
+
+def required_inputs(names=None):
+    """Input columns needed to compute the stock-tool ratios in `names` (default all)."""
+    nodes = _select(TOOL_RATIOS, names).values()
+    needed = set().union(*(input_dependencies(TOOL_GRAPH, node) for node in nodes))
+    return tuple(name for name in INPUT_FIELDS if name in needed)
+
+
+def divisors(graph):
+    """Nodes and inputs that `graph` divides by without a zero check, in graph order.
+
+    Where one of them is zero the batch engine gives inf/NaN, while the
+    scalar valuation_core raises.
+    """
+    return tuple(dict.fromkeys(args[1] for func, args in graph.values() if func in (_div, _pct)))
+
+
+def evaluate_graph(graph, outputs, column):
+    """Evaluate the `outputs` ({name: node}) of an expression graph.
+
+    `column(name)` returns an input column as a float64 array and is called
+    at most once per input. Every node is evaluated at most once.
+    """
+    import numpy as np
+
+    values = {}
+    start = time.perf_counter()
+
+    def get(name):
+        value = values.get(name)
+        if value is None:
+            if name in graph:
+                func, args = graph[name]
+                value = func(*(get(arg) if isinstance(arg, str) else arg for arg in args))
+            else:
+                value = column(name)
+            values[name] = value
+        return value
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        result = {name: get(node) for name, node in outputs.items()}
+    metrics.observe("ratio", time.perf_counter() - start, max((np.size(v) for v in result.values()), default=0))
+    return result
+
+
+def as_columns(table, fields=INPUT_FIELDS):
+    """Return a dict of float64 column arrays for `fields` (default all INPUT_FIELDS)."""
+    import numpy as np
+
+    if isinstance(table, np.ndarray):
+        if table.ndim != 2 or table.shape[1] != len(INPUT_FIELDS):
+            raise ValueError(f"Expected an array of shape (rows, {len(INPUT_FIELDS)}), got {table.shape}")
+        return {name: table[:, INPUT_FIELDS.index(name)].astype(np.float64, copy=False) for name in fields}
+
+    missing = [name for name in fields if name not in table]
+    if missing:
+        raise ValueError(f"Missing input columns: {', '.join(missing)}")
+    return {name: np.asarray(table[name], dtype=np.float64) for name in fields}
+
+
+def compute_ratios(table, names=None):
+    """Compute ratios for every row of `table`.
+
+    Returns a dict mapping each name in `names` (default RATIO_NAMES) to a
+    float64 array. Only the requested ratios and the inputs they depend on
+    are evaluated, so `table` only needs those input columns.
+    """
+    columns = as_columns(table, required_inputs(names))
+    return evaluate_graph(TOOL_GRAPH, _select(TOOL_RATIOS, names), columns.__getitem__)
+
+
+def rule_table(table, ratios):
+    """Input columns and ratios merged into one mapping for rules.RuleSet.evaluate."""
+    merged = as_columns(table)
+    merged.update(ratios)
+    return merged
+
+
+def evaluate_rules(table, ratios, ruleset=None):
+    """Evaluate a rule set (default config/stock_tool_rules.json) over the batch."""
+    ruleset = ruleset or rules.stock_tool_rules()
+    return ruleset.evaluate(rule_table(table, ratios))
+
+
+def is_good(ratios, ruleset=None):
+    """Vectorized is_good: {ratio: boolean array} for the rule set's "good" group."""
+    ruleset = (ruleset or rules.stock_tool_rules()).subset("good")
+    return ruleset.evaluate(ratios).group_passed("good")
+
+
+def invalid_mask(ratios):
+    """Per-ratio boolean masks of rows whose value is NaN or infinite."""
+    import numpy as np
+
+    return {name: ~np.isfinite(values) for name, values in ratios.items()}
+
+
+def evaluate_scalar(graph, outputs, record):
+    """evaluate_graph for one company: `record` maps inputs to plain floats.
+
+    Division follows the batch engine (x/0 -> +/-inf, 0/0 -> NaN), so the
+    results match a one-row evaluate_graph exactly.
+    """
+    values = dict(record)
+
+    def get(name):
+        value = values.get(name)
+        if value is None:
+            func, args = graph[name]
+            value = _SCALAR.get(func, func)(*(get(arg) if isinstance(arg, str) else arg for arg in args))
+            values[name] = value
+        return value
+
+    return {name: get(node) for name, node in outputs.items()}
+
+
+def compute_one(values, ruleset=None):
+    """Run a single company through the engine.
+
+    `values` is a sequence of 21 numbers in INPUT_FIELDS order. Returns
+    (ratios, stock_decision, recovery_decision) with plain Python floats/strings.
+    """
+    if len(values) != len(INPUT_FIELDS):
+        raise ValueError(f"Expected {len(INPUT_FIELDS)} input values, got {len(values)}")
+    record = dict(zip(INPUT_FIELDS, map(float, values)))
+    ratios = evaluate_scalar(TOOL_GRAPH, TOOL_RATIOS, record)
+    record.update(ratios)
+    passed, _, decisions = (ruleset or rules.stock_tool_rules()).evaluate_record(record)
+    rules.count_outcomes(len(passed), passed.count(False), len(decisions))
+    return ratios, decisions['Stock Decision'], decisions['Recovery Decision']
+
+
+def compute_valuation_ratios(table, names=None):
+    """Batch version of valuation_core.compute for stock-analysis.py's inputs.
+
+    `table` maps valuation_core.INPUT_FIELDS to arrays. Returns a dict keyed by
+    `names` (default valuation_core.RESULT_FIELDS). Rows with zero equity
+    (which the scalar core rejects) come back as inf/NaN instead of failing
+    the batch.
+    """
+    import numpy as np
+
+    return evaluate_graph(VALUATION_GRAPH, _select(VALUATION_RATIOS, names),
+                          lambda name: np.asarray(table[name], dtype=np.float64))
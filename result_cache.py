@@ -0,0 +1,242 @@
+"""Content-addressed result cache for both tools.
+
+Keys are a hash of the normalized input vector plus the rule set's version
+and content fingerprint, so the same fundamentals scored under the same
+rules are computed once, and editing a threshold without bumping the
+version still misses. Entries
+live in an in-process LRU bounded by entry count, with an optional SQLite
+tier on disk whose entries expire after a TTL. Hit/miss/eviction counters
+can be read with stats() or scraped as Prometheus text; lookups are also
+counted as cache_hits/cache_misses (memory or disk) in metrics.
+
+    cache = result_cache.ResultCache(max_entries=10_000, path="results.sqlite", ttl=86400)
+    ratios, stock_decision, recovery_decision = result_cache.analyze_tool(values, cache)
+"""
+import hashlib
+import math
+import os
+import struct
+import threading
+import time
+from collections import OrderedDict
+
+import metrics
+import rules
+
+DEFAULT_MAX_ENTRIES = 4096
+DEFAULT_TTL = 24 * 60 * 60
+
+_COUNTERS = ("hits", "misses", "evictions", "disk_hits", "disk_misses", "disk_expired", "puts")
+
+
+def rule_key(ruleset):
+    """The part of a cache key that identifies a rule set: its version and content hash."""
+    return f"{ruleset.version}:{ruleset.fingerprint}"
+
+
+def fingerprint(values, version="", namespace=""):
+    """Hash a numeric input vector together with a rule set version.
+
+    -0.0 and 0.0 hash the same, as do all NaN payloads, so equal inputs
+    always give equal keys.
+    """
+    normalized = []
+    for value in values:
+        value = float(value)
+        if math.isnan(value):
+            value = math.nan
+        elif value == 0.0:
+            value = 0.0
+        normalized.append(value)
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(f"{namespace}\0{version}\0{len(normalized)}\0".encode())
+    digest.update(struct.pack(f"<{len(normalized)}d", *normalized))
+    return digest.hexdigest()
+
+
+class ResultCache:
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, path=None, ttl=DEFAULT_TTL):
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+        self.max_entries = max_entries
+        self.path = path
+        self.ttl = ttl
+        self.counters = dict.fromkeys(_COUNTERS, 0)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if path is not None:
+            # The disk tier's modules are only loaded when it is used
+            import sqlite3
+
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value BLOB NOT NULL, created REAL NOT NULL)")
+            self._db.commit()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.counters["hits"] += 1
+                metrics.count("cache_hits")
+                return self._entries[key]
+            self.counters["misses"] += 1
+            if self._db is None:
+                metrics.count("cache_misses")
+                return default
+
+            row = self._db.execute("SELECT value, created FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.counters["disk_misses"] += 1
+                metrics.count("cache_misses")
+                return default
+            value, created = row
+            if self.ttl is not None and time.time() - created > self.ttl:
+                self._db.execute("DELETE FROM results WHERE key = ?", (key,))
+                self._db.commit()
+                self.counters["disk_expired"] += 1
+                metrics.count("cache_misses")
+                return default
+            self.counters["disk_hits"] += 1
+            metrics.count("cache_hits")
+            import pickle
+
+            value = pickle.loads(value)
+            self._remember(key, value)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self.counters["puts"] += 1
+            self._remember(key, value)
+            if self._db is not None:
+                import pickle
+
+                self._db.execute("INSERT OR REPLACE INTO results (key, value, created) VALUES (?, ?, ?)",
+                                 (key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), time.time()))
+                self._db.commit()
+
+    def _remember(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.counters["evictions"] += 1
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value for `key`, computing and storing it on a miss."""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def purge_expired(self):
+        """Delete expired disk entries. Returns how many were removed."""
+        if self._db is None or self.ttl is None:
+            return 0
+        with self._lock:
+            cursor = self._db.execute("DELETE FROM results WHERE created < ?", (time.time() - self.ttl,))
+            self._db.commit()
+            self.counters["disk_expired"] += cursor.rowcount
+            return cursor.rowcount
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM results")
+                self._db.commit()
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+            stats["entries"] = len(self._entries)
+            stats["max_entries"] = self.max_entries
+            lookups = stats["hits"] + stats["misses"]
+            stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+            return stats
+
+    def prometheus(self, prefix="stock_result_cache"):
+        """Counters and gauges in the Prometheus text exposition format."""
+        stats = self.stats()
+        lines = []
+        for name in _COUNTERS:
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            lines.append(f"{prefix}_{name}_total {stats[name]}")
+        for name in ("entries", "max_entries", "hit_ratio"):
+            lines.append(f"# TYPE {prefix}_{name} gauge")
+            lines.append(f"{prefix}_{name} {stats[name]}")
+        return "\n".join(lines) + "\n"
+
+
+_MISSING = object()
+_default = None
+
+
+def default_cache():
+    """The process-wide cache used by the GUIs.
+
+    STOCK_RESULT_CACHE names an SQLite file for the disk tier and
+    STOCK_RESULT_CACHE_TTL overrides its TTL in seconds.
+    """
+    global _default
+    if _default is None:
+        _default = ResultCache(path=os.environ.get("STOCK_RESULT_CACHE"),
+                               ttl=float(os.environ.get("STOCK_RESULT_CACHE_TTL", DEFAULT_TTL)))
+    return _default
+
+
+def analyze_tool(values, cache=None, ruleset=None):
+    """Cached ratio_engine.compute_one: (ratios, stock_decision, recovery_decision)."""
+    import ratio_engine
+
+    if cache is None:
+        cache = default_cache()
+    ruleset = ruleset or rules.stock_tool_rules()
+    key = fingerprint(values, rule_key(ruleset), "stock-tool")
+
+    def analyze():
+        # compute_one scores the rules as well, so this covers both stages
+        with metrics.timer("ratio", rows=1):
+            return ratio_engine.compute_one(values, ruleset)
+
+    return cache.get_or_compute(key, analyze)
+
+
+def analyze_valuation(inputs, cache=None, ruleset=None):
+    """Cached valuation_core.analyze: (result, suggestions, final_decision).
+
+    Errors (e.g. zero equity) are raised, not cached.
+    """
+    import valuation_core
+
+    if cache is None:
+        cache = default_cache()
+    ruleset = ruleset or rules.valuation_rules()
+    key = fingerprint(inputs.as_tuple(), rule_key(ruleset), "valuation")
+
+    def analyze():
+        # Timed here rather than in valuation_core, whose batch loop is too hot for per-record timers
+        with metrics.timer("ratio", rows=1):
+            result = valuation_core.compute(inputs)
+        with metrics.timer("rule", rows=1):
+            suggestions, decision = valuation_core.score(result, ruleset)
+            # Suggestions are the labels of the rules that passed
+            rules.count_outcomes(len(ruleset.rules), len(ruleset.rules) - len(suggestions), len(ruleset.decisions))
+        return result, suggestions, decision
+
+    return cache.get_or_compute(key, analyze)
@@ -0,0 +1,328 @@
+"""Virtualized, sortable and filterable results grid for the GUIs.
+
+GridModel holds result columns as arrays, plus packed pass/fail bitmaps for
+the columns that have rules, and keeps the rows currently on show as an
+index array. Sorting reuses one cached argsort per column, and filtering is
+a boolean mask over the rows, so neither touches any widgets.
+
+ResultsGrid draws a GridModel on a Canvas with a fixed pool of text items,
+one per visible cell. Scrolling rewrites those items' text and colour from
+the model, so the cost of a frame depends on the window size, not on the
+number of rows or columns.
+
+    model = results_grid.GridModel.from_results(frame, rules.stock_tool_rules(), key="ticker")
+    grid = results_grid.ResultsGrid(window, model, filter_bar=True)
+    grid.frame.pack(fill="both", expand=True)
+"""
+import re
+import time
+
+import numpy as np
+
+import metrics
+import ranking
+import rules
+
+PASS_COLOR = "green"
+FAIL_COLOR = "red"
+TEXT_COLOR = "black"
+
+_FILTER_OPS = dict(rules._UFUNCS, **{"==": "equal", "!=": "not_equal"})
+_CLAUSE = re.compile(r"^\s*(.+?)\s*(>=|<=|==|!=|>|<)\s*(.+?)\s*$")
+
+
+class GridModel:
+    def __init__(self, columns, bitmaps=None, key=None):
+        # Own copies, since set_value() writes into them
+        self.columns = {}
+        for name, values in columns.items():
+            values = np.array(values)
+            if values.dtype == object:
+                values = values.astype(str)
+            self.columns[name] = values
+        # The key column (e.g. ticker) comes first, so it is the one frozen in the grid
+        self.key = key or next(iter(self.columns))
+        self.names = (self.key,) + tuple(name for name in self.columns if name != self.key)
+        # column -> pass bits packed 8 rows per byte (little bit order), as from RuleResult.bitmaps()
+        self.bitmaps = dict(bitmaps or {})
+        self.row_count = len(self.columns[self.names[0]])
+        self.sort_column = None
+        self.descending = False
+        self.mask = None
+        self.order = np.arange(self.row_count)
+        self._argsort = {}
+
+    @classmethod
+    def from_results(cls, table, ruleset=None, group="good", key=None):
+        """A model over a results table, coloured by the rules of `group` on each column."""
+        columns = {name: np.asarray(table[name]) for name in table.keys()}
+        ruleset = ruleset or rules.stock_tool_rules()
+        applicable = [rule for rule in ruleset.subset(group).rules
+                      if rule.column in columns and (not isinstance(rule.threshold, str) or rule.threshold in columns)]
+        bitmaps = {}
+        if applicable:
+            passed = rules.RuleSet(applicable).evaluate(columns).passed
+            by_column = {}
+            for i, rule in enumerate(applicable):
+                by_column[rule.column] = passed[i] if rule.column not in by_column else by_column[rule.column] & passed[i]
+            bitmaps = {name: np.packbits(flags, bitorder="little") for name, flags in by_column.items()}
+        return cls(columns, bitmaps, key)
+
+    def __len__(self):
+        return len(self.order)
+
+    def _sorted(self, column):
+        order = self._argsort.get(column)
+        if order is None:
+            order = np.argsort(self.columns[column], kind="stable")
+            self._argsort[column] = order
+        return order
+
+    def _refresh_order(self):
+        if self.sort_column is None:
+            order = np.arange(self.row_count)
+        else:
+            order = self._sorted(self.sort_column)
+            if self.descending:
+                values = self.columns[self.sort_column]
+                if values.dtype.kind == "f":
+                    # Reverse the non-NaN part only, so NaN rows stay at the bottom
+                    valid = np.count_nonzero(~np.isnan(values))
+                    order = np.concatenate((order[:valid][::-1], order[valid:]))
+                else:
+                    order = order[::-1]
+        self.order = order if self.mask is None else order[self.mask[order]]
+
+    def sort(self, column, descending=False):
+        if column not in self.columns:
+            raise ValueError(f"Unknown column: {column}")
+        self.sort_column = column
+        self.descending = descending
+        self._refresh_order()
+
+    def filter(self, mask=None):
+        """Show only rows where `mask` is True (None shows every row)."""
+        self.mask = None if mask is None else np.asarray(mask, dtype=np.bool_)
+        self._refresh_order()
+
+    def where(self, expression):
+        """Boolean row mask for clauses like "Profit Margin > 0.1, Stock Decision == BUY".
+
+        Clauses are joined by "," or ";" and must all hold. The right-hand
+        side is a number, a percentile of the column ("p75"), another column
+        or (for == and !=) a literal.
+        """
+        mask = np.ones(self.row_count, dtype=np.bool_)
+        for clause in re.split(r"[;,]", expression):
+            if not clause.strip():
+                continue
+            match = _CLAUSE.match(clause)
+            if match is None:
+                raise ValueError(f"Cannot parse filter clause: {clause.strip()!r}")
+            column, op, operand = match.groups()
+            if column not in self.columns:
+                raise ValueError(f"Unknown column: {column}")
+            values = self.columns[column]
+            if operand in self.columns:
+                right = self.columns[operand]
+            elif values.dtype.kind == "f" and ranking.percentile_of(operand) is not None:
+                # The cached argsort leaves NaN at the end
+                ordered = values[self._sorted(column)]
+                ordered = ordered[:len(ordered) - np.count_nonzero(np.isnan(values))]
+                right = ranking.sorted_percentile(ordered, ranking.percentile_of(operand))
+            elif values.dtype.kind in "fiub":
+                try:
+                    right = float(operand)
+                except ValueError:
+                    raise ValueError(f"Expected a number or column after {op!r}, got {operand!r}") from None
+            elif op in ("==", "!="):
+                right = operand
+            else:
+                raise ValueError(f"Column {column!r} only supports == and !=")
+            with np.errstate(invalid="ignore"):
+                mask &= getattr(np, _FILTER_OPS[op])(values, right)
+        return mask
+
+    def set_value(self, column, row, value, passed=None):
+        """Change one cell (by model row), and its pass flag when `passed` is given."""
+        self.columns[column][row] = value
+        self._argsort.pop(column, None)
+        if passed is not None:
+            bits = self.bitmaps.setdefault(column, np.zeros((self.row_count + 7) // 8, dtype=np.uint8))
+            if passed:
+                bits[row >> 3] |= np.uint8(1 << (row & 7))
+            else:
+                bits[row >> 3] &= np.uint8(~(1 << (row & 7)) & 0xFF)
+        if column == self.sort_column:
+            self._refresh_order()
+
+    def window(self, start, stop, columns):
+        """Cells for displayed rows [start, stop) of `columns`.
+
+        Returns (rows, texts, colours): the model row numbers, then one list
+        per column of formatted strings and of colours.
+        """
+        rows = self.order[start:stop]
+        texts = []
+        colours = []
+        for name in columns:
+            values = self.columns[name]
+            if values.dtype.kind == "f":
+                texts.append([f"{value:.2f}" for value in values[rows].tolist()])
+            else:
+                texts.append([str(value) for value in values[rows].tolist()])
+            bits = self.bitmaps.get(name)
+            if bits is None:
+                colours.append([TEXT_COLOR] * len(rows))
+            else:
+                passed = (bits[rows >> 3] >> (rows & 7).astype(np.uint8)) & 1
+                colours.append([PASS_COLOR if ok else FAIL_COLOR for ok in passed.tolist()])
+        return rows, texts, colours
+
+
+class ResultsGrid:
+    """Canvas grid over a GridModel. The first `frozen` columns stay put when scrolling sideways."""
+
+    def __init__(self, parent, model, visible_rows=25, visible_columns=6, frozen=1,
+                 column_width=140, row_height=22, filter_bar=False):
+        import tkinter as tk
+        from tkinter import ttk
+
+        self.model = model
+        self.visible_rows = visible_rows
+        self.frozen = min(frozen, len(model.names))
+        self.visible_columns = min(visible_columns, len(model.names) - self.frozen)
+        self.column_width = column_width
+        self.row_height = row_height
+        self.top = 0
+        self.left = 0
+        self._pending = False
+
+        self.frame = ttk.Frame(parent)
+        slots = self.frozen + self.visible_columns
+        self.canvas = tk.Canvas(self.frame, width=slots * column_width, height=(visible_rows + 1) * row_height,
+                                bg="white", highlightthickness=0)
+        self.vbar = ttk.Scrollbar(self.frame, orient="vertical", command=self.yview)
+        self.hbar = ttk.Scrollbar(self.frame, orient="horizontal", command=self.xview)
+        self.canvas.grid(row=1, column=0, sticky="nsew")
+        self.vbar.grid(row=1, column=1, sticky="ns")
+        self.hbar.grid(row=2, column=0, sticky="ew")
+        self.frame.rowconfigure(1, weight=1)
+        self.frame.columnconfigure(0, weight=1)
+
+        if filter_bar:
+            bar = ttk.Frame(self.frame)
+            bar.grid(row=0, column=0, columnspan=2, sticky="ew")
+            self.filter_entry = tk.Entry(bar, width=60)
+            self.filter_entry.pack(side="left", padx=5, pady=5)
+            self.filter_entry.bind("<Return>", lambda e: self.apply_filter())
+            tk.Button(bar, text="Filter", command=self.apply_filter).pack(side="left", padx=5)
+            self.count_label = tk.Label(bar, text="")
+            self.count_label.pack(side="left", padx=5)
+        else:
+            self.count_label = None
+
+        # A fixed pool of canvas items: one header and `visible_rows` cells per column slot
+        self.headers = []
+        self.cells = []
+        for slot in range(slots):
+            x = slot * column_width
+            self.canvas.create_rectangle(x, 0, x + column_width, row_height, fill="#e0e0e0", outline="#b0b0b0")
+            header = self.canvas.create_text(x + 6, row_height // 2, anchor="w", font=('Arial', 10, 'bold'))
+            self.canvas.tag_bind(header, "<Button-1>", lambda e, s=slot: self.sort_slot(s))
+            self.headers.append(header)
+            self.cells.append([self.canvas.create_text(x + 6, (r + 1) * row_height + row_height // 2, anchor="w",
+                                                       font=('Arial', 10))
+                               for r in range(visible_rows)])
+
+        for widget in (self.canvas, self.frame):
+            widget.bind("<MouseWheel>", lambda e: self.scroll_rows(-1 if e.delta > 0 else 1))
+            widget.bind("<Button-4>", lambda e: self.scroll_rows(-1))
+            widget.bind("<Button-5>", lambda e: self.scroll_rows(1))
+        self.refresh()
+
+    def displayed_columns(self):
+        names = self.model.names
+        start = self.frozen + self.left
+        return names[:self.frozen] + names[start:start + self.visible_columns]
+
+    def refresh(self):
+        """Redraw the visible window from the model."""
+        start = time.perf_counter()
+        self._pending = False
+        columns = self.displayed_columns()
+        rows, texts, colours = self.model.window(self.top, self.top + self.visible_rows, columns)
+        for slot, name in enumerate(columns):
+            arrow = ""
+            if name == self.model.sort_column:
+                arrow = " ▼" if self.model.descending else " ▲"
+            self.canvas.itemconfigure(self.headers[slot], text=name + arrow)
+            for r, item in enumerate(self.cells[slot]):
+                if r < len(rows):
+                    self.canvas.itemconfigure(item, text=texts[slot][r], fill=colours[slot][r])
+                else:
+                    self.canvas.itemconfigure(item, text="")
+
+        total = len(self.model)
+        if total:
+            self.vbar.set(self.top / total, min(self.top + self.visible_rows, total) / total)
+        else:
+            self.vbar.set(0, 1)
+        scrollable = len(self.model.names) - self.frozen
+        if scrollable:
+            self.hbar.set(self.left / scrollable, min(self.left + self.visible_columns, scrollable) / scrollable)
+        if self.count_label is not None:
+            self.count_label.config(text=f"{total:,} of {self.model.row_count:,} rows")
+        metrics.observe("render", time.perf_counter() - start, len(rows))
+
+    def schedule_refresh(self):
+        # Coalesce bursts of scroll events into one redraw
+        if not self._pending:
+            self._pending = True
+            self.canvas.after_idle(self.refresh)
+
+    def scroll_rows(self, delta):
+        self.scroll_to(self.top + delta)
+
+    def scroll_to(self, top):
+        top = max(0, min(int(top), len(self.model) - self.visible_rows))
+        if top != self.top:
+            self.top = top
+            self.schedule_refresh()
+
+    def yview(self, *args):
+        # Scrollbar protocol: ("moveto", fraction) or ("scroll", n, "units" | "pages")
+        if args[0] == "moveto":
+            self.scroll_to(float(args[1]) * len(self.model))
+        elif args[0] == "scroll":
+            step = self.visible_rows if args[2] == "pages" else 1
+            self.scroll_rows(int(args[1]) * step)
+
+    def xview(self, *args):
+        scrollable = len(self.model.names) - self.frozen
+        if args[0] == "moveto":
+            left = int(float(args[1]) * scrollable)
+        else:
+            left = self.left + int(args[1]) * (self.visible_columns if args[2] == "pages" else 1)
+        left = max(0, min(left, scrollable - self.visible_columns))
+        if left != self.left:
+            self.left = left
+            self.schedule_refresh()
+
+    def sort_slot(self, slot):
+        """Sort by the column shown in header `slot`; clicking it again reverses the order."""
+        column = self.displayed_columns()[slot]
+        descending = column == self.model.sort_column and not self.model.descending
+        self.model.sort(column, descending)
+        self.top = 0
+        self.refresh()
+
+    def apply_filter(self):
+        expression = self.filter_entry.get()
+        try:
+            self.model.filter(self.model.where(expression) if expression.strip() else None)
+        except ValueError as e:
+            self.count_label.config(text=str(e))
+            return
+        self.top = 0
+        self.refresh()
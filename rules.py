@@ -0,0 +1,305 @@
+"""Declarative screening rules compiled into array comparisons.
+
+A rule set is loaded from a JSON file in config/ and holds:
+
+    rules      - {"column", "op", "threshold", "weight", "label", "group"}.
+                 `threshold` is a number or the name of another column.
+    decisions  - {"name", "group", "bands": [[min_score, label], ...], "default"}.
+                 The first band whose min_score the group's score reaches wins.
+
+RuleSet.evaluate() runs every rule over a whole batch in one vectorized pass
+and returns per-rule pass/fail rows, bitmaps, weighted group scores and
+decision labels. RuleSet.evaluate_record() is the scalar path used by the
+GUIs; it needs no NumPy, so valuation_core stays cheap to import.
+"""
+import hashlib
+import json
+import operator
+import os
+import time
+from functools import lru_cache
+
+import metrics
+
+CONFIG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config")
+STOCK_TOOL_RULES = os.path.join(CONFIG_DIR, "stock_tool_rules.json")
+VALUATION_RULES = os.path.join(CONFIG_DIR, "valuation_rules.json")
+DCF_RULES = os.path.join(CONFIG_DIR, "dcf_rules.json")
+
+_OPS = {">=": operator.ge, ">": operator.gt, "<=": operator.le, "<": operator.lt}
+_UFUNCS = {">=": "greater_equal", ">": "greater", "<=": "less_equal", "<": "less"}
+
+
+class Rule:
+    __slots__ = ("column", "op", "threshold", "weight", "label", "group")
+
+    def __init__(self, column, op, threshold, weight=1.0, label=None, group="default"):
+        if op not in _OPS:
+            raise ValueError(f"Unknown operator {op!r} in rule for {column!r}; expected one of {', '.join(_OPS)}")
+        if not isinstance(threshold, str):
+            threshold = float(threshold)
+        self.column = column
+        self.op = op
+        self.threshold = threshold
+        self.weight = float(weight)
+        self.label = label or column
+        self.group = group
+
+    @classmethod
+    def from_dict(cls, spec):
+        return cls(spec["column"], spec["op"], spec["threshold"], spec.get("weight", 1.0),
+                   spec.get("label"), spec.get("group", "default"))
+
+    def to_dict(self):
+        return {"column": self.column, "op": self.op, "threshold": self.threshold,
+                "weight": self.weight, "label": self.label, "group": self.group}
+
+    def __repr__(self):
+        return f"Rule({self.column!r} {self.op} {self.threshold!r}, group={self.group!r})"
+
+
+class Decision:
+    __slots__ = ("name", "group", "bands", "default")
+
+    def __init__(self, name, group, bands, default):
+        self.name = name
+        self.group = group
+        self.bands = tuple(sorted(((float(score), label) for score, label in bands), reverse=True))
+        self.default = default
+
+    @classmethod
+    def from_dict(cls, spec):
+        return cls(spec["name"], spec["group"], spec["bands"], spec["default"])
+
+    def to_dict(self):
+        return {"name": self.name, "group": self.group,
+                "bands": [[score, label] for score, label in self.bands], "default": self.default}
+
+    def label_for(self, score):
+        for min_score, label in self.bands:
+            if score >= min_score:
+                return label
+        return self.default
+
+
+class RuleSet:
+    def __init__(self, rules, decisions=(), version=None):
+        self.rules = tuple(rules)
+        self.decisions = tuple(decisions)
+        self.groups = tuple(dict.fromkeys(rule.group for rule in self.rules))
+        for decision in self.decisions:
+            if decision.group not in self.groups:
+                raise ValueError(f"Decision {decision.name!r} refers to unknown group {decision.group!r}")
+
+        columns = []
+        for rule in self.rules:
+            columns.append(rule.column)
+            if isinstance(rule.threshold, str):
+                columns.append(rule.threshold)
+        self.columns = tuple(dict.fromkeys(columns))
+
+        canonical = json.dumps(self.to_dict(include_version=False), sort_keys=True)
+        self.fingerprint = hashlib.sha256(canonical.encode()).hexdigest()[:16]
+        self.version = version or self.fingerprint
+
+        # Scalar lookup for the GUIs: (group, column) -> [(op, threshold), ...]
+        self._by_column = {}
+        for rule in self.rules:
+            self._by_column.setdefault((rule.group, rule.column), []).append((_OPS[rule.op], rule.threshold))
+        self._compiled = None
+        self._subsets = {}
+
+    @classmethod
+    def from_dict(cls, spec):
+        return cls([Rule.from_dict(rule) for rule in spec["rules"]],
+                   [Decision.from_dict(decision) for decision in spec.get("decisions", ())],
+                   spec.get("version"))
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+    def to_dict(self, include_version=True):
+        spec = {"rules": [rule.to_dict() for rule in self.rules],
+                "decisions": [decision.to_dict() for decision in self.decisions]}
+        if include_version:
+            spec["version"] = self.version
+        return spec
+
+    def subset(self, *groups):
+        """A RuleSet with only the rules (and decisions) of `groups`, compiled once."""
+        subset = self._subsets.get(groups)
+        if subset is None:
+            subset = RuleSet([rule for rule in self.rules if rule.group in groups],
+                             [decision for decision in self.decisions if decision.group in groups],
+                             self.version)
+            self._subsets[groups] = subset
+        return subset
+
+    def check(self, column, value, group=None):
+        """True if `value` passes every constant-threshold rule on `column`."""
+        groups = (group,) if group is not None else self.groups
+        for g in groups:
+            for op, threshold in self._by_column.get((g, column), ()):
+                if not isinstance(threshold, str) and not op(value, threshold):
+                    return False
+        return True
+
+    def evaluate_record(self, record):
+        """Evaluate one record (a mapping of column -> number) without NumPy.
+
+        Returns (passed, scores, decisions): a list of booleans in rule order,
+        a {group: score} dict and a {decision name: label} dict.
+        """
+        passed = []
+        scores = dict.fromkeys(self.groups, 0.0)
+        for rule in self.rules:
+            threshold = record[rule.threshold] if isinstance(rule.threshold, str) else rule.threshold
+            ok = _OPS[rule.op](record[rule.column], threshold)
+            passed.append(ok)
+            if ok:
+                scores[rule.group] += rule.weight
+        decisions = {decision.name: decision.label_for(scores[decision.group]) for decision in self.decisions}
+        return passed, scores, decisions
+
+    def passed_labels(self, passed):
+        """Labels of the rules marked True in a per-rule sequence from evaluate_record."""
+        return [rule.label for rule, ok in zip(self.rules, passed) if ok]
+
+    def _compile(self):
+        import numpy as np
+
+        column_index = {name: i for i, name in enumerate(self.columns)}
+
+        # One comparison per (operator, threshold kind), each over all the rules it covers:
+        # (ufunc, rule rows, value column indexes, thresholds or threshold column indexes, is_column)
+        comparisons = []
+        for op, ufunc_name in _UFUNCS.items():
+            ufunc = getattr(np, ufunc_name)
+            for is_column in (False, True):
+                rows = [i for i, rule in enumerate(self.rules)
+                        if rule.op == op and isinstance(rule.threshold, str) == is_column]
+                if not rows:
+                    continue
+                value_index = np.array([column_index[self.rules[i].column] for i in rows], dtype=np.intp)
+                if is_column:
+                    thresholds = np.array([column_index[self.rules[i].threshold] for i in rows], dtype=np.intp)
+                else:
+                    thresholds = np.array([[self.rules[i].threshold] for i in rows])
+                comparisons.append((ufunc, np.array(rows, dtype=np.intp), value_index, thresholds, is_column))
+
+        weights = np.zeros((len(self.groups), len(self.rules)))
+        for i, rule in enumerate(self.rules):
+            weights[self.groups.index(rule.group), i] = rule.weight
+
+        # group -> (rule rows, their weights), for scoring a single group
+        group_weights = {}
+        for g, group in enumerate(self.groups):
+            rows = np.flatnonzero(weights[g])
+            group_weights[group] = (rows, weights[g, rows])
+
+        self._compiled = (comparisons, weights, group_weights)
+        return self._compiled
+
+    def evaluate(self, table):
+        """Evaluate every rule over a batch.
+
+        `table` maps column names to equal-length arrays (a DataFrame works).
+        NaN values fail every comparison.
+        """
+        import numpy as np
+
+        start = time.perf_counter()
+        comparisons = (self._compiled or self._compile())[0]
+        values = np.stack([np.asarray(table[name], dtype=np.float64) for name in self.columns])
+
+        passed = np.empty((len(self.rules), values.shape[1]), dtype=np.bool_)
+        with np.errstate(invalid='ignore'):
+            for ufunc, rows, value_index, thresholds, is_column in comparisons:
+                right = values[thresholds] if is_column else thresholds
+                passed[rows] = ufunc(values[value_index], right)
+        count_outcomes(passed.size, passed.size - int(np.count_nonzero(passed)))
+        metrics.observe("rule", time.perf_counter() - start, values.shape[1])
+        return RuleResult(self, passed)
+
+    def __reduce__(self):
+        # Ship the spec, not the compiled arrays, to worker processes
+        return (RuleSet.from_dict, (self.to_dict(),))
+
+
+class RuleResult:
+    """Outcome of RuleSet.evaluate: a (rules, rows) boolean `passed` matrix."""
+
+    __slots__ = ("ruleset", "passed")
+
+    def __init__(self, ruleset, passed):
+        self.ruleset = ruleset
+        self.passed = passed
+
+    def bitmaps(self):
+        """Per-rule pass bitmaps packed 8 rows per byte (little bit order)."""
+        import numpy as np
+
+        return np.packbits(self.passed, axis=1, bitorder="little")
+
+    def scores(self, groups=None):
+        """Weighted pass score per group: {group: float array}.
+
+        `groups` limits the result (and the work) to those groups.
+        """
+        _, weights, group_weights = self.ruleset._compiled or self.ruleset._compile()
+        if groups is None:
+            totals = weights @ self.passed
+            return {group: totals[i] for i, group in enumerate(self.ruleset.groups)}
+        scores = {}
+        for group in groups:
+            rows, group_weight = group_weights[group]
+            scores[group] = group_weight @ self.passed[rows]
+        return scores
+
+    def group_passed(self, group):
+        """{rule label: boolean row} for the rules in `group`."""
+        return {rule.label: self.passed[i] for i, rule in enumerate(self.ruleset.rules) if rule.group == group}
+
+    def decisions(self, names=None):
+        """{decision name: label array} for the rule set's decisions (or just `names`)."""
+        import numpy as np
+
+        decisions = [d for d in self.ruleset.decisions if names is None or d.name in names]
+        scores = self.scores(groups=tuple(dict.fromkeys(d.group for d in decisions)))
+        labels = {}
+        for decision in decisions:
+            score = scores[decision.group]
+            conditions = [score >= min_score for min_score, _ in decision.bands]
+            choices = [label for _, label in decision.bands]
+            labels[decision.name] = np.select(conditions, choices, default=decision.default)
+        count_outcomes(0, 0, len(decisions) * self.passed.shape[1])
+        return labels
+
+
+def count_outcomes(checks, failures, decisions=0):
+    """Add rule checks, failed checks and assigned decision labels to the metrics counters.
+
+    evaluate() and RuleResult.decisions() count their own; scalar callers
+    count once per analysis or batch, as evaluate_record() is too hot to.
+    """
+    metrics.count_many((("rule_checks", checks), ("rule_failures", failures), ("decisions", decisions)))
+
+
+@lru_cache(maxsize=None)
+def load(path):
+    """Load and compile a rule set once per path."""
+    return RuleSet.load(path)
+
+
+def stock_tool_rules():
+    return load(STOCK_TOOL_RULES)
+
+
+def valuation_rules():
+    return load(VALUATION_RULES)
+
+
+def dcf_rules():
+    return load(DCF_RULES)
@@ -0,0 +1,194 @@
+"""Command-line bulk screener for stock-tool.py's ratio set.
+
+Streams company fundamentals from CSV or Parquet in fixed-size chunks, runs
+ratio_engine and a rule set (is_good thresholds, BUY / SAFE decisions; see
+config/stock_tool_rules.json) on each chunk
+and appends the results to a CSV, Parquet, Arrow or XLSX output (see
+export.py) as it goes, so peak memory depends on the chunk size rather than
+the input size.
+
+Input columns are the names in ratio_engine.INPUT_FIELDS; any other columns
+(ticker, period, ...) are passed through to the output unchanged (as text
+when read from CSV).
+
+    python screener.py fundamentals.parquet results.csv --chunk-size 200000
+"""
+import argparse
+import os
+import resource
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+import export
+import metrics
+import ratio_engine
+import rules
+
+DEFAULT_CHUNK_SIZE = 100_000
+
+
+def _format(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".parquet", ".pq"):
+        return "parquet"
+    if ext in (".csv", ".txt", ".gz"):
+        return "csv"
+    raise ValueError(f"Unsupported file type: {path} (expected .csv or .parquet)")
+
+
+def _dtypes(columns):
+    # Fixed for the whole file: read_csv infers each chunk's types on its own,
+    # so a pass-through column that is empty in one chunk would come out float
+    return {name: "float64" if name in ratio_engine.INPUT_FIELDS else object for name in columns}
+
+
+def iter_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield DataFrames of at most `chunk_size` rows read from `path`.
+
+    Input fields are float64 and other CSV columns are kept as text in every
+    chunk, so the chunks share one set of column types.
+    """
+    if _format(path) == "parquet":
+        parquet = pq.ParquetFile(path)
+        inputs = {name: "float64" for name in parquet.schema_arrow.names if name in ratio_engine.INPUT_FIELDS}
+        chunks = (batch.to_pandas().astype(inputs) for batch in parquet.iter_batches(batch_size=chunk_size))
+    else:
+        columns = pd.read_csv(path, nrows=0).columns
+        chunks = iter(pd.read_csv(path, chunksize=chunk_size, dtype=_dtypes(columns)))
+    while True:
+        # Time the read and parse of each chunk, not the caller's work between chunks
+        start = time.perf_counter()
+        frame = next(chunks, None)
+        if frame is None:
+            return
+        metrics.observe("parse", time.perf_counter() - start, len(frame))
+        yield frame
+
+
+def screen_chunk(frame, flags=False, pool=None, ruleset=None, dcf_paths=0, seed=None):
+    """Screen one chunk of fundamentals and return the result frame.
+
+    `pool` is an optional parallel_screen.ParallelScreener to spread the
+    chunk over several processes; it carries its own rule set. With
+    `dcf_paths`, Monte Carlo DCF value bands and the DCF Decision are added.
+    """
+    if pool is not None:
+        ratios, result = pool.screen(frame)
+    else:
+        ratios = ratio_engine.compute_ratios(frame)
+        result = ratio_engine.evaluate_rules(frame, ratios, ruleset)
+
+    passthrough = [name for name in frame.columns if name not in ratio_engine.INPUT_FIELDS]
+    columns = {name: frame[name].to_numpy() for name in passthrough}
+    columns.update(ratios)
+    if flags:
+        columns.update((f"{rule.label} OK", result.passed[i]) for i, rule in enumerate(result.ruleset.rules))
+    columns.update((f"{group.title()} Score", score) for group, score in result.scores().items())
+    columns.update(result.decisions())
+    metrics.count("rows_screened", len(frame))
+    if dcf_paths:
+        import dcf
+
+        valuation, price = dcf.value_stock_tool(frame, paths=dcf_paths, seed=seed)
+        columns.update(valuation.bands)
+        columns["DCF Decision"] = dcf.decide(valuation.bands, price)
+    return pd.DataFrame(columns, index=frame.index)
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def run(input_path, output_path, chunk_size=DEFAULT_CHUNK_SIZE, flags=False, workers=1, ruleset=None,
+        dcf_paths=0, seed=None):
+    """Screen `input_path` into `output_path`. Returns a stats dict."""
+    ruleset = ruleset or rules.stock_tool_rules()
+    # One independent random stream per chunk
+    seeds = np.random.SeedSequence(seed)
+    rows = 0
+    chunks = 0
+    start = time.perf_counter()
+    pool = None
+    if workers > 1:
+        import parallel_screen
+
+        pool = parallel_screen.ParallelScreener(workers=workers, capacity=chunk_size, ruleset=ruleset)
+    try:
+        with export.ExportWriter(output_path) as writer:
+            for frame in iter_chunks(input_path, chunk_size):
+                writer.write(screen_chunk(frame, flags=flags, pool=pool, ruleset=ruleset,
+                                          dcf_paths=dcf_paths, seed=seeds.spawn(1)[0]))
+                rows += len(frame)
+                chunks += 1
+    finally:
+        if pool is not None:
+            pool.close()
+    elapsed = time.perf_counter() - start
+    return {
+        "rows": rows,
+        "chunks": chunks,
+        "seconds": elapsed,
+        "rows_per_sec": rows / elapsed if elapsed > 0 else float('inf'),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Screen company fundamentals from CSV or Parquet.")
+    parser.add_argument("input", help="input .csv or .parquet file")
+    parser.add_argument("output", help="output .csv, .parquet, .arrow or .xlsx file")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"rows per chunk (default {DEFAULT_CHUNK_SIZE})")
+    parser.add_argument("--flags", action="store_true",
+                        help="write a pass/fail column for every rule")
+    parser.add_argument("--rules", default=rules.STOCK_TOOL_RULES,
+                        help="rule set JSON file (default config/stock_tool_rules.json)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="processes to spread each chunk over (default 1, in-process)")
+    parser.add_argument("--dcf-paths", type=int, default=0,
+                        help="Monte Carlo DCF paths per company (default 0, off)")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="random seed for the DCF simulation")
+    parser.add_argument("--metrics", default=None,
+                        help="write per-stage timings to this .json or .prom file and print a summary")
+    parser.add_argument("--profile", default=None,
+                        help="profile the run into this file: cProfile stats, or sampled stacks if it ends in .folded")
+    args = parser.parse_args(argv)
+
+    if args.chunk_size <= 0:
+        parser.error("--chunk-size must be positive")
+    if args.workers <= 0:
+        parser.error("--workers must be positive")
+    if args.dcf_paths < 0:
+        parser.error("--dcf-paths must not be negative")
+
+    metrics.start_run("screener")
+    profiler = None
+    if args.profile:
+        mode = "sample" if args.profile.endswith(".folded") else "cprofile"
+        profiler = metrics.Profiler(mode, args.profile).start()
+    try:
+        stats = run(args.input, args.output, chunk_size=args.chunk_size, flags=args.flags,
+                    workers=args.workers, ruleset=rules.load(args.rules), dcf_paths=args.dcf_paths, seed=args.seed)
+    finally:
+        if profiler is not None:
+            profiler.stop()
+    print(f"Screened {stats['rows']:,} rows in {stats['chunks']} chunks in {stats['seconds']:.2f}s "
+          f"({stats['rows_per_sec']:,.0f} rows/sec), peak RSS {stats['peak_rss_mb']:.1f} MB")
+    if args.metrics:
+        metrics.write_snapshot(args.metrics)
+        for line in metrics.report():
+            print(f"  {line}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
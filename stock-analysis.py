@@ -1,12 +1,43 @@
 import tkinter as tk
-from tkinter import Canvas, messagebox
+from tkinter import messagebox
 import logging
-
-# Configure logging
-logging.basicConfig(filename='stock_analysis.log', level=logging.ERROR, format='%(asctime)s - %(levelname)s - %(message)s')
+import os
+import time
+
+import jobs
+import metrics
+import result_cache
+import rules
+import valuation_core
+
+# Ratio rows of the results grid
+RATIO_LABELS = (
+    ("Gross Profit Margin (%)", "gross_profit_margin"),
+    ("Operating Profit Margin (%)", "operating_profit_margin"),
+    ("Net Profit Margin (%)", "net_profit_margin"),
+    ("Return on Assets (ROA) (%)", "roa"),
+    ("Return on Equity (ROE) (%)", "roe"),
+    ("Price-to-Earnings Ratio (P/E)", "pe_ratio"),
+    ("Price-to-Book Ratio (P/B)", "pb_ratio"),
+    ("Price-to-Sales Ratio (P/S)", "ps_ratio"),
+    ("Debt-to-Equity Ratio", "debt_to_equity_ratio"),
+    ("Interest Coverage Ratio", "interest_coverage_ratio"),
+    ("Earnings Per Share (EPS)", "eps"),
+    ("Free Cash Flow Yield (%)", "free_cash_flow_yield"),
+    ("Dividend Yield (%)", "dividend_yield"),
+)
+
+# Configure logging (STOCK_LOG_LEVEL=INFO adds per-analysis timings); the file is only
+# created by the first record, so importing the module does not write it
+logging.basicConfig(handlers=[logging.FileHandler('stock_analysis.log', delay=True)],
+                    level=os.environ.get("STOCK_LOG_LEVEL", "ERROR").upper(),
+                    format='%(asctime)s - %(levelname)s - %(message)s')
 
 def create_gui():
+    global root, runner
+    metrics.start_run("stock-analysis")
     root = tk.Tk()
+    runner = jobs.JobRunner(root)
     root.title("Comprehensive Stock Valuation Tool")
     root.geometry("900x600")
 
@@ -65,107 +96,59 @@ def create_gui():
 
     # Add a large submit button at the bottom
     submit_button = tk.Button(scrollable_frame, text="Submit", command=submit_data, font=("Arial", 16), bg="blue", fg="white", width=20, height=2, relief=tk.RAISED)
-    submit_button.grid(row=row, column=0, columnspan=4, pady=20)
+    submit_button.grid(row=row, column=0, columnspan=2, pady=20)
+    what_if_button = tk.Button(scrollable_frame, text="What-If...", command=open_sweep, font=("Arial", 16), width=20, height=2, relief=tk.RAISED)
+    what_if_button.grid(row=row, column=2, columnspan=2, pady=20)
 
     root.mainloop()
 
+def read_data():
+    # Get user input and validate
+    data = {}
+    for entry_name in valuation_core.INPUT_FIELDS:
+        entry = globals()[f"{entry_name}_entry"]
+        data[entry_name] = float(entry.get())
+    return data
+
 def submit_data():
     try:
-        # Get user input and validate
-        data = {}
-        for entry_name in ["revenue", "net_income", "operating_profit", "gross_profit", "stock_price", "book_value", "free_cash_flow", "total_assets", "total_liabilities", "interest_expense", "growth_rate", "dividends"]:
-            entry = globals()[f"{entry_name}_entry"]
-            data[entry_name] = float(entry.get())
-
-        revenue = data["revenue"]
-        net_income = data["net_income"]
-        operating_profit = data["operating_profit"]
-        gross_profit = data["gross_profit"]
-        stock_price = data["stock_price"]
-        book_value = data["book_value"]
-        free_cash_flow = data["free_cash_flow"]
-        total_assets = data["total_assets"]
-        total_liabilities = data["total_liabilities"]
-        interest_expense = data["interest_expense"]
-        growth_rate = data["growth_rate"]
-        dividends = data["dividends"]
-
-        # Check for zero values to prevent division errors
-        if total_assets - total_liabilities == 0:
-            raise ValueError("The difference between Total Assets and Total Liabilities cannot be zero.")
-
-        # ----- Financial Ratios -----
-        gross_profit_margin = (gross_profit / revenue) * 100
-        operating_profit_margin = (operating_profit / revenue) * 100
-        net_profit_margin = (net_income / revenue) * 100
-
-        # Handle division by zero for ROA and ROE
-        roa = (net_income / total_assets) * 100 if total_assets != 0 else float('inf')
-        roe = (net_income / (total_assets - total_liabilities)) * 100 if (total_assets - total_liabilities) != 0 else float('inf')
-
-        # ----- Valuation Ratios -----
-        pe_ratio = stock_price / (net_income / (total_assets - total_liabilities)) if (total_assets - total_liabilities) != 0 else float('inf')
-        pb_ratio = stock_price / (book_value / (total_assets - total_liabilities)) if (total_assets - total_liabilities) != 0 else float('inf')
-        ps_ratio = stock_price / (revenue / (total_assets - total_liabilities)) if (total_assets - total_liabilities) != 0 else float('inf')
-
-        # ----- Solvency Ratios -----
-        debt_to_equity_ratio = total_liabilities / (total_assets - total_liabilities) if (total_assets - total_liabilities) != 0 else float('inf')
-        interest_coverage_ratio = operating_profit / interest_expense if interest_expense != 0 else float('inf')
-
-        # ----- Growth Ratios -----
-        eps = net_income / (total_assets - total_liabilities) if (total_assets - total_liabilities) != 0 else float('inf')
-        free_cash_flow_yield = free_cash_flow / (stock_price * (total_assets - total_liabilities)) if (stock_price * (total_assets - total_liabilities)) != 0 else float('inf')
-        dividend_yield = (dividends / stock_price) * 100 if stock_price != 0 else float('inf')
-
-        # ----- Final Investment Suggestions -----
-        suggestions = []
-
-        # Analyze profitability
-        if gross_profit_margin > 40:
-            suggestions.append("High gross profit margin indicates strong efficiency.")
-        if operating_profit_margin > 20:
-            suggestions.append("Operating profit margin is excellent for long-term investments.")
-        if net_profit_margin > 10:
-            suggestions.append("Net profit margin is healthy.")
-
-        # Analyze valuation
-        if pe_ratio < 15:
-            suggestions.append("P/E ratio indicates the stock is undervalued.")
-        elif pe_ratio > 25:
-            suggestions.append("P/E ratio suggests overvaluation.")
-
-        if pb_ratio < 1:
-            suggestions.append("P/B ratio indicates the stock is undervalued.")
-        elif pb_ratio > 3:
-            suggestions.append("P/B ratio suggests the stock might be overvalued.")
-
-        if ps_ratio < 1:
-            suggestions.append("P/S ratio indicates good valuation for sales.")
-
-        # Analyze solvency
-        if debt_to_equity_ratio < 0.5:
-            suggestions.append("Low debt-to-equity ratio indicates low financial risk.")
-        elif debt_to_equity_ratio > 1:
-            suggestions.append("High debt-to-equity ratio may indicate higher financial risk.")
-
-        if interest_coverage_ratio > 5:
-            suggestions.append("High interest coverage ratio indicates the company can easily cover its debt.")
-        elif interest_coverage_ratio < 1.5:
-            suggestions.append("Low interest coverage ratio indicates the company may struggle with its debt.")
-
-        # Analyze growth and dividend
-        if dividend_yield > 3:
-            suggestions.append("High dividend yield indicates a good source of income for long-term investors.")
-        if free_cash_flow_yield > 5:
-            suggestions.append("Free cash flow yield indicates good potential for growth.")
-
-        # Final decision based on overall analysis
-        if len(suggestions) > 5:
-            final_decision = "The stock appears to be a strong buy for long-term investment."
-        elif 3 <= len(suggestions) <= 5:
-            final_decision = "The stock is fairly valued. It may be a hold or cautious buy."
-        else:
-            final_decision = "The stock may not be a good long-term investment based on the data."
+        with metrics.timer("parse", rows=1):
+            data = read_data()
+            inputs = valuation_core.ValuationInputs.from_mapping(data)
+    except Exception as e:
+        report_error(e)
+        return
+
+    # Score in the background so the window stays responsive
+    runner.submit(lambda job: (result_cache.analyze_valuation(inputs), value_company(data)),
+                  on_done=show_result, on_error=report_error)
+
+def open_sweep():
+    import sweep
+
+    try:
+        data = read_data()
+    except Exception as e:
+        report_error(e)
+        return
+    # Sweep inputs such as Stock Price, Growth Rate or Interest Expense around the entered company
+    sweep.SweepWindow(root, runner, valuation_core.INPUT_FIELDS, data,
+                      lambda axes: sweep.sweep_valuation(data, axes), rules.valuation_rules())
+
+def value_company(data):
+    # NumPy-backed modules load on first use, off the UI thread, so the window opens quickly
+    import dcf
+
+    # Monte Carlo DCF bands, seeded so repeated submits agree
+    valuation, price = dcf.value_valuation({name: [value] for name, value in data.items()}, seed=0)
+    return {name: float(band[0]) for name, band in valuation.bands.items()}, str(dcf.decide(valuation.bands, price)[0])
+
+def show_result(analysis):
+    import results_grid
+
+    start = time.perf_counter()
+    try:
+        (result, suggestions, final_decision), (bands, dcf_decision) = analysis
 
         # Display the results in a new window or popup with enhanced styling
         result_window = tk.Toplevel(root)
@@ -173,47 +156,48 @@ def submit_data():
         result_window.geometry("600x800")
         result_window.configure(bg="#f0f0f0")
 
-        # Create a styled result label
+        # Ratios in a grid, suggestions and the decision below it
+        model = results_grid.GridModel({
+            "Ratio": [label for label, _ in RATIO_LABELS],
+            "Value": [getattr(result, field) for _, field in RATIO_LABELS],
+        })
+        grid = results_grid.ResultsGrid(result_window, model, visible_rows=len(RATIO_LABELS), visible_columns=1,
+                                        column_width=260)
+        grid.frame.pack(pady=20, padx=20)
+
         result_text = (
-            "----- Financial Ratios Analysis -----\n\n"
-            f"Gross Profit Margin: {gross_profit_margin:.2f}%\n"
-            f"Operating Profit Margin: {operating_profit_margin:.2f}%\n"
-            f"Net Profit Margin: {net_profit_margin:.2f}%\n"
-            f"Return on Assets (ROA): {roa:.2f}%\n"
-            f"Return on Equity (ROE): {roe:.2f}%\n\n"
-            f"Price-to-Earnings Ratio (P/E): {pe_ratio:.2f}\n"
-            f"Price-to-Book Ratio (P/B): {pb_ratio:.2f}\n"
-            f"Price-to-Sales Ratio (P/S): {ps_ratio:.2f}\n\n"
-            f"Debt-to-Equity Ratio: {debt_to_equity_ratio:.2f}\n"
-            f"Interest Coverage Ratio: {interest_coverage_ratio:.2f}\n\n"
-            f"Earnings Per Share (EPS): {eps:.2f}\n"
-            f"Free Cash Flow Yield: {free_cash_flow_yield:.2f}%\n"
-            f"Dividend Yield: {dividend_yield:.2f}%\n\n"
             "----- Investment Suggestions -----\n"
             f"{' '.join(suggestions)}\n\n"
             "----- Final Decision -----\n"
-            f"{final_decision}"
+            f"{final_decision}\n\n"
+            "----- Discounted Cash Flow -----\n"
+            f"Intrinsic Value / Share (p10 / p50 / p90): {bands['value_p10']:.2f} / {bands['value_p50']:.2f} / {bands['value_p90']:.2f}\n"
+            f"DCF Decision: {dcf_decision}"
         )
 
         color_result = "green" if len(suggestions) > 5 else "red" if len(suggestions) <= 3 else "orange"
 
-        result_label = tk.Label(result_window, text=result_text, bg="#f0f0f0", font=("Arial", 12), justify=tk.LEFT)
+        result_label = tk.Label(result_window, text=result_text, bg="#f0f0f0", font=("Arial", 12), justify=tk.LEFT, wraplength=540)
         result_label.pack(pady=20, padx=20)
 
         result_label.config(fg=color_result)
+    except Exception as e:
+        report_error(e)
+        return
 
-        # Adjust the position of the scrollbar
-        logging.root.update_idletasks()
-        Canvas.yview_moveto(1.0)  # Scroll to bottom
+    metrics.observe("render", time.perf_counter() - start, 1)
+    logging.info("Analysis shown: %s / DCF %s (%s)", final_decision, dcf_decision, "; ".join(metrics.report()))
 
-    except ValueError as e:
+def report_error(e):
+    if isinstance(e, ValueError):
         logging.error("ValueError: %s", e)
         messagebox.showerror("Input Error", "Please enter valid numeric values!")
-    except ZeroDivisionError as e:
+    elif isinstance(e, ZeroDivisionError):
         logging.error("ZeroDivisionError: %s", e)
         messagebox.showerror("Calculation Error", "A division by zero error occurred. Please check your input values.")
-    except Exception as e:
-        logging.error("Unexpected error: %s", e)
+    else:
+        logging.error("Unexpected error: %s", e, exc_info=e)
         messagebox.showerror("Unexpected Error", "An unexpected error occurred. Please try again.")
 
-create_gui()
+if __name__ == "__main__":
+    create_gui()
@@ -1,12 +1,45 @@
+import logging
+import os
+import time
 import tkinter as tk
 from tkinter import messagebox, filedialog, simpledialog
-from tkinter import ttk
-import pandas as pd
+
+import jobs
+import metrics
+import ratio_engine
+import result_cache
+import rules
+
+# Configure logging (STOCK_LOG_LEVEL=INFO adds per-analysis and per-screen timings); the file is only
+# created by the first record, so importing the module does not write it
+logging.basicConfig(handlers=[logging.FileHandler('stock_tool.log', delay=True)],
+                    level=os.environ.get("STOCK_LOG_LEVEL", "ERROR").upper(),
+                    format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Inputs that change the DCF valuation when edited
+DCF_FIELDS = ("cash_flow", "capex", "num_shares", "market_cap", "revenue", "prev_revenue")
 
 class FinancialAnalysisApp:
     def __init__(self, root):
         self.root = root
         self.root.title("Financial Data Entry")
+        self.rules = rules.stock_tool_rules()
+        self.data = None
+        self.analysis = None
+        self.export_rows = []
+        self.export_path = None
+        self.results_grid = None
+        self.dcf_label = None
+        self.decision_labels = {}
+        self.jobs = jobs.JobRunner(self.root)
+        self.analysis_job = None
+        self.screen_job = None
+        self.screen_results = []
+        # Cross-sectional index over the last completed screen, and the good rules relative to it
+        self.rank_index = None
+        self.relative_rules = None
+        self.relative = tk.BooleanVar(value=False)
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
         self.create_widgets()
 
     def create_widgets(self):
@@ -48,18 +81,41 @@ class FinancialAnalysisApp:
             entry.grid(row=row, column=col + 1, padx=10, pady=5)
             entry.bind("<FocusIn>", lambda e, t=tooltip: self.show_tooltip(t))
             entry.bind("<FocusOut>", lambda e: self.hide_tooltip())
+            entry.bind("<FocusOut>", lambda e, idx=i: self.update_field(idx), add="+")
             entry.bind("<Return>", lambda e, idx=i: self.focus_next_entry(idx))
             
             self.entries.append(entry)
 
         submit_button = tk.Button(self.root, text="Submit", command=self.calculate_ratios)
-        submit_button.grid(row=len(field_labels) // 2 + 1, column=0, columnspan=4, pady=20)
+        submit_button.grid(row=len(field_labels) // 2 + 1, column=0, pady=20)
+        fetch_button = tk.Button(self.root, text="Fetch Ticker...", command=self.fetch_ticker)
+        fetch_button.grid(row=len(field_labels) // 2 + 1, column=1, pady=20)
+        what_if_button = tk.Button(self.root, text="What-If...", command=self.open_sweep)
+        what_if_button.grid(row=len(field_labels) // 2 + 1, column=2, columnspan=2, pady=20)
 
         self.entries[-1].bind("<Return>", lambda e: submit_button.invoke())
 
         self.tooltip_label = tk.Label(self.root, text="", font=('Arial', 10, 'italic'))
         self.tooltip_label.grid(row=len(field_labels) // 2 + 2, column=0, columnspan=4)
 
+        screen_button = tk.Button(self.root, text="Screen File...", command=self.screen_file)
+        screen_button.grid(row=len(field_labels) // 2 + 3, column=0, columnspan=2, pady=10)
+        self.cancel_button = tk.Button(self.root, text="Cancel", command=self.cancel_screen, state=tk.DISABLED)
+        self.cancel_button.grid(row=len(field_labels) // 2 + 3, column=2, pady=10)
+        self.show_screen_button = tk.Button(self.root, text="Show Results", command=self.show_screen, state=tk.DISABLED)
+        self.show_screen_button.grid(row=len(field_labels) // 2 + 3, column=3, pady=10)
+
+        self.status_label = tk.Label(self.root, text="", font=('Arial', 10))
+        self.status_label.grid(row=len(field_labels) // 2 + 4, column=0, columnspan=4)
+
+        self.relative_button = tk.Checkbutton(self.root, text="Rate ratios against screened companies (percentiles)",
+                                              variable=self.relative, state=tk.DISABLED)
+        self.relative_button.grid(row=len(field_labels) // 2 + 5, column=0, columnspan=4)
+
+    def close(self):
+        self.jobs.close()
+        self.root.destroy()
+
     def focus_next_entry(self, idx):
         if idx + 1 < len(self.entries):
             self.entries[idx + 1].focus_set()
@@ -73,177 +129,299 @@ class FinancialAnalysisApp:
     def calculate_ratios(self):
         try:
             # Retrieve entered data
-            data = [float(entry.get()) for entry in self.entries]
-            (revenue, net_profit, total_assets, equity, current_assets, 
-             current_liabilities, cash_flow, total_liabilities, capex, ebitda, 
-             market_cap, dividend, cogs, inventory, receivables, payables, 
-             num_shares, prev_net_profit, prev_revenue, prev_dividend, prev_total_assets) = data
-
-            # Calculate ratios
-            ratios = {
-                'Profit Margin': net_profit / revenue,
-                'Return on Assets (ROA)': net_profit / total_assets,
-                'Return on Equity (ROE)': net_profit / equity,
-                'Gross Margin': (revenue - cogs) / revenue,
-                'Operating Margin': ebitda / revenue,
-                'Net Profit Margin': net_profit / revenue,
-                'Current Ratio': current_assets / current_liabilities,
-                'Quick Ratio': (current_assets - inventory) / current_liabilities,
-                'Cash Ratio': cash_flow / current_liabilities,
-                'Debt to Equity Ratio': total_liabilities / equity,
-                'Debt to Assets Ratio': total_liabilities / total_assets,
-                'Interest Coverage Ratio': ebitda / (cogs * 0.05),  # Estimate interest expense
-                'Equity Ratio': equity / total_assets,
-                'Asset Turnover': revenue / total_assets,
-                'Inventory Turnover': revenue / inventory,
-                'Receivables Turnover': revenue / receivables,
-                'Payables Turnover': revenue / payables,
-                'Earnings Per Share (EPS)': net_profit / num_shares,
-                'P/E Ratio': market_cap / net_profit,
-                'Dividend Yield': dividend / market_cap,
-                'EV to EBITDA Ratio': market_cap / ebitda,
-                'Earnings Yield': net_profit / market_cap,
-                'PEG Ratio': (market_cap / net_profit) / ((net_profit - prev_net_profit) / prev_net_profit),
-                'EV to Sales Ratio': market_cap / revenue,
-                'Earnings Growth': (net_profit - prev_net_profit) / prev_net_profit,
-                'Revenue Growth': (revenue - prev_revenue) / prev_revenue,
-                'Dividend Growth Rate': (dividend - prev_dividend) / prev_dividend,
-                'Asset Growth': (total_assets - prev_total_assets) / prev_total_assets,
-                'Operating Cash Flow to Net Income': cash_flow / net_profit,
-                'Free Cash Flow': cash_flow - capex,
-                'Operating Cash Flow to Sales': cash_flow / revenue,
-                'Cash Flow Coverage Ratio': cash_flow / total_liabilities,
-                'Cash Flow Margin': cash_flow / revenue,
-                'Retention Ratio': (net_profit - dividend) / net_profit,
-                'Capital Gearing Ratio': total_liabilities / equity,
-                'Financial Leverage Ratio': total_assets / equity,
-                'Debt to Capital Ratio': total_liabilities / (total_liabilities + equity),
-                'Book Value per Share': equity / num_shares,
-                'Market to Book Ratio': market_cap / equity,
-                'Free Cash Flow Yield': (cash_flow - capex) / market_cap,
-                'Net Profit Ratio': net_profit / revenue,
-                'Company Worth': market_cap / (net_profit / num_shares),
-                'Liquidation Value': total_assets - total_liabilities,
-                'Recovery Percentage': (total_assets - total_liabilities) / total_liabilities
-            }
-
-            company_worth = ratios['Company Worth']
-            liquidation_value = ratios['Liquidation Value']
-            stock_decision = "BUY" if market_cap < company_worth and ratios['Profit Margin'] > 0.1 else "DO NOT BUY"
-            recovery_decision = "SAFE" if liquidation_value > total_liabilities else "RISKY"
-
-            self.show_results(ratios, stock_decision, recovery_decision, company_worth, liquidation_value)
+            with metrics.timer("parse", rows=1):
+                data = [float(entry.get()) for entry in self.entries]
+        except ValueError:
+            messagebox.showerror("Input Error", "Please ensure all fields contain valid numbers.")
+            return
+
+        # Calculate ratios and decisions in the background, reusing the result for inputs seen before
+        if self.analysis_job is not None:
+            self.analysis_job.cancel()
+        self.analysis_job = self.jobs.submit(
+            lambda job: (result_cache.analyze_tool(data, ruleset=self.rules), self.value_company(data)),
+            on_done=lambda result: self.analysis_done(data, *result),
+            on_error=lambda e: self.report_error("Calculation Error", e),
+        )
+
+    def fetch_ticker(self):
+        # Fill the entries from the ingestion source instead of typing them
+        import ingest
+
+        ticker = simpledialog.askstring("Fetch", "Ticker symbol:")
+        if not ticker:
+            return
+        url = os.environ.get("STOCK_INGEST_URL", ingest.DEFAULT_URL)
+        self.status_label.config(text=f"Fetching {ticker.strip().upper()} from {url}...")
+        self.jobs.submit(lambda job: ingest.ingest([ticker.strip().upper()], url),
+                         on_done=self.fetch_done,
+                         on_error=lambda e: self.report_error("Fetch Error", e))
 
+    def fetch_done(self, result):
+        if result.errors:
+            self.status_label.config(text="")
+            logging.error("Fetch failed: %s", "; ".join(result.errors.values()))
+            messagebox.showerror("Fetch Error", "\n".join(result.errors.values()))
+            return
+        for entry, field in zip(self.entries, ratio_engine.INPUT_FIELDS):
+            entry.delete(0, tk.END)
+            value = result.rows[0][field]
+            entry.insert(0, "" if value != value else f"{value:.15g}")
+        self.status_label.config(text=f"Fetched {result.tickers[0]}")
+
+    def open_sweep(self):
+        import sweep
+
+        try:
+            data = dict(zip(ratio_engine.INPUT_FIELDS, (float(entry.get()) for entry in self.entries)))
         except ValueError:
             messagebox.showerror("Input Error", "Please ensure all fields contain valid numbers.")
+            return
+        # Sweep one or two inputs around the entered company
+        sweep.SweepWindow(self.root, self.jobs, ratio_engine.INPUT_FIELDS, data,
+                          lambda axes: sweep.sweep_stock_tool(data, axes, ruleset=self.rules), self.rules)
 
-    def show_results(self, ratios, stock_decision, recovery_decision, company_worth, liquidation_value):
-        result_window = tk.Toplevel(self.root)
-        result_window.title("Financial Analysis Results")
+    def value_company(self, data):
+        # NumPy-backed modules load on first use, off the UI thread, so the window opens quickly
+        import dcf
+        import numpy as np
 
-        canvas = tk.Canvas(result_window)
-        scrollbar = ttk.Scrollbar(result_window, orient="vertical", command=canvas.yview)
-        scrollable_frame = ttk.Frame(canvas)
+        # Monte Carlo DCF bands for one company, seeded so repeated submits agree
+        valuation, price = dcf.value_stock_tool(np.array([data]), seed=0)
+        return {name: float(band[0]) for name, band in valuation.bands.items()}, str(dcf.decide(valuation.bands, price)[0])
 
-        scrollable_frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
+    def show_dcf(self, valuation):
+        bands, decision = valuation
+        if self.dcf_label is not None and self.dcf_label.winfo_exists():
+            self.dcf_label.config(text=f"Intrinsic Value / Share (p10 / p50 / p90): {bands['value_p10']:.2f} / "
+                                       f"{bands['value_p50']:.2f} / {bands['value_p90']:.2f}\nDCF Decision: {decision}")
+
+    def report_error(self, title, error):
+        logging.error("%s: %s", title, error, exc_info=error)
+        messagebox.showerror(title, str(error))
+
+    def analysis_done(self, data, result, valuation):
+        start = time.perf_counter()
+        ratios, stock_decision, recovery_decision = result
+        ratios = dict(ratios)
+        self.decisions = {'Stock Decision': stock_decision, 'Recovery Decision': recovery_decision}
+        self.data = data
+        self.analysis = None
+        self.analysis_job = None
+
+        company_worth = ratios['Company Worth']
+        liquidation_value = ratios['Liquidation Value']
+
+        self.show_results(ratios, stock_decision, recovery_decision, company_worth, liquidation_value)
+        self.show_dcf(valuation)
+        metrics.observe("render", time.perf_counter() - start, 1)
+        logging.info("Analysis shown: %s / %s (%s)", stock_decision, recovery_decision, "; ".join(metrics.report()))
+
+    def screen_file(self):
+        path = filedialog.askopenfilename(filetypes=[("Fundamentals", "*.csv *.parquet"), ("All files", "*.*")])
+        if not path:
+            return
+        self.cancel_screen()
+        self.screen_results = []
+        self.rank_index = None
+        self.relative_rules = None
+        self.relative.set(False)
+        self.relative_button.config(state=tk.DISABLED)
+        self.show_screen_button.config(state=tk.DISABLED)
+        self.status_label.config(text=f"Screening {path}...")
+        self.cancel_button.config(state=tk.NORMAL)
+        self.screen_job = self.jobs.submit(
+            jobs.screen_file, path, ruleset=self.rules,
+            on_progress=self.screen_progress,
+            on_partial=self.screen_partial,
+            on_done=self.screen_done,
+            on_error=self.screen_failed,
         )
 
-        canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
+    def screen_partial(self, frame):
+        self.screen_results.append(frame)
+        self.show_screen_button.config(state=tk.NORMAL)
 
-        canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
+    def screen_progress(self, done, total):
+        if total:
+            self.status_label.config(text=f"Screened {done:,} of {total:,} rows ({done / total:.0%})")
+        else:
+            self.status_label.config(text=f"Screened {done:,} rows")
 
-        result_label = tk.Label(scrollable_frame, text="Financial Ratios", font=('Arial', 16, 'bold'), pady=10)
-        result_label.grid(row=0, column=0, columnspan=2)
+    def screen_done(self, rows):
+        self.screen_job = None
+        self.cancel_button.config(state=tk.DISABLED)
+        buys = sum(int((frame['Stock Decision'] == "BUY").sum()) for frame in self.screen_results)
+        self.status_label.config(text=f"Screened {rows:,} rows: {buys:,} BUY")
+        logging.info("Screened %d rows, %d BUY (%s)", rows, buys, "; ".join(metrics.report()))
+        if self.screen_results:
+            frames = list(self.screen_results)
+            self.jobs.submit(lambda job: self.build_rank_index(frames), on_done=self.rank_index_ready)
 
-        row_count = 1
-        for i, (ratio, value) in enumerate(ratios.items()):
-            color = "green" if self.is_good(ratio, value) else "red"
-            result_label = tk.Label(scrollable_frame, text=f"{ratio}: {value:.2f}", font=('Arial', 14, 'bold'),fg=color)
-            col = i % 2
-            result_label.grid(row=row_count + i // 2, column=col, padx=10, pady=5)
+    def build_rank_index(self, frames):
+        # Sector percentiles when the file has a sector column, otherwise the whole screen
+        import pandas as pd
+        import ranking
 
-        final_decision_label = tk.Label(scrollable_frame, text=f"Final Decision: {stock_decision}", font=('Arial', 16, 'bold'), fg="blue", pady=20)
-        final_decision_label.grid(row=row_count + len(ratios) // 2 + 2, column=0, columnspan=2)
+        frame = pd.concat(frames, ignore_index=True)
+        index = ranking.RankIndex(frame, columns=[name for name in ratio_engine.RATIO_NAMES if name in frame],
+                                  key="ticker" if "ticker" in frame else None,
+                                  group="sector" if "sector" in frame else None)
+        relative = ranking.relative_rules(self.rules)
+        return index, index.resolve(relative)
 
-        recovery_label = tk.Label(scrollable_frame, text=f"Recovery Decision: {recovery_decision}", font=('Arial', 16, 'bold'), fg="blue", pady=10)
-        recovery_label.grid(row=row_count + len(ratios) // 2 + 3, column=0, columnspan=2)
+    def rank_index_ready(self, result):
+        self.rank_index, self.relative_rules = result
+        self.relative_button.config(state=tk.NORMAL)
 
-        save_button = tk.Button(scrollable_frame, text="Save Results to Excel", command=lambda: self.save_to_excel(ratios, stock_decision, recovery_decision, company_worth, liquidation_value))
-        save_button.grid(row=row_count + len(ratios) // 2 + 4, column=0, columnspan=2, pady=10)
+    def screen_failed(self, error):
+        self.screen_job = None
+        self.cancel_button.config(state=tk.DISABLED)
+        self.status_label.config(text="")
+        self.report_error("Screening Error", error)
 
-    def is_good(self, ratio, value):
-        thresholds = {
-            'Profit Margin': 0.1,
-            'Return on Assets (ROA)': 0.05,
-            'Return on Equity (ROE)': 0.15,
-            'Current Ratio': 1.5,
-            'Debt to Equity Ratio': 2,
-            'Gross Margin': 0.2,
-            'Operating Margin': 0.1,
-            'Net Profit Margin': 0.1,
-            'Quick Ratio': 1,
-            'Cash Ratio': 0.2,
-            'Debt to Assets Ratio': 0.5,
-            'Interest Coverage Ratio': 3,
-            'Equity Ratio': 0.3,
-            'Asset Turnover': 1,
-            'Inventory Turnover': 5,
-            'Receivables Turnover': 8,
-            'Payables Turnover': 10,
-            'Earnings Per Share (EPS)': 1,
-            'P/E Ratio': 20,
-            'Dividend Yield': 0.03,
-            'EV to EBITDA Ratio': 10,
-            'Earnings Yield': 0.05,
-            'PEG Ratio': 1,
-            'EV to Sales Ratio': 2,
-            'Earnings Growth': 0.1,
-            'Revenue Growth': 0.1,
-            'Dividend Growth Rate': 0.05,
-            'Asset Growth': 0.1,
-            'Operating Cash Flow to Net Income': 1,
-            'Free Cash Flow': 0,
-            'Operating Cash Flow to Sales': 0.1,
-            'Cash Flow Coverage Ratio': 1,
-            'Cash Flow Margin': 0.1,
-            'Retention Ratio': 0.5,
-            'Capital Gearing Ratio': 0.5,
-            'Financial Leverage Ratio': 2,
-            'Debt to Capital Ratio': 0.5,
-            'Book Value per Share': 10,
-            'Market to Book Ratio': 1.5,
-            'Free Cash Flow Yield': 0.05,
-            'Net Profit Ratio': 0.1,
-            'Company Worth': 1,
-            'Liquidation Value': 0
+    def show_screen(self):
+        # Rows screened so far, in a grid that only draws the visible cells
+        if not self.screen_results:
+            return
+        import numpy as np
+        import pandas as pd
+        import ranking
+        import results_grid
+
+        frame = pd.concat(self.screen_results, ignore_index=True)
+        key = "ticker" if "ticker" in frame else None
+        if self.relative.get() and self.rank_index is not None and self.rank_index.row_count == len(frame):
+            good = self.rank_index.is_good(ranking.relative_rules(self.rules), by_group=self.rank_index.groups is not None)
+            model = results_grid.GridModel({name: frame[name] for name in frame.columns},
+                                           {name: np.packbits(flags, bitorder="little") for name, flags in good.items()},
+                                           key)
+        else:
+            model = results_grid.GridModel.from_results(frame, self.rules, key=key)
+        window = tk.Toplevel(self.root)
+        window.title(f"Screen Results ({len(frame):,} companies)")
+        grid = results_grid.ResultsGrid(window, model, visible_rows=30, visible_columns=7, filter_bar=True)
+        grid.frame.pack(fill="both", expand=True)
+
+    def cancel_screen(self):
+        if self.screen_job is not None:
+            self.screen_job.cancel()
+            self.screen_job = None
+            self.status_label.config(text="Screening cancelled")
+        self.cancel_button.config(state=tk.DISABLED)
+
+    def update_field(self, idx):
+        # Once results are shown, push an edited field through the incremental analysis
+        if self.data is None:
+            return
+        try:
+            value = float(self.entries[idx].get())
+        except ValueError:
+            return
+        if self.analysis is None:
+            import incremental
+            import numpy as np
+
+            self.analysis = incremental.for_stock_tool(np.array([self.data]), self.rules)
+            self.analysis.subscribe(self.push_changes)
+        field = ratio_engine.INPUT_FIELDS[idx]
+        if value != self.analysis.values[field][0]:
+            self.analysis.update(field, [value])
+            if field in DCF_FIELDS:
+                values = [float(self.analysis.values[name][0]) for name in ratio_engine.INPUT_FIELDS]
+                self.jobs.submit(lambda job: self.value_company(values), on_done=self.show_dcf)
+
+    def push_changes(self, changes):
+        grid = self.results_grid
+        for ratio, values in changes.ratios.items():
+            value = float(values[0])
+            self.ratios[ratio] = value
+            if grid is not None:
+                grid.model.set_value("Value", self.ratio_rows[ratio], value, passed=self.is_good(ratio, value))
+        if grid is not None and changes.ratios and grid.frame.winfo_exists():
+            grid.refresh()
+
+        for name, labels in changes.decisions.items():
+            self.decisions[name] = str(labels[0])
+            label, title = self.decision_labels.get(name, (None, None))
+            if label is not None and label.winfo_exists():
+                label.config(text=f"{title}: {self.decisions[name]}")
+
+    def show_results(self, ratios, stock_decision, recovery_decision, company_worth, liquidation_value):
+        import numpy as np
+        import results_grid
+
+        self.ratios = ratios
+        result_window = tk.Toplevel(self.root)
+        result_window.title("Financial Analysis Results")
+
+        # One grid row per ratio, coloured by the "good" rules
+        names = list(ratios)
+        self.ratio_rows = {name: i for i, name in enumerate(names)}
+        good = [self.is_good(ratio, value) for ratio, value in ratios.items()]
+        model = results_grid.GridModel(
+            {"Ratio": names, "Value": np.array(list(ratios.values()), dtype=np.float64)},
+            bitmaps={"Value": np.packbits(good, bitorder="little")},
+        )
+        self.results_grid = results_grid.ResultsGrid(result_window, model, visible_rows=22, visible_columns=1,
+                                                     column_width=220)
+        self.results_grid.frame.grid(row=0, column=0, columnspan=2, padx=10, pady=10)
+
+        final_decision_label = tk.Label(result_window, text=f"Final Decision: {stock_decision}", font=('Arial', 16, 'bold'), fg="blue", pady=20)
+        final_decision_label.grid(row=1, column=0, columnspan=2)
+
+        recovery_label = tk.Label(result_window, text=f"Recovery Decision: {recovery_decision}", font=('Arial', 16, 'bold'), fg="blue", pady=10)
+        recovery_label.grid(row=2, column=0, columnspan=2)
+
+        self.decision_labels = {
+            'Stock Decision': (final_decision_label, "Final Decision"),
+            'Recovery Decision': (recovery_label, "Recovery Decision"),
         }
-        return value >= thresholds.get(ratio, 0)
 
-    def save_to_excel(self, ratios, stock_decision, recovery_decision, company_worth, liquidation_value):
+        self.dcf_label = tk.Label(result_window, text="", font=('Arial', 12), pady=10)
+        self.dcf_label.grid(row=3, column=0, columnspan=2)
+
+        # Read the latest values at click time, since edits update them in place
+        save_button = tk.Button(result_window, text="Save Results", command=self.save_results)
+        save_button.grid(row=4, column=0, columnspan=2, pady=10)
+
+    def is_good(self, ratio, value):
+        if self.relative.get() and self.relative_rules is not None:
+            return self.relative_rules.check(ratio, value, group="good")
+        return self.rules.check(ratio, value, group="good")
+
+    def save_results(self):
+        # Results accumulate over the session and are written to one export file
         company_name = simpledialog.askstring("Input", "Enter the company name:")
         if company_name:
-            data = { "Financial Data": [entry.get() for entry in self.entries] }
-            data.update(ratios)
-            data['Company Worth'] = company_worth
-            data['Liquidation Value'] = liquidation_value
-            data['Stock Decision'] = stock_decision
-            data['Recovery Decision'] = recovery_decision
-
-            df = pd.DataFrame(data, index=[0])
-
-            file_path = filedialog.asksaveasfilename(defaultextension=".xlsx", filetypes=[("Excel files", "*.xlsx")], initialfile=f"{company_name}_analysis.xlsx")
-            if file_path:
-                df.to_excel(file_path, index=False)
-                messagebox.showinfo("Success", f"Financial data saved to {file_path}")
+            row = {"Company": company_name}
+            if self.analysis is not None:
+                row.update((field, float(self.analysis.values[field][0])) for field in ratio_engine.INPUT_FIELDS)
             else:
-                messagebox.showerror("Error", "File path not specified!")
+                row.update(zip(ratio_engine.INPUT_FIELDS, self.data))
+            row.update(self.ratios)
+            row.update(self.decisions)
+
+            if self.export_path is None:
+                file_path = filedialog.asksaveasfilename(defaultextension=".xlsx", filetypes=[("Excel files", "*.xlsx"), ("Parquet files", "*.parquet"), ("CSV files", "*.csv")], initialfile="analysis.xlsx")
+                if not file_path:
+                    messagebox.showerror("Error", "File path not specified!")
+                    return
+                self.export_path = file_path
+            self.export_rows.append(row)
+            try:
+                import export
+
+                export.write_records(self.export_path, self.export_rows)
+            except (OSError, ValueError) as e:
+                self.export_rows.pop()
+                self.report_error("Export Error", e)
+                return
+            messagebox.showinfo("Success", f"{len(self.export_rows)} companies saved to {self.export_path}")
 
 # Running the application
 if __name__ == "__main__":
+    metrics.start_run("stock-tool")
     root = tk.Tk()
     app = FinancialAnalysisApp(root)
     root.mainloop()
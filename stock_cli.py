@@ -0,0 +1,207 @@
+"""Headless command line for both tools, for batch jobs and containers.
+
+    python -m stock_cli valuation revenue=1000 net_income=120 ... [--dcf] [--json]
+    python -m stock_cli tool --input company.json --json
+    python -m stock_cli screen fundamentals.parquet results.csv     (screener.py)
+    python -m stock_cli fetch tickers.txt fundamentals.parquet      (ingest.py)
+
+`valuation` runs stock-analysis.py's analysis on valuation_core.INPUT_FIELDS
+and `tool` runs stock-tool.py's on ratio_engine.INPUT_FIELDS. Inputs are
+field=value arguments, or a JSON object (or list of objects, each with an
+optional "ticker") read from --input FILE or - for stdin; field=value
+arguments override the file. Results go through result_cache, so
+STOCK_RESULT_CACHE applies, and STOCK_METRICS/STOCK_PROFILE work as in the
+GUIs.
+
+Nothing here imports tkinter, pandas or pyarrow, and single-company scoring
+is pure Python: NumPy is only loaded for --dcf, so a result is printed well
+within 100 ms of process start (see benchmarks/bench_startup.py). `screen`
+and `fetch` hand their arguments to screener.main and ingest.main, which
+load what they need.
+"""
+import argparse
+import json
+import math
+import sys
+
+import metrics
+import result_cache
+
+# Sub-commands that take another module's command line unchanged
+_DELEGATES = {
+    "screen": ("screener", "bulk-screen a CSV or Parquet file (screener.py)"),
+    "fetch": ("ingest", "fetch fundamentals for many tickers (ingest.py)"),
+}
+
+
+def parse_fields(pairs):
+    """{field: float} from "field=value" strings."""
+    record = {}
+    for pair in pairs:
+        name, sep, value = pair.partition("=")
+        if not sep or not name.strip():
+            raise ValueError(f"Expected field=value, got {pair!r}")
+        try:
+            record[name.strip()] = float(value)
+        except ValueError:
+            raise ValueError(f"{name.strip()} must be a number, got {value!r}") from None
+    return record
+
+
+def read_records(path, pairs=()):
+    """The companies to analyze: JSON from `path` ("-" for stdin), overridden by `pairs`."""
+    overrides = parse_fields(pairs)
+    if path is None:
+        return [overrides]
+    if path == "-":
+        data = json.load(sys.stdin)
+    else:
+        with open(path) as f:
+            data = json.load(f)
+    records = data if isinstance(data, list) else [data]
+    if not all(isinstance(record, dict) for record in records):
+        raise ValueError(f"{path}: expected a JSON object or a list of objects")
+    return [{**record, **overrides} for record in records]
+
+
+def _values(record, fields):
+    unknown = [name for name in record if name not in fields and name != "ticker"]
+    if unknown:
+        raise ValueError(f"Unknown field: {', '.join(unknown)}")
+    missing = [name for name in fields if name not in record]
+    if missing:
+        raise ValueError(f"Missing field: {', '.join(missing)}")
+    return [float(record[name]) for name in fields]
+
+
+def analyze_valuation(record, with_dcf=False):
+    """stock-analysis.py's result for one company as plain JSON types."""
+    import valuation_core
+
+    values = _values(record, valuation_core.INPUT_FIELDS)
+    inputs = valuation_core.ValuationInputs(*values)
+    result, suggestions, final_decision = result_cache.analyze_valuation(inputs)
+    analysis = {
+        "ratios": {name: getattr(result, name) for name in valuation_core.RESULT_FIELDS},
+        "suggestions": list(suggestions),
+        "decisions": {"Final Decision": final_decision},
+    }
+    if with_dcf:
+        import dcf
+
+        valuation, price = dcf.value_valuation({name: [value] for name, value in zip(valuation_core.INPUT_FIELDS, values)},
+                                               seed=0)
+        _add_dcf(analysis, valuation, price)
+    return analysis
+
+
+def analyze_tool(record, with_dcf=False):
+    """stock-tool.py's result for one company as plain JSON types."""
+    import ratio_engine
+
+    values = _values(record, ratio_engine.INPUT_FIELDS)
+    ratios, stock_decision, recovery_decision = result_cache.analyze_tool(values)
+    analysis = {
+        "ratios": ratios,
+        "decisions": {"Stock Decision": stock_decision, "Recovery Decision": recovery_decision},
+    }
+    if with_dcf:
+        import dcf
+
+        valuation, price = dcf.value_stock_tool({name: [value] for name, value in zip(ratio_engine.INPUT_FIELDS, values)},
+                                                seed=0)
+        _add_dcf(analysis, valuation, price)
+    return analysis
+
+
+def _add_dcf(analysis, valuation, price):
+    # The simulations above are seeded like the GUIs', so the bands match what they show
+    import dcf
+
+    analysis["dcf"] = {name: float(band[0]) for name, band in valuation.bands.items()}
+    analysis["decisions"]["DCF Decision"] = str(dcf.decide(valuation.bands, price)[0])
+
+
+_ANALYSES = {
+    "valuation": (analyze_valuation, "score a company the way stock-analysis.py does"),
+    "tool": (analyze_tool, "score a company the way stock-tool.py does"),
+}
+
+
+def json_safe(value):
+    """`value` with NaN and infinite floats as null, which strict JSON parsers accept.
+
+    compute_one divides by zero with IEEE semantics, so these are routine.
+    """
+    if isinstance(value, dict):
+        return {key: json_safe(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [json_safe(item) for item in value]
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def format_text(analysis):
+    """Aligned ratio table, then suggestions, DCF bands and decisions."""
+    width = max(map(len, analysis["ratios"]))
+    lines = [f"{name:<{width}}  {value:>16,.4f}" for name, value in analysis["ratios"].items()]
+    if analysis.get("suggestions"):
+        lines.append(f"Suggestions: {' '.join(analysis['suggestions'])}")
+    if "dcf" in analysis:
+        bands = analysis["dcf"]
+        lines.append(f"Intrinsic Value / Share (p10 / p50 / p90): {bands['value_p10']:.2f} / "
+                     f"{bands['value_p50']:.2f} / {bands['value_p90']:.2f}")
+    lines.extend(f"{name}: {label}" for name, label in analysis["decisions"].items())
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m stock_cli", description="Headless stock analysis.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    for name, (_, help_text) in _ANALYSES.items():
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("fields", nargs="*", metavar="field=value", help="input values")
+        command.add_argument("--input", default=None, help="JSON object or list of objects; - reads stdin")
+        command.add_argument("--dcf", action="store_true", help="add Monte Carlo DCF bands and the DCF decision")
+        command.add_argument("--json", action="store_true",
+                             help="print one JSON object per company; NaN and infinite ratios are null")
+    for name, (_, help_text) in _DELEGATES.items():
+        commands.add_parser(name, help=help_text, add_help=False)
+    args, rest = parser.parse_known_args(argv)
+
+    if args.command in _DELEGATES:
+        module = __import__(_DELEGATES[args.command][0])
+        return module.main(rest)
+    if rest:
+        parser.error(f"unrecognized arguments: {' '.join(rest)}")
+
+    metrics.start_run(f"stock-{args.command}")
+    analyze = _ANALYSES[args.command][0]
+    try:
+        records = read_records(args.input, args.fields)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    status = 0
+    for i, record in enumerate(records):
+        label = record.get("ticker") or (f"#{i + 1}" if len(records) > 1 else None)
+        try:
+            analysis = analyze(record, with_dcf=args.dcf)
+        except (TypeError, ValueError, ZeroDivisionError) as e:
+            print(f"{f'{label}: ' if label else ''}{type(e).__name__}: {e}", file=sys.stderr)
+            status = 1
+            continue
+        if args.json:
+            output = {"ticker": record["ticker"], **analysis} if "ticker" in record else analysis
+            print(json.dumps(json_safe(output), allow_nan=False))
+        else:
+            if i:
+                print()
+            if label:
+                print(label)
+            print(format_text(analysis))
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
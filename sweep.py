@@ -0,0 +1,312 @@
+"""Sensitivity sweeps of the decisions over a grid of 1-3 inputs.
+
+sweep_valuation() and sweep_stock_tool() take one company's inputs and 1-3
+{input: values} axes. They evaluate the ratio graph over the Cartesian grid
+in one broadcasted computation: each swept input becomes an array shaped to
+its own grid axis, so ratios that do not depend on any swept input stay
+scalars. Only the rules that read a varying column are evaluated per grid
+cell.
+
+    surface = sweep.sweep_valuation(inputs, {"stock_price": np.linspace(1, 200, 500),
+                                             "growth_rate": np.linspace(-5, 30, 500)})
+    surface.decisions["Final Decision"]            # (500, 500) array of labels
+    surface.breakpoints("Final Decision", axis=0)  # where the verdict flips along stock_price
+
+SweepWindow is the GUIs' front end: pick the axes, and it draws the decision
+surface as a heatmap and lists the breakpoints.
+"""
+import numpy as np
+
+import ratio_engine
+import rules
+import valuation_core
+
+MAX_AXES = 3
+DEFAULT_STEPS = 200
+INVALID_COLOR = "#a0a0a0"
+BAND_COLORS = ("#2e8b57", "#e0a030", "#7fb3d5")
+DEFAULT_COLOR = "#c0392b"
+
+
+class SweepResult:
+    """Decision surface of a sweep.
+
+    `decisions` maps decision names to label arrays shaped like the grid
+    (one axis per swept input, in order). `ratios` holds arrays that
+    broadcast to the grid. `valid` marks grid points the scalar tool could
+    compute (stock-analysis.py rejects zero equity and zero revenue).
+    """
+
+    __slots__ = ("names", "axes", "ratios", "decisions", "valid")
+
+    def __init__(self, names, axes, ratios, decisions, valid):
+        self.names = names
+        self.axes = axes
+        self.ratios = ratios
+        self.decisions = decisions
+        self.valid = valid
+
+    @property
+    def shape(self):
+        return tuple(len(values) for values in self.axes)
+
+    def boundary(self, name, axis=0):
+        """Boolean mask, one shorter along `axis`, of valid neighbours whose `name` label differs.
+
+        A flip into or out of an invalid grid point is not a decision boundary.
+        """
+        labels = self.decisions[name]
+        valid = np.broadcast_to(self.valid, labels.shape)
+        n = labels.shape[axis]
+        high, low = range(1, n), range(n - 1)
+        return ((labels.take(high, axis=axis) != labels.take(low, axis=axis))
+                & valid.take(high, axis=axis) & valid.take(low, axis=axis))
+
+    def breakpoints(self, name, axis=0):
+        """Where decision `name` flips between neighbouring grid points along `axis`.
+
+        Returns a list of (fixed, low, high, before, after): `fixed` maps the
+        other swept inputs to their values, and the label changes from
+        `before` at `low` to `after` at `high`. Both points are valid.
+        """
+        labels = np.moveaxis(self.decisions[name], axis, -1)
+        flips = np.moveaxis(self.boundary(name, axis), axis, -1)
+        values = self.axes[axis]
+        others = [i for i in range(len(self.axes)) if i != axis]
+        points = []
+        for index in zip(*np.nonzero(flips)):
+            *rest, i = (int(j) for j in index)
+            fixed = {self.names[o]: float(self.axes[o][j]) for o, j in zip(others, rest)}
+            points.append((fixed, float(values[i]), float(values[i + 1]),
+                           str(labels[tuple(rest) + (i,)]), str(labels[tuple(rest) + (i + 1,)])))
+        return points
+
+
+def sweep(graph, outputs, input_fields, ruleset, base, axes):
+    """Evaluate `ruleset`'s decisions over the grid spanned by `axes`.
+
+    `base` maps every input field to the company's value; `axes` maps 1-3
+    of them to the values to sweep.
+    """
+    if not 1 <= len(axes) <= MAX_AXES:
+        raise ValueError(f"Sweep between 1 and {MAX_AXES} inputs, got {len(axes)}")
+    unknown = [name for name in axes if name not in input_fields]
+    if unknown:
+        raise ValueError(f"Unknown input field: {', '.join(unknown)}")
+
+    names = tuple(axes)
+    grids = tuple(np.asarray(values, dtype=np.float64).ravel() for values in axes.values())
+    shape = tuple(len(values) for values in grids)
+    size = int(np.prod(shape))
+
+    # Swept inputs vary along their own axis; everything else is a scalar
+    values = {name: np.float64(base[name]) for name in input_fields}
+    for i, (name, grid) in enumerate(zip(names, grids)):
+        axis_shape = [1] * len(shape)
+        axis_shape[i] = len(grid)
+        values[name] = grid.reshape(axis_shape)
+    ratios = ratio_engine.evaluate_graph(graph, outputs, values.__getitem__)
+    columns = dict(values)
+    columns.update(ratios)
+
+    def varies(rule):
+        return np.ndim(columns[rule.column]) or (isinstance(rule.threshold, str) and np.ndim(columns[rule.threshold]))
+
+    varying = [i for i, rule in enumerate(ruleset.rules) if varies(rule)]
+    constant = [i for i, rule in enumerate(ruleset.rules) if not varies(rule)]
+    passed = np.empty((len(ruleset.rules), size), dtype=np.bool_)
+    if constant:
+        subset = rules.RuleSet([ruleset.rules[i] for i in constant])
+        record = {name: float(columns[name]) for name in subset.columns}
+        passed[constant] = np.array(subset.evaluate_record(record)[0])[:, None]
+    if varying:
+        subset = rules.RuleSet([ruleset.rules[i] for i in varying])
+        table = {name: np.broadcast_to(columns[name], shape).ravel() for name in subset.columns}
+        passed[varying] = subset.evaluate(table).passed
+
+    decisions = {name: labels.reshape(shape) for name, labels in rules.RuleResult(ruleset, passed).decisions().items()}
+    return SweepResult(names, grids, ratios, decisions, np.ones(shape, dtype=np.bool_))
+
+
+def sweep_stock_tool(base, axes, ruleset=None):
+    """Sweep stock-tool.py's Stock Decision and Recovery Decision.
+
+    `base` is a mapping or a sequence in ratio_engine.INPUT_FIELDS order.
+    """
+    if not hasattr(base, "keys"):
+        base = dict(zip(ratio_engine.INPUT_FIELDS, base))
+    return sweep(ratio_engine.TOOL_GRAPH, ratio_engine.TOOL_RATIOS, ratio_engine.INPUT_FIELDS,
+                 ruleset or rules.stock_tool_rules(), base, axes)
+
+
+def sweep_valuation(base, axes, ruleset=None):
+    """Sweep stock-analysis.py's Final Decision.
+
+    `base` is a valuation_core.ValuationInputs or a mapping of its fields.
+    """
+    if isinstance(base, valuation_core.ValuationInputs):
+        base = dict(zip(valuation_core.INPUT_FIELDS, base.as_tuple()))
+    result = sweep(ratio_engine.VALUATION_GRAPH, ratio_engine.VALUATION_RATIOS, valuation_core.INPUT_FIELDS,
+                   ruleset or rules.valuation_rules(), base, axes)
+    shape = result.shape
+
+    def column(name):
+        if name in result.names:
+            axis_shape = [1] * len(shape)
+            axis_shape[result.names.index(name)] = -1
+            return result.axes[result.names.index(name)].reshape(axis_shape)
+        return np.float64(base[name])
+
+    # The scalar tool rejects any point where a ratio would divide by zero
+    divisors = ratio_engine.divisors(ratio_engine.VALUATION_GRAPH)
+    valid = np.ones(shape, dtype=np.bool_)
+    for values in ratio_engine.evaluate_graph(ratio_engine.VALUATION_GRAPH, {name: name for name in divisors},
+                                              column).values():
+        valid &= values != 0
+    result.valid = valid
+    return result
+
+
+def decision_colors(decision):
+    """{label: colour} for a rules.Decision, best band first."""
+    colors = {label: BAND_COLORS[min(i, len(BAND_COLORS) - 1)] for i, (_, label) in enumerate(decision.bands)}
+    colors[decision.default] = DEFAULT_COLOR
+    return colors
+
+
+class SweepWindow:
+    """What-if window: sweep one or two inputs and show a decision as a heatmap.
+
+    `run(axes)` returns a SweepResult for {field: values} and runs on
+    `runner` (a jobs.JobRunner), so large grids never block the Tk thread.
+    """
+
+    def __init__(self, parent, runner, fields, base, run, ruleset, title="What-If Sweep"):
+        import tkinter as tk
+        from tkinter import ttk
+
+        self.runner = runner
+        self.base = base
+        self.run = run
+        self.decisions = {decision.name: decision for decision in ruleset.decisions}
+        self.job = None
+        self.image = None
+
+        self.window = tk.Toplevel(parent)
+        self.window.title(title)
+        controls = tk.Frame(self.window)
+        controls.pack(side=tk.TOP, fill=tk.X, padx=10, pady=5)
+
+        self.axis_fields = []
+        self.axis_ranges = []
+        for row, (label, choices) in enumerate((("X axis", list(fields)), ("Y axis", ["(none)"] + list(fields)))):
+            tk.Label(controls, text=label + ":").grid(row=row, column=0, sticky=tk.W)
+            field = ttk.Combobox(controls, values=choices, state="readonly", width=24)
+            field.current(0)
+            field.grid(row=row, column=1, padx=5)
+            field.bind("<<ComboboxSelected>>", lambda e, r=row: self.suggest_range(r))
+            low = tk.Entry(controls, width=12)
+            high = tk.Entry(controls, width=12)
+            tk.Label(controls, text="from").grid(row=row, column=2)
+            low.grid(row=row, column=3, padx=5)
+            tk.Label(controls, text="to").grid(row=row, column=4)
+            high.grid(row=row, column=5, padx=5)
+            self.axis_fields.append(field)
+            self.axis_ranges.append((low, high))
+            self.suggest_range(row)
+
+        tk.Label(controls, text="Steps:").grid(row=2, column=0, sticky=tk.W)
+        self.steps = tk.Entry(controls, width=8)
+        self.steps.insert(0, str(DEFAULT_STEPS))
+        self.steps.grid(row=2, column=1, sticky=tk.W, padx=5)
+        tk.Label(controls, text="Decision:").grid(row=2, column=2)
+        self.decision = ttk.Combobox(controls, values=list(self.decisions), state="readonly", width=24)
+        self.decision.current(0)
+        self.decision.grid(row=2, column=3, columnspan=2, padx=5)
+        tk.Button(controls, text="Run", command=self.start).grid(row=2, column=5, padx=5)
+
+        self.canvas = tk.Canvas(self.window, width=500, height=500, bg="white")
+        self.canvas.pack(side=tk.TOP, padx=10, pady=5)
+        self.legend = tk.Label(self.window, text="", justify=tk.LEFT)
+        self.legend.pack(side=tk.TOP, fill=tk.X, padx=10)
+        self.text = tk.Text(self.window, height=10, width=80)
+        self.text.pack(side=tk.TOP, fill=tk.BOTH, expand=True, padx=10, pady=5)
+
+    def suggest_range(self, row):
+        # Default to 0.5x - 1.5x of the company's current value
+        import tkinter as tk
+
+        field = self.axis_fields[row].get()
+        low, high = self.axis_ranges[row]
+        low.delete(0, tk.END)
+        high.delete(0, tk.END)
+        if field in self.base:
+            value = float(self.base[field])
+            bounds = sorted((value * 0.5, value * 1.5)) if value else (-1.0, 1.0)
+            low.insert(0, f"{bounds[0]:g}")
+            high.insert(0, f"{bounds[1]:g}")
+
+    def start(self):
+        from tkinter import messagebox
+
+        try:
+            steps = int(self.steps.get())
+            if steps < 2:
+                raise ValueError("Steps must be at least 2")
+            axes = {}
+            for field, (low, high) in zip(self.axis_fields, self.axis_ranges):
+                if field.get() in self.base:
+                    axes[field.get()] = np.linspace(float(low.get()), float(high.get()), steps)
+        except ValueError as e:
+            messagebox.showerror("Input Error", str(e))
+            return
+        if self.axis_fields[1].get() == self.axis_fields[0].get():
+            messagebox.showerror("Input Error", "Choose two different inputs.")
+            return
+        if self.job is not None:
+            self.job.cancel()
+        self.legend.config(text="Sweeping...")
+        self.job = self.runner.submit(lambda job: self.run(axes), on_done=self.show,
+                                      on_error=lambda e: messagebox.showerror("Sweep Error", str(e)))
+
+    def show(self, result):
+        import tkinter as tk
+
+        self.job = None
+        name = self.decision.get()
+        labels = result.decisions[name]
+        colors = decision_colors(self.decisions[name])
+
+        # Heatmap: X runs left to right, Y (if any) bottom to top
+        grid = labels if labels.ndim == 2 else labels[:, None]
+        valid = result.valid if result.valid.ndim == 2 else result.valid[:, None]
+        palette = np.array(list(colors.values()) + [INVALID_COLOR])
+        codes = np.full(grid.shape, len(palette) - 1, dtype=np.intp)
+        for i, label in enumerate(colors):
+            codes[(grid == label) & valid] = i
+        pixels = palette[codes.T[::-1]]
+        self.image = tk.PhotoImage(width=grid.shape[0], height=grid.shape[1])
+        self.image.put(" ".join("{" + " ".join(row) + "}" for row in pixels.tolist()))
+        zoom_x = max(1, 500 // grid.shape[0])
+        zoom_y = max(1, 500 // grid.shape[1]) if labels.ndim == 2 else max(1, 60 // grid.shape[1])
+        self.image = self.image.zoom(zoom_x, zoom_y)
+        self.canvas.delete("all")
+        self.canvas.create_image(0, 0, anchor=tk.NW, image=self.image)
+
+        axes_text = f"X: {result.names[0]} {result.axes[0][0]:g} .. {result.axes[0][-1]:g}"
+        if len(result.names) > 1:
+            axes_text += f"    Y: {result.names[1]} {result.axes[1][0]:g} .. {result.axes[1][-1]:g}"
+        legend = "\n".join(f"{color}: {label}" for label, color in colors.items())
+        self.legend.config(text=f"{axes_text}\n{legend}")
+
+        self.text.delete("1.0", tk.END)
+        points = result.breakpoints(name, axis=0)
+        if labels.ndim == 2 and len(points) > 50:
+            self.text.insert(tk.END, f"{len(points)} breakpoints along {result.names[0]}; first 50:\n")
+            points = points[:50]
+        for fixed, low, high, before, after in points:
+            at = ", ".join(f"{field}={value:g}" for field, value in fixed.items())
+            prefix = f"[{at}] " if at else ""
+            self.text.insert(tk.END, f"{prefix}{result.names[0]} {low:g} -> {high:g}: {before} -> {after}\n")
+        if not points:
+            self.text.insert(tk.END, f"{name} does not change over this range.\n")
@@ -0,0 +1,142 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import dcf
+import screener
+from test_screener import fundamentals
+
+COMPANIES = 7
+YEARS = 10
+
+
+def companies():
+    rng = np.random.default_rng(5)
+    fcf = rng.uniform(-50, 500, COMPANIES)
+    shares = rng.uniform(10, 100, COMPANIES)
+    net_debt = rng.uniform(-100, 100, COMPANIES)
+    growth = rng.uniform(-0.1, 0.2, COMPANIES)
+    return fcf, shares, net_debt, growth
+
+
+def year_loop(fcf, shares, net_debt, growth, discount_rate, terminal_growth, years=YEARS):
+    """Per-share value of one path, walking the years one at a time."""
+    cash = fcf
+    present_value = 0.0
+    for year in range(1, years + 1):
+        cash *= 1 + growth
+        present_value += cash / (1 + discount_rate) ** year
+    terminal = cash * (1 + terminal_growth) / (discount_rate - terminal_growth) / (1 + discount_rate) ** years
+    return (present_value + terminal - net_debt) / shares
+
+
+@pytest.mark.parametrize("growth_volatility", [0.0, 0.02])
+def test_seeded_runs_are_reproducible(growth_volatility):
+    fcf, shares, net_debt, growth = companies()
+
+    def run(seed, max_bytes=dcf.DEFAULT_MAX_BYTES):
+        return dcf.simulate(fcf, shares, dcf.Normal(growth, 0.05), net_debt=net_debt, paths=500,
+                            growth_volatility=growth_volatility, seed=seed, max_bytes=max_bytes)
+
+    first, again = run(1), run(np.random.SeedSequence(1))
+    for name, band in first.bands.items():
+        np.testing.assert_array_equal(band, again.bands[name], err_msg=name)
+    np.testing.assert_array_equal(first.mean, again.mean)
+    np.testing.assert_array_equal(first.valid, again.valid)
+    assert not np.array_equal(first.bands["value_p50"], run(2).bands["value_p50"])
+
+    # Same seed and chunking, same result; three companies per chunk here
+    small = 3 * 500 * 8 * dcf._WORKING_ARRAYS
+    np.testing.assert_array_equal(run(1, small).bands["value_p50"], run(1, small).bands["value_p50"])
+
+
+def test_geometric_series_matches_year_loop():
+    fcf, shares, net_debt, growth = companies()
+    # One company where growth equals the discount rate, so q == 1
+    growth[0] = 0.09
+    result = dcf.simulate(fcf, shares, growth, discount_rate=0.09, terminal_growth=0.02, net_debt=net_debt,
+                          paths=3, seed=0)
+    expected = [year_loop(*args, 0.09, 0.02) for args in zip(fcf, shares, net_debt, growth)]
+    for band in result.bands.values():
+        np.testing.assert_allclose(band, expected, rtol=1e-12)
+    np.testing.assert_allclose(result.mean, expected, rtol=1e-12)
+    np.testing.assert_array_equal(result.valid, 1.0)
+
+
+def test_year_loop_without_noise_matches_geometric_series():
+    fcf, shares, net_debt, growth = companies()
+    options = dict(net_debt=net_debt, paths=400, seed=3)
+    closed = dcf.simulate(fcf, shares, dcf.Normal(growth, 0.05), **options)
+    # Noise so small it vanishes against 1 + g; the draws before it are the same
+    walked = dcf.simulate(fcf, shares, dcf.Normal(growth, 0.05), growth_volatility=1e-300, **options)
+    for name, band in closed.bands.items():
+        np.testing.assert_allclose(walked.bands[name], band, rtol=1e-9, err_msg=name)
+    np.testing.assert_allclose(walked.mean, closed.mean, rtol=1e-9)
+    np.testing.assert_array_equal(walked.valid, closed.valid)
+
+
+def test_paths_without_terminal_value_are_dropped():
+    result = dcf.simulate([100.0, 100.0], 10.0, 0.05, discount_rate=dcf.Uniform(0.0, 0.04),
+                          terminal_growth=[0.02, 0.05], paths=2000, seed=0)
+    assert result.valid[0] == pytest.approx(0.5, abs=0.05)
+    assert result.valid[1] == 0.0
+    assert all(np.isnan(band[1]) for band in result.bands.values())
+    with pytest.raises(ValueError, match="must be positive"):
+        dcf.simulate(100.0, 10.0, 0.05, paths=0)
+
+
+def test_percentile_bands_match_numpy():
+    rng = np.random.default_rng(0)
+    values = rng.normal(100, 30, (20, 37))
+    values[rng.random(values.shape) < 0.2] = np.nan
+    values[3] = np.nan
+    values[4, 1:] = np.nan
+    qs = (0, 10, 25, 50, 75, 90, 100)
+    bands = dcf.percentile_bands(values, qs)
+    for row, path_values in enumerate(values):
+        kept = path_values[~np.isnan(path_values)]
+        for q in qs:
+            expected = np.percentile(kept, q) if kept.size else np.nan
+            np.testing.assert_allclose(bands[q][row], expected, rtol=1e-12, err_msg=f"row {row} p{q}")
+
+
+def test_simulated_bands_match_numpy():
+    # Fixed parameters per path, drawn here with the generator simulate() uses for the one chunk
+    fcf, shares, net_debt, _ = companies()
+    seed = np.random.SeedSequence(9)
+    rng = np.random.default_rng(seed.spawn(1)[0])
+    size = (COMPANIES, 200)
+    growth = dcf.Uniform(-0.05, 0.15)
+    g = growth.sample(rng, size)
+    r = dcf.DEFAULT_DISCOUNT_RATE.sample(rng, size)
+    tg = dcf.DEFAULT_TERMINAL_GROWTH.sample(rng, size)
+
+    result = dcf.simulate(fcf, shares, growth, net_debt=net_debt, paths=200, seed=9)
+    for i in range(COMPANIES):
+        values = [year_loop(fcf[i], shares[i], net_debt[i], *path) for path in zip(g[i], r[i], tg[i])]
+        for q in dcf.DEFAULT_PERCENTILES:
+            assert result.bands[f"value_p{q}"][i] == pytest.approx(np.percentile(values, q), rel=1e-9)
+        assert result.mean[i] == pytest.approx(np.mean(values), rel=1e-9)
+
+
+def test_screener_dcf_paths_are_reproducible(tmp_path):
+    frame = fundamentals()
+    input_path = str(tmp_path / "in.parquet")
+    frame.to_parquet(input_path, index=False)
+
+    outputs = []
+    for seed in (4, 4, 5):
+        output_path = str(tmp_path / f"out{len(outputs)}.parquet")
+        assert screener.main([input_path, output_path, "--chunk-size", "100", "--dcf-paths", "300",
+                              "--seed", str(seed)]) == 0
+        outputs.append(pd.read_parquet(output_path))
+
+    bands = [f"value_p{q}" for q in dcf.DEFAULT_PERCENTILES]
+    assert set(bands) | {"DCF Decision"} <= set(outputs[0].columns)
+    pd.testing.assert_frame_equal(outputs[0], outputs[1])
+    assert not outputs[0][bands].equals(outputs[2][bands])
+
+    # Each chunk gets its own stream spawned from the seed
+    seeds = np.random.SeedSequence(4)
+    first = screener.screen_chunk(frame.iloc[:100], dcf_paths=300, seed=seeds.spawn(1)[0])
+    pd.testing.assert_frame_equal(outputs[0].iloc[:100][bands], first[bands], check_index_type=False)
@@ -0,0 +1,51 @@
+import math
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+import export
+
+# Typed one chunk at a time, like screener.iter_chunks: `sector` is empty in
+# the first chunk and `shares` only turns float once a value is missing
+CHUNKS = [
+    pd.DataFrame({"ticker": ["A", "B"], "sector": [None, None], "shares": [10, 20], "pe": [1.5, 2.5]}),
+    pd.DataFrame({"ticker": ["C", "D"], "sector": ["Tech", None], "shares": [30, None], "pe": [3.5, math.inf]}),
+    pd.DataFrame({"ticker": ["E"], "sector": ["Energy"], "shares": [50], "pe": [float("nan")]}),
+]
+
+
+def read_back(path):
+    return pa.Table.from_batches(list(export.iter_batches(path))).to_pylist()
+
+
+@pytest.mark.parametrize("suffix", [".parquet", ".arrow", ".csv"])
+def test_chunks_with_dtype_drift(tmp_path, suffix):
+    path = str(tmp_path / f"out{suffix}")
+    with export.ExportWriter(path) as writer:
+        for chunk in CHUNKS:
+            writer.write(chunk)
+    assert writer.rows == 5
+
+    rows = read_back(path)
+    assert [row["ticker"] for row in rows] == ["A", "B", "C", "D", "E"]
+    # CSV has no null string, so a missing sector reads back empty
+    assert [row["sector"] or None for row in rows] == [None, None, "Tech", None, "Energy"]
+    assert [row["shares"] for row in rows] == [10, 20, 30, None, 50]
+    assert rows[3]["pe"] == math.inf
+    assert rows[4]["pe"] is None or math.isnan(rows[4]["pe"])
+
+
+def test_writer_schema_is_widened():
+    schema = export._writer_schema(export.to_table(CHUNKS[0]).schema)
+    assert schema.field("sector").type == pa.string()
+    assert schema.field("shares").type == pa.float64()
+    assert schema.field("pe").type == pa.float64()
+    assert schema.metadata is None
+
+
+def test_mismatched_columns_raise(tmp_path):
+    with export.ExportWriter(str(tmp_path / "out.parquet")) as writer:
+        writer.write(CHUNKS[0])
+        with pytest.raises(ValueError):
+            writer.write(CHUNKS[0].rename(columns={"pe": "pb"}))
@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+
+import incremental
+import ratio_engine
+import rules
+import valuation_core
+
+ROWS = 64
+
+CASES = {
+    "stock_tool": (incremental.for_stock_tool, ratio_engine.INPUT_FIELDS, ratio_engine.TOOL_GRAPH,
+                   ratio_engine.TOOL_RATIOS, ratio_engine.compute_ratios, rules.stock_tool_rules),
+    "valuation": (incremental.for_valuation, valuation_core.INPUT_FIELDS, ratio_engine.VALUATION_GRAPH,
+                  ratio_engine.VALUATION_RATIOS, ratio_engine.compute_valuation_ratios, rules.valuation_rules),
+}
+
+
+def random_inputs(rng, fields, rows):
+    values = rng.uniform(-200, 1000, (len(fields), rows))
+    # Some zeros, so divisions give inf and NaN as they do in real screens
+    values[rng.random(values.shape) < 0.05] = 0.0
+    return dict(zip(fields, values))
+
+
+def full_analysis(table, compute, ruleset):
+    ratios = compute(table)
+    source = dict(table)
+    source.update(ratios)
+    result = ruleset.evaluate(source)
+    return ratios, result.passed, result.decisions()
+
+
+def expected_changes(field, graph, outputs, ruleset):
+    ratios = {name for name, node in outputs.items() if field in ratio_engine.input_dependencies(graph, node)}
+    columns = ratios | {field}
+    flags = {rule.label for rule in ruleset.rules if rule.column in columns or rule.threshold in columns}
+    groups = {rule.group for rule in ruleset.rules if rule.label in flags}
+    decisions = {decision.name for decision in ruleset.decisions if decision.group in groups}
+    return ratios, flags, decisions
+
+
+@pytest.mark.parametrize("case", sorted(CASES))
+def test_updates_match_full_recompute(case):
+    build, fields, graph, outputs, compute, load_rules = CASES[case]
+    ruleset = load_rules()
+    rng = np.random.default_rng(sorted(CASES).index(case))
+    table = random_inputs(rng, fields, ROWS)
+    live = build(table, ruleset)
+    pushed = []
+    live.subscribe(pushed.append)
+
+    for step in range(3 * len(fields)):
+        field = fields[rng.integers(len(fields))]
+        before = {name: values.copy() for name, values in live.ratios.items()}
+        if step % 2:
+            rows = np.sort(rng.choice(ROWS, size=int(rng.integers(1, ROWS)), replace=False))
+            values = random_inputs(rng, [field], len(rows))[field]
+            table[field][rows] = values
+            changes = live.update(field, values, rows=rows)
+        else:
+            rows = None
+            table[field] = random_inputs(rng, [field], ROWS)[field]
+            changes = live.update(field, table[field])
+        assert pushed[-1] is changes
+
+        ratios, passed, decisions = full_analysis(table, compute, ruleset)
+        for name in outputs:
+            np.testing.assert_array_equal(live.ratios[name], ratios[name], err_msg=f"{field}: {name}")
+        np.testing.assert_array_equal(live.passed, passed, err_msg=field)
+        for name, labels in decisions.items():
+            np.testing.assert_array_equal(live.decisions[name], labels, err_msg=f"{field}: {name}")
+
+        # Changes lists exactly what depends on the field, with the new values for the updated rows
+        expected_ratios, expected_flags, expected_decisions = expected_changes(field, graph, outputs, ruleset)
+        assert (changes.field, changes.rows is None) == (field, rows is None)
+        assert set(changes.ratios) == expected_ratios
+        assert set(changes.passed) == expected_flags
+        assert set(changes.decisions) == expected_decisions
+        index = slice(None) if rows is None else rows
+        for name, values in changes.ratios.items():
+            np.testing.assert_array_equal(values, ratios[name][index])
+        for i, rule in enumerate(ruleset.rules):
+            if rule.label in changes.passed:
+                np.testing.assert_array_equal(changes.passed[rule.label], passed[i][index])
+        for name, labels in changes.decisions.items():
+            np.testing.assert_array_equal(labels, decisions[name][index])
+        # Ratios left out of Changes did not move
+        for name in set(outputs) - expected_ratios:
+            np.testing.assert_array_equal(live.ratios[name], before[name])
+
+
+def test_affected_ratios_and_unknown_field():
+    live = incremental.for_stock_tool(random_inputs(np.random.default_rng(0), ratio_engine.INPUT_FIELDS, 4))
+    assert "Company Worth" in live.affected_ratios("market_cap")
+    assert "Current Ratio" not in live.affected_ratios("market_cap")
+    with pytest.raises(ValueError, match="Unknown input field"):
+        live.update("Current Ratio", [1.0] * 4)
+
+
+def test_unsubscribe():
+    live = incremental.for_valuation(random_inputs(np.random.default_rng(1), valuation_core.INPUT_FIELDS, 3))
+    pushed = []
+    live.subscribe(pushed.append)
+    live.update("stock_price", [1.0, 2.0, 3.0])
+    live.unsubscribe(pushed.append)
+    live.update("stock_price", [4.0, 5.0, 6.0])
+    assert len(pushed) == 1
@@ -0,0 +1,134 @@
+import asyncio
+import math
+
+import numpy as np
+import pyarrow.parquet as pq
+import pytest
+
+import ingest
+import ingest_stub
+import metrics
+import ratio_engine
+
+
+@pytest.fixture
+def stub():
+    servers = []
+
+    def start(**options):
+        server = ingest_stub.StubServer(**options).start_in_thread()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.stop()
+
+
+def test_parse_fixture_and_synthetic_companies(stub):
+    server = stub()
+    fixtures = ingest_stub.load_fixtures()
+    tickers = sorted(fixtures) + ["SYN1", "SYN2"]
+    result = ingest.ingest(tickers, server.url)
+    assert result.tickers == tickers and result.errors == {}
+
+    table = result.table()
+    assert list(table) == ["ticker"] + list(ratio_engine.INPUT_FIELDS)
+    for i, ticker in enumerate(tickers):
+        company = fixtures.get(ticker) or ingest_stub.synthetic_company(ticker)
+        quote = company["quote"]
+        for field in ratio_engine.INPUT_FIELDS:
+            if field == "market_cap":
+                expected = quote["price"] * quote["shares_outstanding"]
+            elif field == "num_shares":
+                expected = quote["shares_outstanding"]
+            else:
+                expected = company["fundamentals"].get(field, math.nan)
+            np.testing.assert_equal(table[field][i], expected, err_msg=f"{ticker} {field}")
+
+
+def test_parse_missing_fields():
+    source = ingest.JsonSource(fields={"revenue": "totalRevenue"})
+    values = source.parse("X", ({"totalRevenue": "12.5", "equity": None}, {"price": 2.0}))
+    assert values["revenue"] == 12.5
+    assert math.isnan(values["equity"]) and math.isnan(values["net_profit"])
+    # A price without shares outstanding gives neither num_shares nor market_cap
+    assert math.isnan(values["num_shares"]) and math.isnan(values["market_cap"])
+    assert source.paths("BRK/B") == ("/v1/fundamentals/BRK%2FB", "/v1/quote/BRK%2FB")
+
+
+def test_503s_are_retried(stub):
+    server = stub(error_rate=0.3, seed=4)
+    metrics.reset()
+    result = ingest.ingest([f"T{i}" for i in range(40)], server.url, retries=10, backoff=0.001)
+    assert result.errors == {} and len(result.rows) == 40
+    assert result.retried == server.errors > 0
+    assert result.requests == 80 + server.errors
+    assert metrics.snapshot()["counters"]["fetch_retries"] == result.retried
+
+
+def test_retries_give_up_with_fetch_error(stub):
+    server = stub(error_rate=1.0)
+    result = ingest.ingest(["ACME"], server.url, retries=2)
+    assert result.tickers == [] and "failed after 3 attempts: HTTP 503" in result.errors["ACME"]
+
+
+def test_retry_after_is_capped(stub):
+    server = stub(error_rate=1.0, retry_after=86400)
+    fetch = ingest.Ingestor(server.url, retries=2, max_backoff=0.01).fetch_many(["ACME"])
+    # Without the cap this would wait a day; fail instead
+    result = asyncio.run(asyncio.wait_for(fetch, 5))
+    # Fundamentals and quote requests, each retried twice
+    assert result.retried == 4 and "ACME" in result.errors
+
+
+def test_concurrent_requests_are_coalesced(stub):
+    server = stub(delay=0.02)
+
+    async def fetch():
+        async with ingest.HttpClient(server.url, max_connections=4) as client:
+            documents = await asyncio.gather(*(client.get_json("/v1/quote/ACME") for _ in range(50)))
+            return client, documents
+
+    client, documents = asyncio.run(fetch())
+    assert server.requests["/v1/quote/ACME"] == 1
+    assert client.coalesced == 49 and client.requests == 1
+    assert all(document == documents[0] for document in documents)
+    # Duplicate tickers are fetched once
+    result = ingest.ingest(["ACME", "ACME", "GLOBX"], server.url)
+    assert result.tickers == ["ACME", "GLOBX"]
+
+
+def test_unknown_tickers_are_reported(stub):
+    server = stub(synthetic=False)
+    result = ingest.ingest(["ACME", "ZZZ"], server.url)
+    assert result.tickers == ["ACME"] and "HTTP 404" in result.errors["ZZZ"]
+
+
+@pytest.mark.parametrize("suffix", [".parquet", ".csv"])
+def test_main_writes_schema_when_every_ticker_fails(stub, tmp_path, suffix):
+    server = stub(synthetic=False)
+    tickers = tmp_path / "tickers.txt"
+    tickers.write_text("ZZZ\nYYY # comment\n")
+    output = str(tmp_path / f"out{suffix}")
+    assert ingest.main([str(tickers), output, "--url", server.url]) == 1
+
+    if suffix == ".csv":
+        with open(output) as f:
+            lines = f.read().splitlines()
+        assert lines == [",".join(f'"{name}"' for name in ["ticker"] + list(ratio_engine.INPUT_FIELDS))]
+    else:
+        table = pq.read_table(output)
+        assert table.num_rows == 0
+        assert table.schema.names == ["ticker"] + list(ratio_engine.INPUT_FIELDS)
+
+
+def test_main_writes_fetched_rows(stub, tmp_path):
+    server = stub()
+    tickers = tmp_path / "tickers.txt"
+    tickers.write_text("ACME, GLOBX\nSYN1\n")
+    output = str(tmp_path / "out.parquet")
+    assert ingest.main([str(tickers), output, "--url", server.url]) == 0
+    table = pq.read_table(output)
+    assert table.column("ticker").to_pylist() == ["ACME", "GLOBX", "SYN1"]
+    assert table.num_columns == 1 + len(ratio_engine.INPUT_FIELDS)
@@ -0,0 +1,78 @@
+import pytest
+
+import export
+import metrics
+import parallel_screen
+import ratio_engine
+import result_cache
+import screener
+from test_screener import fundamentals
+from test_sweep import TOOL_BASE
+
+
+@pytest.fixture(autouse=True)
+def fresh_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def test_merge_adds_drained_stages_and_counters():
+    other = metrics.Metrics()
+    other.observe("ratio", 0.002, rows=10)
+    other.observe("ratio", 0.004, rows=5)
+    other.count("rows_screened", 15)
+    metrics.observe("ratio", 0.001, rows=1)
+    metrics.count("rows_screened", 1)
+
+    metrics.merge(other.drain())
+    assert other.snapshot()["stages"] == {} and other.snapshot()["counters"] == {}
+    ratio = metrics.snapshot()["stages"]["ratio"]
+    assert (ratio["count"], ratio["rows"]) == (3, 16)
+    assert ratio["seconds"] == pytest.approx(0.007)
+    assert (ratio["min"], ratio["max"]) == (0.001, 0.004)
+    assert metrics.snapshot()["counters"]["rows_screened"] == 16
+
+
+def test_screen_counts_rows_rules_and_export_batches(tmp_path):
+    frame = fundamentals()
+    path = str(tmp_path / "in.csv")
+    frame.to_csv(path, index=False)
+    screener.run(path, str(tmp_path / "out.parquet"), chunk_size=100)
+
+    counters = metrics.snapshot()["counters"]
+    ruleset = screener.rules.stock_tool_rules()
+    assert counters["rows_screened"] == len(frame)
+    assert counters["export_batches"] == 3
+    assert counters["rule_checks"] == len(frame) * len(ruleset.rules)
+    result = ratio_engine.evaluate_rules(frame, ratio_engine.compute_ratios(frame), ruleset)
+    assert counters["rule_failures"] == (~result.passed).sum()
+    assert counters["decisions"] == len(frame) * len(ruleset.decisions)
+
+
+def test_worker_stages_are_merged():
+    frame = fundamentals()
+    with parallel_screen.ParallelScreener(workers=2, shard_rows=60) as pool:
+        screener.screen_chunk(frame, pool=pool)
+    snapshot = metrics.snapshot()
+    assert snapshot["stages"]["ratio"]["rows"] == len(frame)
+    assert snapshot["stages"]["rule"]["rows"] == len(frame)
+    assert snapshot["stages"]["rule"]["count"] == 5
+    assert snapshot["counters"]["rule_checks"] == len(frame) * len(pool.ruleset.rules)
+
+
+def test_cache_hits_and_misses():
+    cache = result_cache.ResultCache()
+    values = [TOOL_BASE[name] for name in ratio_engine.INPUT_FIELDS]
+    for _ in range(3):
+        result_cache.analyze_tool(values, cache)
+    counters = metrics.snapshot()["counters"]
+    assert (counters["cache_hits"], counters["cache_misses"]) == (2, 1)
+    assert counters["rule_checks"] == len(screener.rules.stock_tool_rules().rules)
+
+
+def test_export_batches(tmp_path):
+    with export.ExportWriter(str(tmp_path / "out.csv")) as writer:
+        for i in range(4):
+            writer.write_records([{"a": i}])
+    assert metrics.snapshot()["counters"]["export_batches"] == 4
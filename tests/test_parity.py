@@ -0,0 +1,82 @@
+"""The batch (NumPy) and scalar paths must agree exactly, special values included."""
+import math
+
+import numpy as np
+import pytest
+
+import ratio_engine
+import rules
+import valuation_core
+
+SPECIALS = (0.0, -0.0, math.nan, math.inf, -math.inf, 1e-300)
+
+
+def random_rows(columns, rows=2_000, seed=0):
+    rng = np.random.default_rng(seed)
+    table = rng.uniform(-1e6, 1e6, size=(rows, columns))
+    special = rng.random(table.shape) < 0.1
+    table[special] = rng.choice(SPECIALS, special.sum())
+    return table
+
+
+def same(a, b):
+    return (a == b and math.copysign(1, a) == math.copysign(1, b)) or (math.isnan(a) and math.isnan(b))
+
+
+def test_tool_compute_one_matches_batch():
+    table = random_rows(len(ratio_engine.INPUT_FIELDS))
+    ratios = ratio_engine.compute_ratios(table)
+    decisions = ratio_engine.evaluate_rules(table, ratios).decisions()
+    for i, row in enumerate(table):
+        one, stock, recovery = ratio_engine.compute_one(row)
+        for name, value in one.items():
+            assert same(value, float(ratios[name][i])), (name, row)
+        assert stock == decisions["Stock Decision"][i]
+        assert recovery == decisions["Recovery Decision"][i]
+
+
+def test_selected_ratios_match_full_graph():
+    table = random_rows(len(ratio_engine.INPUT_FIELDS), rows=500)
+    full = ratio_engine.compute_ratios(table)
+    names = ["PEG Ratio", "Free Cash Flow Yield", "Recovery Percentage"]
+    subset = ratio_engine.compute_ratios({name: table[:, ratio_engine.INPUT_FIELDS.index(name)]
+                                          for name in ratio_engine.required_inputs(names)}, names)
+    for name in names:
+        np.testing.assert_array_equal(subset[name], full[name])
+
+
+def test_valuation_core_matches_batch():
+    table = random_rows(len(valuation_core.INPUT_FIELDS), seed=1)
+    columns = {name: table[:, i] for i, name in enumerate(valuation_core.INPUT_FIELDS)}
+    batch = ratio_engine.compute_valuation_ratios(columns)
+    decisions = rules.valuation_rules().evaluate(batch).decisions()["Final Decision"]
+    scored = 0
+    for i, row in enumerate(table):
+        try:
+            result, suggestions, decision = valuation_core.analyze(valuation_core.ValuationInputs(*row))
+        except (ValueError, ZeroDivisionError):
+            # Rejected by the scalar core exactly where the batch divides by zero
+            divisors = ratio_engine.evaluate_graph(ratio_engine.VALUATION_GRAPH,
+                                                   {name: name for name in ratio_engine.divisors(ratio_engine.VALUATION_GRAPH)},
+                                                   lambda name: np.float64(columns[name][i]))
+            assert any(value == 0 for value in divisors.values()), row
+            continue
+        scored += 1
+        for name in valuation_core.RESULT_FIELDS:
+            assert same(getattr(result, name), float(batch[name][i])), (name, row)
+        assert decision == decisions[i]
+    assert scored > len(table) // 2
+
+
+@pytest.mark.parametrize("graph, outputs, fields", [
+    (ratio_engine.TOOL_GRAPH, ratio_engine.TOOL_RATIOS, ratio_engine.INPUT_FIELDS),
+    (ratio_engine.VALUATION_GRAPH, ratio_engine.VALUATION_RATIOS, valuation_core.INPUT_FIELDS),
+])
+def test_evaluate_scalar_matches_evaluate_graph(graph, outputs, fields):
+    table = random_rows(len(fields), rows=500, seed=2)
+    columns = {name: table[:, i] for i, name in enumerate(fields)}
+    batch = ratio_engine.evaluate_graph(graph, outputs, columns.__getitem__)
+    for i in range(len(table)):
+        scalar = ratio_engine.evaluate_scalar(graph, outputs, {name: float(columns[name][i]) for name in fields})
+        for name, value in scalar.items():
+            assert same(value, float(batch[name][i])), (name, i)
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+import ranking
+
+
+def assert_same_index(index, table, group=None):
+    rebuilt = ranking.RankIndex(table, key="t", group=group)
+    for g in (None,) + (rebuilt.group_names if group else ()):
+        for column in ("x", "y"):
+            values, rows = index._sorted(column, g)
+            expected_values, _ = rebuilt._sorted(column, g)
+            np.testing.assert_array_equal(values, expected_values)
+            np.testing.assert_array_equal(np.asarray(table[column], dtype=np.float64)[rows], values)
+
+
+def test_update_without_group():
+    table = {"t": ["a", "b", "c", "d"], "x": [1.0, 2.0, 3.0, 4.0], "y": [4.0, 3.0, np.nan, 1.0]}
+    index = ranking.RankIndex(table, key="t")
+    assert index.percentile("x", 50) == pytest.approx(2.5)
+    index.percentile("y", 50)
+
+    index.update("a", {"x": 5.0})
+    index.update("c", {"y": 2.0})
+    index.update("d", {"y": np.nan})
+    table.update(x=[5.0, 2.0, 3.0, 4.0], y=[4.0, 3.0, 2.0, np.nan])
+    assert_same_index(index, table)
+    assert list(index.top("x", 2)) == ["a", "d"]
+    assert index.count("y") == 3
+
+
+def test_update_with_group():
+    table = {"t": ["a", "b", "c", "d"], "s": ["u", "u", "v", "v"],
+             "x": [1.0, 2.0, 3.0, 4.0], "y": [4.0, 3.0, 2.0, 1.0]}
+    index = ranking.RankIndex(table, key="t", group="s")
+    for g in (None, "u", "v"):
+        index.count("x", g)
+
+    index.update("c", {"x": 0.5, "y": 9.0})
+    table.update(x=[1.0, 2.0, 0.5, 4.0], y=[4.0, 3.0, 9.0, 1.0])
+    assert_same_index(index, table, group="s")
+    assert list(index.bottom("x", 1, group="v")) == ["c"]
+
+
+def test_update_unknown_column():
+    index = ranking.RankIndex({"t": ["a"], "x": [1.0]}, key="t")
+    with pytest.raises(ValueError):
+        index.update("a", {"z": 1.0})
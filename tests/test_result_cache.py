@@ -0,0 +1,54 @@
+import ratio_engine
+import result_cache
+import rules
+import valuation_core
+
+TOOL_VALUES = (1000, 300, 2000, 1200, 900, 400, 500, 800, 40, 350, 6000, 60, 500, 50, 100, 40,
+               100, 200, 800, 50, 1700)
+VALUATION_VALUES = (1000, 150, 200, 450, 20, 900, 120, 2000, 800, 10, 5, 40)
+
+
+def edited(ruleset, threshold):
+    # Same version string, different thresholds: an edit nobody versioned
+    spec = ruleset.to_dict()
+    for rule in spec["rules"]:
+        rule["threshold"] = threshold
+    return rules.RuleSet.from_dict(spec)
+
+
+def test_tool_rule_edit_invalidates(tmp_path):
+    path = str(tmp_path / "results.sqlite")
+    original = rules.stock_tool_rules()
+    strict = edited(original, 1e12)
+    assert strict.version == original.version and strict.fingerprint != original.fingerprint
+
+    cache = result_cache.ResultCache(path=path)
+    first = result_cache.analyze_tool(TOOL_VALUES, cache, original)
+    assert first == ratio_engine.compute_one(TOOL_VALUES, original)
+
+    # A fresh process with edited rules must not be served the disk tier's old answer
+    cache = result_cache.ResultCache(path=path)
+    second = result_cache.analyze_tool(TOOL_VALUES, cache, strict)
+    assert second == ratio_engine.compute_one(TOOL_VALUES, strict)
+    assert second[1:] != first[1:]
+    assert cache.counters["disk_hits"] == 0
+
+    assert result_cache.analyze_tool(TOOL_VALUES, cache, original) == first
+    assert cache.counters["disk_hits"] == 1
+
+
+def test_valuation_rule_edit_invalidates():
+    cache = result_cache.ResultCache()
+    inputs = valuation_core.ValuationInputs(*VALUATION_VALUES)
+    original = rules.valuation_rules()
+    strict = edited(original, 1e12)
+    first = result_cache.analyze_valuation(inputs, cache, original)
+    second = result_cache.analyze_valuation(inputs, cache, strict)
+    assert cache.counters["hits"] == 0
+    assert second[1:] == valuation_core.score(valuation_core.compute(inputs), strict)
+    assert second[1:] != first[1:]
+
+
+def test_fingerprint_normalizes_zero_and_nan():
+    assert result_cache.fingerprint([0.0, float("nan")]) == result_cache.fingerprint([-0.0, -float("nan")])
+    assert result_cache.fingerprint([1.0], "a") != result_cache.fingerprint([1.0], "b")
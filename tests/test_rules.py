@@ -0,0 +1,240 @@
+import itertools
+import math
+import operator
+
+import numpy as np
+import pytest
+
+import rules
+
+OPS = {">=": operator.ge, ">": operator.gt, "<=": operator.le, "<": operator.lt}
+
+# stock-tool.py's is_good() before the rule engine: value >= thresholds.get(ratio, 0)
+BASELINE_GOOD = {
+    'Profit Margin': 0.1, 'Return on Assets (ROA)': 0.05, 'Return on Equity (ROE)': 0.15, 'Current Ratio': 1.5,
+    'Debt to Equity Ratio': 2, 'Gross Margin': 0.2, 'Operating Margin': 0.1, 'Net Profit Margin': 0.1,
+    'Quick Ratio': 1, 'Cash Ratio': 0.2, 'Debt to Assets Ratio': 0.5, 'Interest Coverage Ratio': 3,
+    'Equity Ratio': 0.3, 'Asset Turnover': 1, 'Inventory Turnover': 5, 'Receivables Turnover': 8,
+    'Payables Turnover': 10, 'Earnings Per Share (EPS)': 1, 'P/E Ratio': 20, 'Dividend Yield': 0.03,
+    'EV to EBITDA Ratio': 10, 'Earnings Yield': 0.05, 'PEG Ratio': 1, 'EV to Sales Ratio': 2,
+    'Earnings Growth': 0.1, 'Revenue Growth': 0.1, 'Dividend Growth Rate': 0.05, 'Asset Growth': 0.1,
+    'Operating Cash Flow to Net Income': 1, 'Free Cash Flow': 0, 'Operating Cash Flow to Sales': 0.1,
+    'Cash Flow Coverage Ratio': 1, 'Cash Flow Margin': 0.1, 'Retention Ratio': 0.5, 'Capital Gearing Ratio': 0.5,
+    'Financial Leverage Ratio': 2, 'Debt to Capital Ratio': 0.5, 'Book Value per Share': 10,
+    'Market to Book Ratio': 1.5, 'Free Cash Flow Yield': 0.05, 'Net Profit Ratio': 0.1, 'Company Worth': 1,
+    'Liquidation Value': 0,
+}
+
+
+def baseline_suggestions(r):
+    """stock-analysis.py's suggestion cascade and final decision before the rule engine."""
+    suggestions = []
+    if r["gross_profit_margin"] > 40:
+        suggestions.append("High gross profit margin indicates strong efficiency.")
+    if r["operating_profit_margin"] > 20:
+        suggestions.append("Operating profit margin is excellent for long-term investments.")
+    if r["net_profit_margin"] > 10:
+        suggestions.append("Net profit margin is healthy.")
+    if r["pe_ratio"] < 15:
+        suggestions.append("P/E ratio indicates the stock is undervalued.")
+    elif r["pe_ratio"] > 25:
+        suggestions.append("P/E ratio suggests overvaluation.")
+    if r["pb_ratio"] < 1:
+        suggestions.append("P/B ratio indicates the stock is undervalued.")
+    elif r["pb_ratio"] > 3:
+        suggestions.append("P/B ratio suggests the stock might be overvalued.")
+    if r["ps_ratio"] < 1:
+        suggestions.append("P/S ratio indicates good valuation for sales.")
+    if r["debt_to_equity_ratio"] < 0.5:
+        suggestions.append("Low debt-to-equity ratio indicates low financial risk.")
+    elif r["debt_to_equity_ratio"] > 1:
+        suggestions.append("High debt-to-equity ratio may indicate higher financial risk.")
+    if r["interest_coverage_ratio"] > 5:
+        suggestions.append("High interest coverage ratio indicates the company can easily cover its debt.")
+    elif r["interest_coverage_ratio"] < 1.5:
+        suggestions.append("Low interest coverage ratio indicates the company may struggle with its debt.")
+    if r["dividend_yield"] > 3:
+        suggestions.append("High dividend yield indicates a good source of income for long-term investors.")
+    if r["free_cash_flow_yield"] > 5:
+        suggestions.append("Free cash flow yield indicates good potential for growth.")
+    if len(suggestions) > 5:
+        final_decision = "The stock appears to be a strong buy for long-term investment."
+    elif 3 <= len(suggestions) <= 5:
+        final_decision = "The stock is fairly valued. It may be a hold or cautious buy."
+    else:
+        final_decision = "The stock may not be a good long-term investment based on the data."
+    return suggestions, final_decision
+
+
+def around(threshold):
+    return [np.nextafter(threshold, -np.inf), threshold, np.nextafter(threshold, np.inf)]
+
+
+def both_paths(ruleset, table):
+    """Per-rule pass rows from evaluate() and from evaluate_record() on each row, checked equal."""
+    batch = ruleset.evaluate(table).passed
+    rows = len(next(iter(table.values())))
+    scalar = np.array([ruleset.evaluate_record({name: column[i] for name, column in table.items()})[0]
+                       for i in range(rows)], dtype=bool).T.reshape(batch.shape)
+    np.testing.assert_array_equal(batch, scalar)
+    return batch
+
+
+@pytest.mark.parametrize("op", sorted(OPS))
+def test_constant_threshold_operators(op):
+    ruleset = rules.RuleSet([rules.Rule("x", op, 2.5)])
+    values = np.array(around(2.5) + [-np.inf, np.inf, np.nan, -0.0])
+    passed = both_paths(ruleset, {"x": values})[0]
+    assert list(passed) == [OPS[op](value, 2.5) for value in values]
+    assert not passed[values != values].any()
+
+
+@pytest.mark.parametrize("op", sorted(OPS))
+def test_column_thresholds(op):
+    ruleset = rules.RuleSet([rules.Rule("x", op, "y", label="x vs y")])
+    assert ruleset.columns == ("x", "y")
+    x = np.array([1.0, 2.0, 3.0, np.nan, 1.0, np.inf])
+    y = np.array([2.0, 2.0, 2.0, 2.0, np.nan, np.inf])
+    passed = both_paths(ruleset, {"x": x, "y": y})[0]
+    assert list(passed) == [OPS[op](a, b) for a, b in zip(x, y)]
+    # Column thresholds are per row, so check() (constants only) ignores them
+    assert ruleset.check("x", -1e300)
+
+
+def test_mixed_thresholds_keep_rule_order():
+    ruleset = rules.RuleSet([rules.Rule("a", ">", 0), rules.Rule("a", "<", "b"), rules.Rule("b", "<=", 5),
+                             rules.Rule("a", ">=", "b")])
+    table = {"a": np.array([1.0, -1.0, 6.0]), "b": np.array([2.0, 7.0, 6.0])}
+    expected = [[True, False, True], [True, True, False], [True, False, False], [False, False, True]]
+    np.testing.assert_array_equal(both_paths(ruleset, table), expected)
+
+
+def test_weights_and_score_bands():
+    ruleset = rules.RuleSet(
+        [rules.Rule("a", ">", 0, weight=2), rules.Rule("b", ">", 0, weight=1), rules.Rule("c", ">", 0, weight=0.5),
+         rules.Rule("d", ">", 0, group="other")],
+        # Bands are tried from the highest min_score down, whatever order they are given in
+        [rules.Decision("Grade", "default", [[1, "C"], [3, "A"], [2.5, "B"]], "F"),
+         rules.Decision("Other", "other", [[1, "YES"]], "NO")],
+    )
+    rows = list(itertools.product((-1.0, 1.0), repeat=4))
+    table = {name: np.array([row[i] for row in rows]) for i, name in enumerate("abcd")}
+    result = ruleset.evaluate(table)
+    scores = result.scores()
+    decisions = result.decisions()
+    assert set(scores) == {"default", "other"}
+    for i, (a, b, c, d) in enumerate(rows):
+        score = 2 * (a > 0) + (b > 0) + 0.5 * (c > 0)
+        grade = "A" if score >= 3 else "B" if score >= 2.5 else "C" if score >= 1 else "F"
+        assert scores["default"][i] == score
+        assert decisions["Grade"][i] == grade
+        assert decisions["Other"][i] == ("YES" if d > 0 else "NO")
+        _, record_scores, record_decisions = ruleset.evaluate_record(dict(zip("abcd", (a, b, c, d))))
+        assert record_scores == {"default": score, "other": float(d > 0)}
+        assert record_decisions == {"Grade": grade, "Other": "YES" if d > 0 else "NO"}
+
+    # Only the requested groups and decisions are computed
+    assert set(result.scores(groups=("other",))) == {"other"}
+    assert set(result.decisions(names=("Other",))) == {"Other"}
+
+
+def test_band_boundaries():
+    decision = rules.Decision("D", "g", [[6, "strong"], [3, "fair"]], "poor")
+    assert [decision.label_for(score) for score in (0, 2.999, 3, 5, 5.999, 6, 14)] == \
+        ["poor", "poor", "fair", "fair", "fair", "strong", "strong"]
+
+
+def test_bitmaps_pack_rows_little_endian():
+    rng = np.random.default_rng(5)
+    ruleset = rules.RuleSet([rules.Rule("x", ">", 0), rules.Rule("y", "<=", "x")])
+    table = {"x": rng.normal(size=19), "y": rng.normal(size=19)}
+    result = ruleset.evaluate(table)
+    bitmaps = result.bitmaps()
+    assert bitmaps.shape == (2, 3) and bitmaps.dtype == np.uint8
+    np.testing.assert_array_equal(np.unpackbits(bitmaps, axis=1, bitorder="little")[:, :19], result.passed)
+    assert not np.unpackbits(bitmaps, axis=1, bitorder="little")[:, 19:].any()
+    assert bitmaps[0, 0] == sum(1 << i for i in range(8) if table["x"][i] > 0)
+
+
+def test_subset_is_cached_and_filtered():
+    ruleset = rules.stock_tool_rules()
+    buy = ruleset.subset("buy")
+    assert ruleset.subset("buy") is buy
+    assert ruleset.subset("buy", "safe") is not buy
+    assert {rule.group for rule in buy.rules} == {"buy"}
+    assert [decision.name for decision in buy.decisions] == ["Stock Decision"]
+    assert buy.version == ruleset.version
+    assert buy.columns == ("market_cap", "Company Worth", "Profit Margin")
+    both = ruleset.subset("buy", "safe")
+    assert [decision.name for decision in both.decisions] == ["Stock Decision", "Recovery Decision"]
+
+
+def test_invalid_rule_sets():
+    with pytest.raises(ValueError, match="Unknown operator"):
+        rules.Rule("x", "==", 1)
+    with pytest.raises(ValueError, match="unknown group"):
+        rules.RuleSet([rules.Rule("x", ">", 1)], [rules.Decision("D", "missing", [[1, "Y"]], "N")])
+
+
+def test_fingerprint_ignores_version_but_not_thresholds():
+    spec = rules.stock_tool_rules().to_dict()
+    assert rules.RuleSet.from_dict(dict(spec, version="other")).fingerprint == rules.stock_tool_rules().fingerprint
+    spec["rules"][0]["threshold"] = 0.11
+    assert rules.RuleSet.from_dict(spec).fingerprint != rules.stock_tool_rules().fingerprint
+
+
+def test_is_good_matches_baseline_at_boundaries():
+    ruleset = rules.stock_tool_rules()
+    good = ruleset.subset("good")
+    names = [rule.column for rule in good.rules]
+    assert set(BASELINE_GOOD) <= set(names)
+    for name in names:
+        threshold = BASELINE_GOOD.get(name, 0)
+        values = around(threshold) + [np.nan, np.inf, -np.inf]
+        expected = [value >= threshold for value in values]
+        assert [ruleset.check(name, value, group="good") for value in values] == expected, name
+        table = {column: np.full(len(values), 1e300) for column in good.columns}
+        table[name] = np.array(values)
+        assert list(good.evaluate(table).group_passed("good")[name]) == expected, name
+
+
+def test_buy_and_safe_match_baseline_at_boundaries():
+    ruleset = rules.stock_tool_rules()
+    worth, liabilities = 1000.0, 500.0
+    for market_cap, margin, liquidation in itertools.product(around(worth), around(0.1), around(liabilities)):
+        record = {"market_cap": market_cap, "Company Worth": worth, "Profit Margin": margin,
+                  "Liquidation Value": liquidation, "total_liabilities": liabilities}
+        record.update((rule.column, 0.0) for rule in ruleset.rules if rule.column not in record)
+        decisions = ruleset.evaluate_record(record)[2]
+        assert decisions["Stock Decision"] == ("BUY" if market_cap < worth and margin > 0.1 else "DO NOT BUY")
+        assert decisions["Recovery Decision"] == ("SAFE" if liquidation > liabilities else "RISKY")
+        batch = ruleset.evaluate({name: np.array([value]) for name, value in record.items()}).decisions()
+        assert {name: labels[0] for name, labels in batch.items()} == decisions
+
+
+def test_suggestions_match_baseline_cascade():
+    ruleset = rules.valuation_rules()
+    thresholds = {}
+    for rule in ruleset.rules:
+        thresholds.setdefault(rule.column, []).append(rule.threshold)
+    rng = np.random.default_rng(11)
+    # Every threshold and its neighbours, plus random mixes across columns
+    candidates = {name: sorted({v for t in values for v in around(t)} | {math.inf, -math.inf})
+                  for name, values in thresholds.items()}
+    records = []
+    for name, values in candidates.items():
+        for value in values:
+            record = {column: rng.choice(options) for column, options in candidates.items()}
+            record[name] = value
+            records.append(record)
+    records += [{column: rng.choice(options) for column, options in candidates.items()} for _ in range(2000)]
+
+    counts = set()
+    for record in records:
+        expected, expected_decision = baseline_suggestions(record)
+        passed, _, decisions = ruleset.evaluate_record(record)
+        assert ruleset.passed_labels(passed) == expected
+        assert decisions["Final Decision"] == expected_decision
+        counts.add(len(expected))
+    # The decision bands' edges (2/3 and 5/6 suggestions) were exercised
+    assert {2, 3, 5, 6} <= counts
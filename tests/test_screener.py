@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import export
+import ratio_engine
+import screener
+
+ROWS = 250
+CHUNK = 100
+
+
+def fundamentals():
+    rng = np.random.default_rng(3)
+    frame = pd.DataFrame({name: rng.uniform(1, 1000, ROWS) for name in ratio_engine.INPUT_FIELDS})
+    # Pass-through columns whose inferred type differs between chunks: the
+    # sector is empty for the first chunk, the CIK keeps its leading zeros
+    # and the shares count is missing in the second chunk only
+    frame.insert(0, "ticker", [f"T{i}" for i in range(ROWS)])
+    frame.insert(1, "sector", [None] * CHUNK + ["Tech"] * (ROWS - CHUNK))
+    frame.insert(2, "cik", [f"{i:010d}" for i in range(ROWS)])
+    frame.insert(3, "shares", pd.array(range(ROWS), dtype="Int64"))
+    frame.loc[CHUNK + 5, "shares"] = pd.NA
+    frame.loc[7, "revenue"] = np.nan
+    return frame
+
+
+@pytest.mark.parametrize("source", [".csv", ".parquet"])
+@pytest.mark.parametrize("target", [".csv", ".parquet", ".arrow"])
+def test_screens_a_file_larger_than_one_chunk(tmp_path, source, target):
+    frame = fundamentals()
+    input_path = str(tmp_path / f"in{source}")
+    output_path = str(tmp_path / f"out{target}")
+    if source == ".csv":
+        frame.to_csv(input_path, index=False)
+    else:
+        frame.to_parquet(input_path, index=False)
+
+    stats = screener.run(input_path, output_path, chunk_size=CHUNK)
+    assert (stats["rows"], stats["chunks"]) == (ROWS, 3)
+
+    chunks = list(screener.iter_chunks(input_path, CHUNK))
+    assert len({tuple(chunk.dtypes.astype(str)) for chunk in chunks}) == 1
+    assert all(chunk[name].dtype == np.float64 for chunk in chunks for name in ratio_engine.INPUT_FIELDS)
+
+    out = pd.DataFrame(pd.concat([batch.to_pandas() for batch in export.iter_batches(output_path)]))
+    expected = screener.screen_chunk(frame)
+    assert list(out["ticker"]) == list(frame["ticker"])
+    assert list(out["sector"].fillna("")) == list(frame["sector"].fillna(""))
+    np.testing.assert_array_equal(out["Stock Decision"], expected["Stock Decision"])
+    for name in ratio_engine.compute_ratios(frame):
+        np.testing.assert_allclose(out[name].astype(float), expected[name].astype(float), equal_nan=True)
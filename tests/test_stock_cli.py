@@ -0,0 +1,42 @@
+import json
+import math
+
+import ratio_engine
+import stock_cli
+from test_sweep import TOOL_BASE, VALUATION_BASE
+
+
+def strict_json(text):
+    def reject(constant):
+        raise ValueError(f"not JSON: {constant}")
+
+    return json.loads(text, parse_constant=reject)
+
+
+def run_json(capsys, command, record):
+    args = [command, "--json"] + [f"{name}={value}" for name, value in record.items()]
+    assert stock_cli.main(args) == 0
+    return strict_json(capsys.readouterr().out)
+
+
+def test_zero_denominator_prints_null(capsys):
+    record = dict(TOOL_BASE, equity=0, revenue=0)
+    ratios = ratio_engine.compute_one([record[name] for name in ratio_engine.INPUT_FIELDS])[0]
+    non_finite = {name for name, value in ratios.items() if not math.isfinite(value)}
+    assert non_finite
+
+    output = run_json(capsys, "tool", record)
+    assert {name for name, value in output["ratios"].items() if value is None} == non_finite
+    assert output["ratios"]["Current Ratio"] == ratios["Current Ratio"]
+
+
+def test_valuation_json_is_strict(capsys):
+    output = run_json(capsys, "valuation", dict(VALUATION_BASE, stock_price=0, interest_expense=0))
+    assert output["ratios"]["interest_coverage_ratio"] is None
+    assert output["ratios"]["dividend_yield"] is None
+    assert output["decisions"]["Final Decision"]
+
+
+def test_json_safe():
+    value = {"a": [math.nan, 1.5, (math.inf, -math.inf)], "b": "x"}
+    assert stock_cli.json_safe(value) == {"a": [None, 1.5, [None, None]], "b": "x"}
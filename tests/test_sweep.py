@@ -0,0 +1,78 @@
+import itertools
+
+import numpy as np
+
+import ratio_engine
+import sweep
+import valuation_core
+
+VALUATION_BASE = dict(zip(valuation_core.INPUT_FIELDS, (1000, 150, 200, 450, 20, 900, 120, 2000, 800, 10, 5, 40)))
+TOOL_BASE = dict(zip(ratio_engine.INPUT_FIELDS, (1000, 300, 2000, 1200, 900, 400, 500, 800, 40, 350, 6000, 60, 500,
+                                                 50, 100, 40, 100, 200, 800, 50, 1700)))
+
+
+def scalar_valuation(values):
+    try:
+        inputs = valuation_core.ValuationInputs.from_mapping(values)
+        return valuation_core.analyze(inputs)[2]
+    except (ValueError, ZeroDivisionError):
+        return None
+
+
+def check_valuation(axes):
+    result = sweep.sweep_valuation(VALUATION_BASE, axes)
+    for index in itertools.product(*(range(len(values)) for values in result.axes)):
+        values = dict(VALUATION_BASE)
+        values.update((name, float(result.axes[i][j])) for i, (name, j) in enumerate(zip(result.names, index)))
+        expected = scalar_valuation(values)
+        assert bool(result.valid[index]) == (expected is not None), values
+        if expected is not None:
+            assert result.decisions["Final Decision"][index] == expected, values
+
+
+def test_valuation_valid_covers_every_divisor():
+    # Each of these makes the scalar tool raise somewhere other than equity or revenue
+    check_valuation({"net_income": [-50, 0, 150], "book_value": [0, 900]})
+    check_valuation({"revenue": [0, 1000], "total_liabilities": [800, 2000]})
+    check_valuation({"stock_price": [0, 20], "interest_expense": [0, 10], "dividends": [0, 40]})
+
+
+def test_valuation_sweep_matches_scalar():
+    check_valuation({"stock_price": np.linspace(1, 60, 9), "net_income": np.linspace(-100, 400, 7)})
+
+
+def test_tool_sweep_matches_compute_one():
+    axes = {"market_cap": np.linspace(0, 12000, 7), "net_profit": np.linspace(-200, 600, 5)}
+    result = sweep.sweep_stock_tool(TOOL_BASE, axes)
+    for i, market_cap in enumerate(result.axes[0]):
+        for j, net_profit in enumerate(result.axes[1]):
+            values = dict(TOOL_BASE, market_cap=market_cap, net_profit=net_profit)
+            _, stock, recovery = ratio_engine.compute_one([values[name] for name in ratio_engine.INPUT_FIELDS])
+            assert result.decisions["Stock Decision"][i, j] == stock
+            assert result.decisions["Recovery Decision"][i, j] == recovery
+
+
+def brute_force_breakpoints(result, name, axis):
+    labels = np.moveaxis(result.decisions[name], axis, -1)
+    valid = np.moveaxis(np.broadcast_to(result.valid, result.shape), axis, -1)
+    return sum(1 for index in np.ndindex(labels.shape[:-1]) for i in range(labels.shape[-1] - 1)
+               if valid[index][i] and valid[index][i + 1] and labels[index][i] != labels[index][i + 1])
+
+
+def test_breakpoints_skip_invalid_points():
+    # The only label change along revenue is into and out of revenue == 0, which the scalar tool rejects
+    result = sweep.sweep_valuation(VALUATION_BASE, {"revenue": np.linspace(-1000, 1000, 11)})
+    labels = result.decisions["Final Decision"]
+    assert not result.valid[5] and (labels[1:] != labels[:-1]).any()
+    assert result.breakpoints("Final Decision") == []
+    assert not result.boundary("Final Decision").any()
+
+    result = sweep.sweep_valuation(VALUATION_BASE, {"net_income": np.linspace(-100, 400, 11),
+                                                    "stock_price": [0, 5, 20, 60]})
+    for axis in (0, 1):
+        points = result.breakpoints("Final Decision", axis=axis)
+        assert len(points) == brute_force_breakpoints(result, "Final Decision", axis)
+        assert result.boundary("Final Decision", axis=axis).sum() == len(points)
+        # net_income == 0 is the invalid row
+        for fixed, low, high, _, _ in points:
+            assert 0 not in ((low, high) if axis == 0 else (fixed["net_income"],))
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+import timeseries
+
+
+def build(tmp_path, periods_by_ticker):
+    tickers, periods, revenue = [], [], []
+    for ticker, periods_ in periods_by_ticker.items():
+        for period in periods_:
+            tickers.append(ticker)
+            periods.append(period)
+            revenue.append(100.0 * 1.1 ** period)
+    table = {"ticker": tickers, "period": periods, "revenue": revenue}
+    return timeseries.TimeSeriesStore.build(str(tmp_path / "store"), table)
+
+
+def test_windows_follow_periods_not_rows(tmp_path):
+    # B is missing period 2
+    store = build(tmp_path, {"A": range(6), "B": [0, 1, 3, 4, 5, 6]})
+    cagr = store.cagr("revenue", 4, periods_per_year=4)
+    a, b = slice(*store.rows("A")), slice(*store.rows("B"))
+    np.testing.assert_allclose(cagr[a][4:], 1.1 ** 4 - 1)
+    assert np.isnan(cagr[a][:4]).all()
+    # Every 4-row window of B spans 5 periods, so none of them is a 4-period CAGR
+    assert np.isnan(cagr[b]).all()
+
+    mean = store.rolling_mean("revenue", 3)
+    assert np.isnan(mean[b][:4]).all() and not np.isnan(mean[b][4:]).any()
+    slope = store.trend_slope("revenue", 3)
+    assert np.isnan(slope[b][:4]).all() and not np.isnan(slope[b][4:]).any()
+
+
+def test_lagged_uses_periods(tmp_path):
+    store = build(tmp_path, {"A": [0, 1, 3, 4]})
+    lagged = store.lagged("revenue", 1)
+    revenue = np.asarray(store.column("revenue"))
+    assert np.isnan(lagged[0]) and np.isnan(lagged[2])
+    assert lagged[1] == revenue[0] and lagged[3] == revenue[2]
+    np.testing.assert_array_equal(store.lagged("revenue", 0), revenue)
+    with pytest.raises(ValueError):
+        store.lagged("revenue", -1)
+
+
+@pytest.mark.parametrize("lag", [4, 5, 100])
+def test_lagged_past_every_row_is_nan(tmp_path, lag):
+    store = build(tmp_path, {"A": [0, 1, 3, 4]})
+    lagged = store.lagged("revenue", lag)
+    assert len(lagged) == 4 and np.isnan(lagged).all()
+
+
+def test_array_functions_with_period():
+    values = np.array([1.0, 2.0, 4.0, 8.0])
+    np.testing.assert_allclose(timeseries.cagr(values, 1, periods_per_year=1)[1:], 1.0)
+    out = timeseries.cagr(values, 1, periods_per_year=1, period=[0, 1, 3, 4])
+    assert np.isnan(out[2]) and out[3] == pytest.approx(1.0)
+    with pytest.raises(ValueError):
+        timeseries.rolling_mean(values, 2, period=[0, 1])
@@ -0,0 +1,245 @@
+"""Memory-mapped per-ticker time series of company fundamentals.
+
+A store is a directory of columnar .npy files (one per field, plus the
+period column), sorted by ticker and then period, with an offsets array
+marking where each ticker's rows start:
+
+    meta.json       fields, tickers and the format version
+    offsets.npy     int64, len(tickers) + 1 row offsets
+    period.npy      int64 periods (e.g. year * 4 + quarter - 1), ascending per ticker
+    <field>.npy     float64 values
+
+Columns are opened with np.load(mmap_mode="r"), so opening a store reads only
+meta.json and offsets.npy, and history() returns slices of the mapped files
+without copying. Growth metrics (CAGR, rolling means, trend slopes) run as
+windowed array operations over whole columns at once. Windows never span
+two tickers, and a window over a history with a missing period is NaN
+rather than silently covering a longer span than asked for.
+
+    store = timeseries.TimeSeriesStore.build("fundamentals.ts", frame)
+    store.history("AAPL")["revenue"]
+    store.latest(store.cagr("revenue", periods=20))
+"""
+import json
+import os
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+import ratio_engine
+
+FORMAT_VERSION = 1
+PERIODS_PER_YEAR = 4
+
+
+def gaps(period, lookback):
+    """Rows whose trailing `lookback` rows skip a period.
+
+    `period` is ascending integers, so `lookback` rows back is exactly
+    `lookback` periods back only when no period in between is missing.
+    """
+    period = np.asarray(period, dtype=np.int64)
+    out = np.zeros(len(period), dtype=np.bool_)
+    if 0 < lookback < len(period):
+        out[lookback:] = period[lookback:] - period[:-lookback] != lookback
+    return out
+
+
+def _drop_gaps(out, period, lookback):
+    if period is not None:
+        if len(period) != len(out):
+            raise ValueError(f"period has {len(period)} rows, values have {len(out)}")
+        out[gaps(period, lookback)] = np.nan
+    return out
+
+
+def cagr(values, periods, periods_per_year=PERIODS_PER_YEAR, period=None):
+    """Compound annual growth from `periods` periods earlier to each row.
+
+    Rows are consecutive periods unless `period` (ascending integers) is
+    given, in which case rows whose window skips a period are NaN. NaN for
+    the first `periods` rows and where either end is non-positive.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full(values.shape, np.nan)
+    if periods <= 0:
+        raise ValueError(f"periods must be positive, got {periods}")
+    if len(values) > periods:
+        start, end = values[:-periods], values[periods:]
+        valid = (start > 0) & (end > 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            out[periods:] = np.where(valid, (end / start) ** (periods_per_year / periods) - 1, np.nan)
+    return _drop_gaps(out, period, periods)
+
+
+def rolling_mean(values, window, period=None):
+    """Mean of each row and the `window - 1` periods before it (NaN until the window is full).
+
+    `period` works as for cagr().
+    """
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full(values.shape, np.nan)
+    if window <= 0:
+        raise ValueError(f"window must be positive, got {window}")
+    if len(values) >= window:
+        out[window - 1:] = sliding_window_view(values, window).mean(axis=1)
+    return _drop_gaps(out, period, window - 1)
+
+
+def trend_slope(values, window, periods_per_year=PERIODS_PER_YEAR, period=None):
+    """Least-squares slope per year over each trailing window of `window` periods.
+
+    `period` works as for cagr().
+    """
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full(values.shape, np.nan)
+    if window < 2:
+        raise ValueError(f"window must be at least 2, got {window}")
+    if len(values) >= window:
+        # slope = sum((x - mean(x)) * y) / sum((x - mean(x))**2), as one matrix-vector product
+        x = np.arange(window) - (window - 1) / 2
+        weights = x / (x @ x) * periods_per_year
+        out[window - 1:] = sliding_window_view(values, window) @ weights
+    return _drop_gaps(out, period, window - 1)
+
+
+class TimeSeriesStore:
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        if meta.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported time-series store version in {path}: {meta.get('version')}")
+        self.fields = tuple(meta["fields"])
+        self.tickers = tuple(meta["tickers"])
+        self.offsets = np.load(os.path.join(path, "offsets.npy"))
+        self._index = {ticker: i for i, ticker in enumerate(self.tickers)}
+        self._columns = {}
+        self._position = None
+
+    @classmethod
+    def build(cls, path, table, ticker="ticker", period="period", fields=None):
+        """Write `table` (a DataFrame or column mapping) as a store at `path` and open it."""
+        if fields is None:
+            fields = [name for name in table.keys() if name not in (ticker, period)]
+        tickers, codes = np.unique(np.asarray(table[ticker]).astype(str), return_inverse=True)
+        periods = np.asarray(table[period], dtype=np.int64)
+        order = np.lexsort((periods, codes))
+        codes, periods = codes[order], periods[order]
+
+        same_ticker = codes[1:] == codes[:-1]
+        if np.any(same_ticker & (periods[1:] == periods[:-1])):
+            raise ValueError("Duplicate (ticker, period) rows in time-series input")
+
+        os.makedirs(path, exist_ok=True)
+        offsets = np.searchsorted(codes, np.arange(len(tickers) + 1)).astype(np.int64)
+        np.save(os.path.join(path, "offsets.npy"), offsets)
+        np.save(os.path.join(path, "period.npy"), periods)
+        for name in fields:
+            np.save(os.path.join(path, f"{name}.npy"), np.asarray(table[name], dtype=np.float64)[order])
+        with open(os.path.join(path, "meta.json"), "w") as f:
+            json.dump({"version": FORMAT_VERSION, "fields": list(fields), "tickers": tickers.tolist()}, f)
+        return cls(path)
+
+    def __len__(self):
+        return int(self.offsets[-1])
+
+    def __contains__(self, ticker):
+        return ticker in self._index
+
+    def column(self, name):
+        """The whole memory-mapped column `name` ("period" or a field)."""
+        column = self._columns.get(name)
+        if column is None:
+            if name != "period" and name not in self.fields:
+                raise ValueError(f"Unknown time-series field: {name}")
+            column = np.load(os.path.join(self.path, f"{name}.npy"), mmap_mode="r")
+            self._columns[name] = column
+        return column
+
+    def rows(self, ticker):
+        """The (start, stop) row range of `ticker`."""
+        i = self._index.get(ticker)
+        if i is None:
+            raise ValueError(f"Unknown ticker: {ticker}")
+        return int(self.offsets[i]), int(self.offsets[i + 1])
+
+    def history(self, ticker, fields=None):
+        """{"period": ..., field: ...} for one ticker, as views into the mapped files."""
+        start, stop = self.rows(ticker)
+        names = ("period",) + tuple(fields or self.fields)
+        return {name: self.column(name)[start:stop] for name in names}
+
+    def position(self):
+        """Each row's index within its ticker's history (0 for the oldest period)."""
+        if self._position is None:
+            lengths = np.diff(self.offsets)
+            self._position = np.arange(len(self)) - np.repeat(self.offsets[:-1], lengths)
+        return self._position
+
+    def _per_ticker(self, values, lookback):
+        # Blank out windows that reach back into the previous ticker's rows
+        values[self.position() < lookback] = np.nan
+        return values
+
+    def cagr(self, field, periods, periods_per_year=PERIODS_PER_YEAR):
+        """cagr() of `field` for every row of every ticker, windowed on the period column."""
+        return self._per_ticker(cagr(self.column(field), periods, periods_per_year, self.column("period")), periods)
+
+    def rolling_mean(self, field, window):
+        """rolling_mean() of `field` for every row of every ticker, windowed on the period column."""
+        return self._per_ticker(rolling_mean(self.column(field), window, self.column("period")), window - 1)
+
+    def trend_slope(self, field, window, periods_per_year=PERIODS_PER_YEAR):
+        """trend_slope() of `field` for every row of every ticker, windowed on the period column."""
+        return self._per_ticker(trend_slope(self.column(field), window, periods_per_year, self.column("period")),
+                                window - 1)
+
+    def lagged(self, field, lag):
+        """`field` as of `lag` periods earlier in the same ticker's history.
+
+        NaN before the history starts and where that period is missing, so
+        all NaN when `lag` reaches back past every row.
+        """
+        if lag < 0:
+            raise ValueError(f"lag must not be negative, got {lag}")
+        column = self.column(field)
+        out = np.full(len(column), np.nan)
+        if lag < len(column):
+            out[lag:] = column[:len(column) - lag]
+        return self._per_ticker(_drop_gaps(out, self.column("period"), lag), lag)
+
+    def latest(self, values):
+        """The last row per ticker of a full-length array (e.g. from cagr()), in ticker order."""
+        return np.asarray(values)[self.offsets[1:] - 1]
+
+    def growth_metrics(self, fields, years=(5, 10), periods_per_year=PERIODS_PER_YEAR):
+        """Latest CAGR, rolling mean and trend slope per ticker over each span in `years`.
+
+        Returns {"<field>_cagr_<n>y" / "_mean_<n>y" / "_slope_<n>y": array per ticker}.
+        """
+        metrics = {}
+        for field in fields:
+            for n in years:
+                periods = n * periods_per_year
+                metrics[f"{field}_cagr_{n}y"] = self.latest(self.cagr(field, periods, periods_per_year))
+                metrics[f"{field}_mean_{n}y"] = self.latest(self.rolling_mean(field, periods))
+                metrics[f"{field}_slope_{n}y"] = self.latest(self.trend_slope(field, periods, periods_per_year))
+        return metrics
+
+    def ratio_inputs(self, lag=PERIODS_PER_YEAR):
+        """A ratio_engine input table of each ticker's latest period.
+
+        The prev_* fields come from `lag` periods earlier (a year back for
+        quarterly data) instead of being entered by hand.
+        """
+        lagged = {f"prev_{name}": name for name in ("net_profit", "revenue", "dividend", "total_assets")}
+        sources = {name: lagged.get(name, name) for name in ratio_engine.INPUT_FIELDS}
+        missing = sorted({source for source in sources.values() if source not in self.fields})
+        if missing:
+            raise ValueError(f"Time-series store is missing fields: {', '.join(missing)}")
+        table = {}
+        for name, source in sources.items():
+            values = self.lagged(source, lag) if name in lagged else self.column(source)
+            table[name] = self.latest(values)
+        return table
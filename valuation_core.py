@@ -0,0 +1,154 @@
+"""Headless compute core for stock-analysis.py.
+
+Pure Python with no third-party or tkinter imports (rules only loads NumPy for
+batch evaluation), so it loads in a few milliseconds and can be used from
+worker processes and services. The GUI's
+submit_data() parses its entries into a ValuationInputs, and renders the
+ValuationResult and score() output.
+"""
+import rules
+
+INPUT_FIELDS = (
+    "revenue", "net_income", "operating_profit", "gross_profit", "stock_price", "book_value",
+    "free_cash_flow", "total_assets", "total_liabilities", "interest_expense", "growth_rate", "dividends",
+)
+
+RESULT_FIELDS = (
+    "gross_profit_margin", "operating_profit_margin", "net_profit_margin", "roa", "roe",
+    "pe_ratio", "pb_ratio", "ps_ratio", "debt_to_equity_ratio", "interest_coverage_ratio",
+    "eps", "free_cash_flow_yield", "dividend_yield",
+)
+
+_INF = float('inf')
+
+
+class ValuationInputs:
+    __slots__ = INPUT_FIELDS
+
+    def __init__(self, revenue: float, net_income: float, operating_profit: float, gross_profit: float,
+                 stock_price: float, book_value: float, free_cash_flow: float, total_assets: float,
+                 total_liabilities: float, interest_expense: float, growth_rate: float, dividends: float):
+        self.revenue = float(revenue)
+        self.net_income = float(net_income)
+        self.operating_profit = float(operating_profit)
+        self.gross_profit = float(gross_profit)
+        self.stock_price = float(stock_price)
+        self.book_value = float(book_value)
+        self.free_cash_flow = float(free_cash_flow)
+        self.total_assets = float(total_assets)
+        self.total_liabilities = float(total_liabilities)
+        self.interest_expense = float(interest_expense)
+        self.growth_rate = float(growth_rate)
+        self.dividends = float(dividends)
+
+    @classmethod
+    def from_mapping(cls, data):
+        """Build from any mapping keyed by INPUT_FIELDS (values may be numeric strings)."""
+        return cls(*(data[name] for name in INPUT_FIELDS))
+
+    def as_tuple(self):
+        return tuple(getattr(self, name) for name in INPUT_FIELDS)
+
+    def __repr__(self):
+        args = ", ".join(f"{name}={getattr(self, name)!r}" for name in INPUT_FIELDS)
+        return f"ValuationInputs({args})"
+
+
+class ValuationResult:
+    __slots__ = RESULT_FIELDS
+
+    def __init__(self, gross_profit_margin: float, operating_profit_margin: float, net_profit_margin: float,
+                 roa: float, roe: float, pe_ratio: float, pb_ratio: float, ps_ratio: float,
+                 debt_to_equity_ratio: float, interest_coverage_ratio: float, eps: float,
+                 free_cash_flow_yield: float, dividend_yield: float):
+        self.gross_profit_margin = gross_profit_margin
+        self.operating_profit_margin = operating_profit_margin
+        self.net_profit_margin = net_profit_margin
+        self.roa = roa
+        self.roe = roe
+        self.pe_ratio = pe_ratio
+        self.pb_ratio = pb_ratio
+        self.ps_ratio = ps_ratio
+        self.debt_to_equity_ratio = debt_to_equity_ratio
+        self.interest_coverage_ratio = interest_coverage_ratio
+        self.eps = eps
+        self.free_cash_flow_yield = free_cash_flow_yield
+        self.dividend_yield = dividend_yield
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in RESULT_FIELDS}
+
+    def __repr__(self):
+        args = ", ".join(f"{name}={getattr(self, name)!r}" for name in RESULT_FIELDS)
+        return f"ValuationResult({args})"
+
+
+def compute(inputs: ValuationInputs) -> ValuationResult:
+    """Compute the stock-analysis.py ratio set for one company.
+
+    Raises ValueError when equity (total assets - total liabilities) is zero and
+    ZeroDivisionError for a zero revenue, matching the GUI's error handling.
+    """
+    revenue = inputs.revenue
+    net_income = inputs.net_income
+    stock_price = inputs.stock_price
+    equity = inputs.total_assets - inputs.total_liabilities
+
+    # Check for zero values to prevent division errors
+    if equity == 0:
+        raise ValueError("The difference between Total Assets and Total Liabilities cannot be zero.")
+
+    # ----- Financial Ratios -----
+    gross_profit_margin = (inputs.gross_profit / revenue) * 100
+    operating_profit_margin = (inputs.operating_profit / revenue) * 100
+    net_profit_margin = (net_income / revenue) * 100
+    roa = (net_income / inputs.total_assets) * 100 if inputs.total_assets != 0 else _INF
+    roe = (net_income / equity) * 100
+
+    # ----- Valuation Ratios -----
+    pe_ratio = stock_price / (net_income / equity)
+    pb_ratio = stock_price / (inputs.book_value / equity)
+    ps_ratio = stock_price / (revenue / equity)
+
+    # ----- Solvency Ratios -----
+    debt_to_equity_ratio = inputs.total_liabilities / equity
+    interest_coverage_ratio = inputs.operating_profit / inputs.interest_expense if inputs.interest_expense != 0 else _INF
+
+    # ----- Growth Ratios -----
+    eps = net_income / equity
+    market_value = stock_price * equity
+    free_cash_flow_yield = inputs.free_cash_flow / market_value if market_value != 0 else _INF
+    dividend_yield = (inputs.dividends / stock_price) * 100 if stock_price != 0 else _INF
+
+    return ValuationResult(gross_profit_margin, operating_profit_margin, net_profit_margin, roa, roe,
+                           pe_ratio, pb_ratio, ps_ratio, debt_to_equity_ratio, interest_coverage_ratio,
+                           eps, free_cash_flow_yield, dividend_yield)
+
+
+def score(result: ValuationResult, ruleset=None):
+    """Return (suggestions, final_decision) for a computed result.
+
+    Suggestions and the decision come from `ruleset` (default
+    config/valuation_rules.json), evaluated on the scalar, NumPy-free path.
+    """
+    ruleset = ruleset or rules.valuation_rules()
+    passed, _, decisions = ruleset.evaluate_record(result.as_dict())
+    return ruleset.passed_labels(passed), decisions["Final Decision"]
+
+
+def analyze(inputs: ValuationInputs, ruleset=None):
+    """Compute and score one company. Returns (result, suggestions, final_decision)."""
+    result = compute(inputs)
+    suggestions, decision = score(result, ruleset)
+    return result, suggestions, decision
+
+
+def analyze_batch(records, ruleset=None):
+    """Analyze an iterable of ValuationInputs, returning a list of analyze() tuples."""
+    ruleset = ruleset or rules.valuation_rules()
+    results = [analyze(inputs, ruleset) for inputs in records]
+    # Counted once per batch; suggestions are the labels of the rules that passed
+    checks = len(results) * len(ruleset.rules)
+    rules.count_outcomes(checks, checks - sum(len(suggestions) for _, suggestions, _ in results),
+                         len(results) * len(ruleset.decisions))
+    return results